@@ -0,0 +1,169 @@
+"""
+Connecteur NetLogo pour asyncio: chaque simulation est pilotée depuis une boucle
+d'événements sans bloquer les autres simulations ni les autres tâches de la boucle
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from netlogo_actor import get_actor
+from netlogo_connector import NetLogoConnector
+
+class AsyncNetLogoConnector:
+    """
+    Enveloppe asynchrone d'un NetLogoConnector.
+
+    Les opérations sur le modèle sont soumises à l'acteur qui possède le workspace
+    et attendues via asyncio.wrap_future: la boucle reste libre pendant que la JVM
+    travaille. Le démarrage et la fermeture du workspace (chargement du modèle, arrêt
+    de l'acteur) passent par un exécuteur dédié à un seul thread.
+
+    Pour piloter plusieurs simulations dans le même processus, donner à chacune un
+    workspace_name distinct (mode headless): elles partagent la JVM mais pas le monde.
+    """
+    def __init__(self, connector=None, gui=False, jvm_path=None, workspace_name=None):
+        """
+        Args:
+            connector: NetLogoConnector existant (facultatif)
+            gui (bool): Mode d'affichage du connecteur créé si connector est None
+            jvm_path (str): Chemin vers la JVM; None pour la détection automatique
+            workspace_name (str): Nom d'un workspace dédié (None: workspace partagé du mode)
+        """
+        self.connector = connector or NetLogoConnector(gui=gui, jvm_path=jvm_path, workspace_name=workspace_name)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="netlogo-async")
+
+    @property
+    def initialized(self):
+        return self.connector.initialized
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self.close()
+
+    async def _run_blocking(self, function, *args):
+        """Exécute une fonction bloquante sur l'exécuteur dédié"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    async def _submit(self, function, *args):
+        """Exécute function(*args) sur le thread de l'acteur et attend son résultat"""
+        return await asyncio.wrap_future(self.connector.submit(function, *args))
+
+    async def initialize(self, model_path="Alpha.nlogo"):
+        """
+        Démarre ou réutilise le workspace et prépare le modèle
+
+        Args:
+            model_path (str): Chemin vers le fichier modèle NetLogo
+
+        Returns:
+            bool: True si l'initialisation est réussie, False sinon
+        """
+        return await self._run_blocking(self.connector.initialize, model_path)
+
+    async def step(self, n=1, run_mode="normal"):
+        """
+        Exécute n ticks en une seule commande NetLogo
+
+        Args:
+            n (int): Nombre de ticks à exécuter
+            run_mode (str): "normal" ou "max_throughput" (sans le wait de go)
+
+        Returns:
+            bool: True si la commande est exécutée avec succès, False sinon
+        """
+        if not self.initialized:
+            return False
+        return await self._submit(self.connector.step, n, run_mode)
+
+    async def step_to_next_event(self, launch_pending=False, max_skip=500, run_mode="normal"):
+        """
+        Avance jusqu'au prochain événement (voir NetLogoConnector.step_to_next_event)
+
+        Returns:
+            int: Nombre de ticks exécutés, None en cas d'erreur
+        """
+        if not self.initialized:
+            return None
+        return await self._submit(self.connector.step_to_next_event, launch_pending, max_skip, run_mode)
+
+    async def snapshot(self):
+        """
+        Capture l'état des machines et des produits (reporter "system-snapshot")
+
+        Returns:
+            dict: {"machines": {colonne: ndarray}, "products": {colonne: ndarray}}
+                  ou None en cas d'erreur
+        """
+        if not self.initialized:
+            return None
+        return await self._submit(self.connector.get_snapshot)
+
+    async def telemetry(self):
+        """
+        Récupère les scalaires suivis à chaque tick en un seul appel
+
+        Returns:
+            telemetry.TelemetryRecord ou None en cas d'erreur
+        """
+        if not self.initialized:
+            return None
+        return await self._submit(self.connector.get_telemetry)
+
+    async def report(self, reporter, default=None):
+        """
+        Évalue un reporter NetLogo
+
+        Args:
+            reporter (str): Reporter NetLogo à évaluer
+            default: Valeur renvoyée en cas d'erreur
+
+        Returns:
+            La valeur du reporter ou la valeur par défaut
+        """
+        if not self.initialized:
+            return default
+        return await self._submit(self.connector.get_reporter_value, reporter, default)
+
+    async def report_many(self, reporters):
+        """
+        Évalue plusieurs reporters en un seul aller-retour avec la JVM
+
+        Args:
+            reporters: Liste de reporters NetLogo
+
+        Returns:
+            list: Valeurs dans l'ordre des reporters, ou None en cas d'erreur
+        """
+        if not self.initialized:
+            return None
+        reporters = list(reporters)
+        try:
+            return await asyncio.wrap_future(get_actor(self.connector.netlogo).report_many(reporters))
+        except Exception as e:
+            print(f"Erreur lors de l'évaluation des reporters {reporters}: {str(e)}")
+            return None
+
+    async def command(self, command):
+        """
+        Exécute une commande NetLogo
+
+        Returns:
+            bool: True si la commande est exécutée avec succès, False sinon
+        """
+        if not self.initialized:
+            return False
+        return await self._submit(self.connector.execute_command, command)
+
+    async def close(self, keep_warm=False):
+        """
+        Ferme le workspace puis l'exécuteur dédié
+
+        Args:
+            keep_warm (bool): Si True, le workspace reste chargé pour la prochaine initialisation
+        """
+        try:
+            await self._run_blocking(self.connector.close, keep_warm)
+        finally:
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,121 @@
+"""
+Micro-benchmark de la conversion des valeurs renvoyées par NetLogo: ancienne conversion
+(str(type(value)) et recherches de sous-chaînes par valeur) contre utils.convert_java_to_python
+
+Avec JPype installé, les données sont de vraies valeurs Java (java.util.ArrayList de
+java.lang.Double, etc.). Sans JVM, seuls les scalaires sont comparés: l'ancienne version
+renvoie les listes Python telles quelles, sans les convertir, et la comparaison des
+listes n'aurait pas de sens.
+"""
+import argparse
+import importlib.util
+import random
+import timeit
+
+from utils import convert_java_to_python
+
+def legacy_convert_java_to_python(value):
+    """Ancienne version de utils.convert_java_to_python, conservée comme référence"""
+    if str(type(value)).find('java.lang.String') != -1:
+        return str(value)
+
+    if str(type(value)).find('java.lang.Double') != -1 or str(type(value)).find('java.lang.Float') != -1:
+        return float(value)
+
+    if str(type(value)).find('java.lang.Integer') != -1 or str(type(value)).find('java.lang.Long') != -1:
+        return int(value)
+
+    if str(type(value)).find('java.lang.Boolean') != -1:
+        return bool(value)
+
+    if str(type(value)).find('java.util.ArrayList') != -1 or str(type(value)).find('java.util.List') != -1:
+        return [legacy_convert_java_to_python(item) for item in value]
+
+    if str(type(value)).startswith('['):
+        return [legacy_convert_java_to_python(item) for item in value]
+
+    return value
+
+def build_samples(size, use_jvm):
+    """
+    Construit des valeurs de la forme des résultats du modèle Alpha
+
+    Args:
+        size: Nombre d'éléments des listes
+        use_jvm: Si True, construit des objets Java via JPype
+
+    Returns:
+        dict: {nom: valeur} (sans JVM: scalaires seulement)
+    """
+    if not use_jvm:
+        return {"scalaire": 42.0, "chaîne": "Idle"}
+
+    rng = random.Random(0)
+    numbers = [rng.uniform(0, 1000) for _ in range(size)]
+    # Une ligne par agent: [nom, état, temps, x, y] comme dans system-snapshot
+    rows = [[f"M{i}", "Idle", rng.uniform(0, 100), rng.uniform(-20, 20), rng.uniform(-20, 20)]
+            for i in range(size // 5 or 1)]
+
+    from jpype import java
+
+    def to_java(value):
+        if isinstance(value, list):
+            java_list = java.util.ArrayList()
+            for item in value:
+                java_list.add(to_java(item))
+            return java_list
+        if isinstance(value, str):
+            return java.lang.String(value)
+        return java.lang.Double(value)
+
+    return {
+        "scalaire": java.lang.Double(42.0),
+        "chaîne": java.lang.String("Idle"),
+        "liste de nombres": to_java(numbers),
+        "lignes mixtes": to_java(rows),
+    }
+
+def run_benchmark(size=1000, repeat=5, number=200, use_jvm=False):
+    """
+    Mesure les deux conversions sur chaque échantillon
+
+    Args:
+        size: Nombre d'éléments des listes
+        repeat: Nombre de répétitions (le meilleur temps est retenu)
+        number: Nombre de conversions par répétition
+        use_jvm: True pour des objets Java via JPype, False pour des valeurs Python
+
+    Returns:
+        dict: {échantillon: (µs ancienne conversion, µs nouvelle conversion)}
+    """
+    if use_jvm:
+        import jpype
+        if not jpype.isJVMStarted():
+            jpype.startJVM()
+
+    results = {}
+    for name, value in build_samples(size, use_jvm).items():
+        legacy = min(timeit.repeat(lambda: legacy_convert_java_to_python(value), repeat=repeat, number=number))
+        fast = min(timeit.repeat(lambda: convert_java_to_python(value), repeat=repeat, number=number))
+        results[name] = (legacy / number * 1e6, fast / number * 1e6)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de la conversion Java -> Python")
+    parser.add_argument("--size", type=int, default=1000, help="Nombre d'éléments des listes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--no-jvm", action="store_true", help="Valeurs Python au lieu d'objets Java (scalaires)")
+    args = parser.parse_args()
+
+    use_jvm = not args.no_jvm and importlib.util.find_spec("jpype") is not None
+    if not use_jvm:
+        print("Sans JVM: comparaison limitée aux scalaires (les listes Python ne sont pas "
+              "converties par l'ancienne version)")
+
+    results = run_benchmark(args.size, args.repeat, args.number, use_jvm)
+    for name, (legacy, fast) in results.items():
+        print(f"{name}: ancienne {legacy:.1f} µs, nouvelle {fast:.1f} µs (x{legacy / max(fast, 1e-9):.1f})")
+
+if __name__ == "__main__":
+    main()
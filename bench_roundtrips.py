@@ -0,0 +1,61 @@
+"""
+Benchmark des allers-retours NetLogo sans JVM: lecture produit par produit
+(get_product_state) contre lecture groupée (get_products_state), sur le faux
+NetLogoLink de fake_netlogo avec une latence par appel simulée
+"""
+import argparse
+import time
+
+from fake_netlogo import make_synthetic_factory
+from netlogo_utils import get_product_state, get_products_state
+
+def run_benchmark(products=200, latency=0.001, machines=7, seed=0):
+    """
+    Mesure les deux lectures de l'état des produits
+
+    Args:
+        products: Nombre de produits créés après setup
+        latency: Latence simulée par appel (secondes)
+        machines: Nombre de machines de l'usine synthétique
+        seed: Graine de l'usine synthétique
+
+    Returns:
+        dict: {lecture: (secondes, nombre d'appels)}
+    """
+    link = make_synthetic_factory(machine_count=machines, seed=seed)
+    link.command("setup")
+    product_types = list(link.factory.routings)
+    for index in range(products):
+        link.command(f'create.product "{product_types[index % len(product_types)]}"')
+    product_ids = [int(who) for who in link.report("[who] of products")]
+
+    # La latence ne s'applique qu'aux lectures mesurées
+    link.latency = latency
+    results = {}
+
+    calls = link.call_counts["report"]
+    start = time.perf_counter()
+    for product_id in product_ids:
+        get_product_state(link, product_id)
+    results["par produit"] = (time.perf_counter() - start, link.call_counts["report"] - calls)
+
+    calls = link.call_counts["report"]
+    start = time.perf_counter()
+    get_products_state(link)
+    results["groupée"] = (time.perf_counter() - start, link.call_counts["report"] - calls)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des allers-retours NetLogo (faux link, sans JVM)")
+    parser.add_argument("--products", type=int, default=200, help="Nombre de produits")
+    parser.add_argument("--latency", type=float, default=0.001, help="Latence simulée par appel (secondes)")
+    parser.add_argument("--machines", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.products, args.latency, args.machines, args.seed)
+    for name, (elapsed, calls) in results.items():
+        print(f"{name}: {elapsed * 1000:.1f} ms, {calls} appels")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Comptage des appels NetLogo (reporters, commandes, repeat_report) par modèle de requête:
+nombre d'appels, erreurs, latence cumulée et percentiles, appels par tick
+"""
+import re
+import threading
+import time
+from collections import deque
+
+from settings import get_netlogo_settings
+from stepping import UNTHROTTLED_GO
+
+# Littéraux remplacés pour regrouper les requêtes d'un même collecteur:
+# "[who] of turtle 193" et "[who] of turtle 194" donnent "[who] of turtle N"
+_STRING_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"')
+_NUMBER_PATTERN = re.compile(r'(?<![\w.?-])-?\d+(?:\.\d+)?(?![\w.])')
+_SPACE_PATTERN = re.compile(r"\s+")
+_REPEAT_PATTERN = re.compile(r"^repeat\s+(\d+)\s*\[\s*(.*?)\s*\]$", re.DOTALL)
+
+# Commandes d'un tick (voir stepping.get_go_command)
+GO_COMMANDS = {"go", UNTHROTTLED_GO}
+
+# Latences conservées par modèle pour les percentiles
+RECENT_SAMPLES = 1024
+# Au-delà, le cache chaîne -> modèle est vidé (requêtes toutes différentes)
+MAX_CACHED_TEMPLATES = 4096
+
+def query_template(source):
+    """
+    Retourne le modèle d'une requête NetLogo (chaînes et nombres remplacés)
+
+    Args:
+        source: Reporter ou commande NetLogo
+
+    Returns:
+        str: Modèle (ex: 'create.product "?"', "[who] of turtle N")
+    """
+    template = _STRING_PATTERN.sub('"?"', source)
+    template = _NUMBER_PATTERN.sub("N", template)
+    return _SPACE_PATTERN.sub(" ", template).strip()
+
+def ticks_in_command(command):
+    """
+    Nombre de ticks exécutés par une commande ("go": 1, "repeat 50 [ go ]": 50, autre: 0)
+    """
+    command = command.strip()
+    if command in GO_COMMANDS:
+        return 1
+    match = _REPEAT_PATTERN.match(command)
+    if match and match.group(2) in GO_COMMANDS:
+        return int(match.group(1))
+    return 0
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+class _TemplateStats:
+    """Compteurs d'un modèle de requête: cumulés et depuis le dernier flush"""
+    __slots__ = ("kind", "template", "calls", "errors", "total", "max", "recent",
+                 "window_calls", "window_errors", "window_total", "window_max", "window_recent")
+
+    def __init__(self, kind, template):
+        self.kind = kind
+        self.template = template
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+        self.clear_window()
+
+    def clear_window(self):
+        self.window_calls = 0
+        self.window_errors = 0
+        self.window_total = 0.0
+        self.window_max = 0.0
+        self.window_recent = deque(maxlen=RECENT_SAMPLES)
+
+    def add(self, elapsed, error):
+        self.calls += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.recent.append(elapsed)
+        self.window_calls += 1
+        self.window_total += elapsed
+        self.window_max = max(self.window_max, elapsed)
+        self.window_recent.append(elapsed)
+        if error:
+            self.errors += 1
+            self.window_errors += 1
+
+    def summary(self, ticks, window=False):
+        if window:
+            calls, errors, total, maximum, samples = (
+                self.window_calls, self.window_errors, self.window_total, self.window_max, self.window_recent)
+        else:
+            calls, errors, total, maximum, samples = self.calls, self.errors, self.total, self.max, self.recent
+        samples = sorted(samples)
+        return {
+            "kind": self.kind,
+            "template": self.template,
+            "calls": calls,
+            "errors": errors,
+            "total_ms": total * 1000,
+            "mean_ms": total / calls * 1000 if calls else 0.0,
+            "p50_ms": _percentile(samples, 0.50) * 1000,
+            "p95_ms": _percentile(samples, 0.95) * 1000,
+            "p99_ms": _percentile(samples, 0.99) * 1000,
+            "max_ms": maximum * 1000,
+            "calls_per_tick": calls / ticks if ticks else None,
+        }
+
+class CallStats:
+    """
+    Statistiques des appels passés par safe_netlogo_reporter, safe_netlogo_command et
+    safe_netlogo_repeat_report.
+
+    Les percentiles portent sur les RECENT_SAMPLES derniers appels de chaque modèle. Les
+    ticks sont comptés d'après les commandes go / "repeat N [ go ]" et repeat_report
+    (ticks du modèle Alpha reste à 0). flush() écrit les compteurs de la période écoulée
+    dans la table netlogo_call_stats puis les remet à zéro; les cumuls sont conservés.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._templates = {}
+        self.ticks = 0
+        self.window_ticks = 0
+        self.started = time.perf_counter()
+        self.window_started = self.started
+
+    def record(self, kind, source, elapsed, error=False, ticks=0):
+        """
+        Enregistre un appel
+
+        Args:
+            kind: "report", "command" ou "repeat_report"
+            source: Reporter ou commande NetLogo
+            elapsed: Durée de l'appel (secondes)
+            error: True si l'appel a échoué
+            ticks: Ticks exécutés par l'appel (None: déduits de la commande)
+        """
+        if not self.enabled:
+            return
+
+        template = self._templates.get(source)
+        if template is None:
+            template = query_template(source)
+            if len(self._templates) >= MAX_CACHED_TEMPLATES:
+                self._templates.clear()
+            self._templates[source] = template
+        if ticks is None:
+            ticks = ticks_in_command(source) if not error else 0
+
+        with self._lock:
+            stats = self._stats.get((kind, template))
+            if stats is None:
+                stats = self._stats[(kind, template)] = _TemplateStats(kind, template)
+            stats.add(elapsed, error)
+            self.ticks += ticks
+            self.window_ticks += ticks
+
+    def summary(self, window=False):
+        """
+        Retourne les statistiques par modèle de requête, les plus coûteux en premier
+
+        Args:
+            window: Si True, seulement les appels depuis le dernier flush()
+
+        Returns:
+            list: Un dict par modèle (kind, template, calls, errors, total_ms, mean_ms,
+                  p50_ms, p95_ms, p99_ms, max_ms, calls_per_tick)
+        """
+        with self._lock:
+            ticks = self.window_ticks if window else self.ticks
+            rows = [stats.summary(ticks, window) for stats in self._stats.values()]
+        rows = [row for row in rows if row["calls"]]
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    def totals(self, window=False):
+        """
+        Returns:
+            dict: {"calls", "errors", "total_ms", "ticks", "calls_per_tick", "elapsed"}
+        """
+        rows = self.summary(window)
+        calls = sum(row["calls"] for row in rows)
+        ticks = self.window_ticks if window else self.ticks
+        return {
+            "calls": calls,
+            "errors": sum(row["errors"] for row in rows),
+            "total_ms": sum(row["total_ms"] for row in rows),
+            "ticks": ticks,
+            "calls_per_tick": calls / ticks if ticks else None,
+            "elapsed": time.perf_counter() - (self.window_started if window else self.started),
+        }
+
+    def reset(self):
+        """Remet tous les compteurs à zéro"""
+        with self._lock:
+            self._stats.clear()
+            self.ticks = 0
+            self.window_ticks = 0
+            self.started = self.window_started = time.perf_counter()
+
+    def flush(self, db_manager, simulation_id=None):
+        """
+        Enregistre les statistiques de la période écoulée et ouvre une nouvelle période
+
+        Args:
+            db_manager: DatabaseManager (table netlogo_call_stats)
+            simulation_id: ID de la simulation en cours
+
+        Returns:
+            int: Nombre de modèles de requête enregistrés
+        """
+        # Lecture et remise à zéro sous le même verrou: aucun appel n'est perdu entre les deux
+        with self._lock:
+            ticks = self.window_ticks
+            rows = [stats.summary(ticks, window=True) for stats in self._stats.values() if stats.window_calls]
+            for stats in self._stats.values():
+                stats.clear_window()
+            self.window_ticks = 0
+            self.window_started = time.perf_counter()
+
+        if not rows:
+            return 0
+        # Ligne "total": ticks et appels de la période entière (appels par tick globaux)
+        calls = sum(row["calls"] for row in rows)
+        total_ms = sum(row["total_ms"] for row in rows)
+        rows.append({
+            "kind": "total", "template": "*", "calls": calls, "errors": sum(row["errors"] for row in rows),
+            "total_ms": total_ms, "mean_ms": total_ms / calls,
+            "p50_ms": None, "p95_ms": None, "p99_ms": None,
+            "max_ms": max(row["max_ms"] for row in rows), "calls_per_tick": calls / ticks if ticks else None,
+        })
+        try:
+            db_manager.save_call_stats(simulation_id, rows, ticks)
+        except Exception as e:
+            print(f"Erreur lors de l'enregistrement des statistiques d'appels NetLogo: {e}")
+            return 0
+        return len(rows) - 1
+
+    def print_report(self, limit=15, window=False):
+        """Affiche les modèles de requête les plus coûteux"""
+        totals = self.totals(window)
+        per_tick = f"{totals['calls_per_tick']:.1f}" if totals["calls_per_tick"] is not None else "-"
+        print(f"Appels NetLogo: {totals['calls']} ({totals['errors']} erreurs), "
+              f"{totals['total_ms']:.0f} ms, {totals['ticks']} ticks, {per_tick} appels/tick")
+        for row in self.summary(window)[:limit]:
+            row_per_tick = f"{row['calls_per_tick']:.2f}" if row["calls_per_tick"] is not None else "-"
+            print(f"  {row['total_ms']:9.1f} ms  {row['calls']:7d} x  p50 {row['p50_ms']:.2f} ms  "
+                  f"p95 {row['p95_ms']:.2f} ms  {row_per_tick}/tick  {row['errors']} err  "
+                  f"[{row['kind']}] {row['template'][:80]}")
+
+_call_stats = None
+
+def get_call_stats():
+    """Retourne les statistiques d'appels du processus courant (call_stats dans config.ini)"""
+    global _call_stats
+    if _call_stats is None:
+        _call_stats = CallStats(enabled=get_netlogo_settings()["call_stats"])
+    return _call_stats
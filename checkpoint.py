@@ -0,0 +1,129 @@
+"""
+Points de reprise des simulations longues: export du monde NetLogo, ID de la ligne
+simulation et file des produits restant à lancer
+"""
+import glob
+import json
+import os
+import time
+
+from utils import model_file_hash, netlogo_string
+from netlogo_utils import safe_netlogo_command
+
+class CheckpointStore:
+    """
+    Enregistre des points de reprise sous la forme d'une paire de fichiers:
+    sim-<id>-<n>.csv (export-world) et sim-<id>-<n>.json (métadonnées).
+
+    Le fichier JSON est écrit en dernier: un point de reprise sans JSON (export
+    interrompu par un arrêt de la JVM) est ignoré.
+    """
+    def __init__(self, checkpoint_dir, keep=3):
+        """
+        Args:
+            checkpoint_dir: Répertoire des points de reprise
+            keep: Nombre de points de reprise conservés par simulation
+        """
+        self.checkpoint_dir = os.path.abspath(checkpoint_dir)
+        self.keep = max(1, int(keep))
+
+    def save(self, netlogo, simulation_id, product_queue, model_path, state=None):
+        """
+        Enregistre un point de reprise de la simulation en cours
+
+        Args:
+            netlogo: L'instance NetLogoLink
+            simulation_id: ID de la ligne de la table simulation
+            product_queue: Types de produits restant à lancer (dans l'ordre)
+            model_path: Chemin vers le fichier modèle (son empreinte est vérifiée à la reprise)
+            state: Informations complémentaires à restaurer (compteurs, temps simulé...)
+
+        Returns:
+            dict: Métadonnées du point de reprise, ou None en cas d'échec
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        sequence = int(time.time() * 1000)
+        base_path = os.path.join(self.checkpoint_dir, f"sim-{int(simulation_id)}-{sequence}")
+        world_path = base_path + ".csv"
+
+        if not safe_netlogo_command(netlogo, f"export-world {netlogo_string(world_path)}"):
+            self._remove(world_path)
+            return None
+
+        metadata = {
+            "simulation_id": int(simulation_id),
+            "product_queue": list(product_queue),
+            "model_hash": model_file_hash(model_path),
+            "world_path": world_path,
+            "created": time.time(),
+            "state": state or {},
+        }
+
+        temp_path = base_path + ".json.tmp"
+        with open(temp_path, "w", encoding="utf-8") as metadata_file:
+            json.dump(metadata, metadata_file)
+        os.replace(temp_path, base_path + ".json")
+
+        self._prune(simulation_id)
+        print(f"Point de reprise enregistré: {os.path.basename(base_path)}")
+        return metadata
+
+    def latest(self, model_path, simulation_id=None):
+        """
+        Retourne le point de reprise le plus récent compatible avec le modèle actuel
+
+        Args:
+            model_path: Chemin vers le fichier modèle
+            simulation_id: Limiter la recherche à une simulation (facultatif)
+
+        Returns:
+            dict: Métadonnées du point de reprise, ou None s'il n'y en a pas
+        """
+        model_hash = model_file_hash(model_path)
+        for metadata in self._list(simulation_id):
+            if metadata.get("model_hash") == model_hash and os.path.exists(metadata.get("world_path", "")):
+                return metadata
+        return None
+
+    def restore(self, netlogo, metadata):
+        """
+        Restaure le monde NetLogo d'un point de reprise
+
+        Args:
+            netlogo: L'instance NetLogoLink (modèle chargé)
+            metadata: Métadonnées renvoyées par latest()
+
+        Returns:
+            bool: True si le monde a été importé
+        """
+        return safe_netlogo_command(netlogo, f"import-world {netlogo_string(metadata['world_path'])}")
+
+    def clear(self, simulation_id):
+        """Supprime les points de reprise d'une simulation (ex: après une fin normale)"""
+        for path in glob.glob(os.path.join(self.checkpoint_dir, f"sim-{int(simulation_id)}-*")):
+            self._remove(path)
+
+    def _list(self, simulation_id=None):
+        """Métadonnées des points de reprise, du plus récent au plus ancien"""
+        pattern = f"sim-{int(simulation_id)}-*.json" if simulation_id is not None else "sim-*.json"
+        checkpoints = []
+        for path in glob.glob(os.path.join(self.checkpoint_dir, pattern)):
+            try:
+                with open(path, "r", encoding="utf-8") as metadata_file:
+                    checkpoints.append(json.load(metadata_file))
+            except (OSError, ValueError) as e:
+                print(f"Point de reprise illisible {path}: {e}")
+        return sorted(checkpoints, key=lambda metadata: metadata.get("created", 0), reverse=True)
+
+    def _prune(self, simulation_id):
+        """Ne conserve que les self.keep points de reprise les plus récents de la simulation"""
+        for metadata in self._list(simulation_id)[self.keep:]:
+            base_path = os.path.splitext(metadata["world_path"])[0]
+            self._remove(metadata["world_path"])
+            self._remove(base_path + ".json")
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,192 @@
+"""
+Disjoncteur JVM: la première erreur "JVM fermée" ouvre le circuit, les appels suivants
+à NetLogo échouent immédiatement au lieu de répéter l'erreur à chaque reporter
+"""
+import threading
+import time
+
+from settings import get_netlogo_settings
+
+# Messages (ou noms d'exception) indiquant que la JVM ne répond plus
+JVM_FAILURE_MARKERS = (
+    "Java Virtual Machine is not running",
+    "JVM is closed",
+    "JVM is not running",
+    "JVMNotRunning",
+)
+
+def is_jvm_failure(error):
+    """
+    Indique si une exception signale l'arrêt de la JVM (et non une erreur NetLogo)
+
+    Args:
+        error: Exception levée par un appel NetLogo
+
+    Returns:
+        bool: True si la JVM est arrêtée
+    """
+    text = f"{type(error).__name__}: {error}"
+    return any(marker in text for marker in JVM_FAILURE_MARKERS)
+
+def can_restart_jvm():
+    """
+    Indique si un workspace perdu peut être recréé dans ce processus
+
+    JPype ne peut pas démarrer une seconde JVM dans le même processus: avec le backend
+    pynetlogo, seul un redémarrage de l'application rétablit NetLogo. Le backend simulé
+    (fake) se reconnecte sans JVM.
+
+    Returns:
+        bool: True si la reconnexion peut être tentée
+    """
+    return get_netlogo_settings()["backend"] != "pynetlogo"
+
+class JVMCircuitBreaker:
+    """
+    États: "closed" (appels normaux), "open" (JVM perdue, appels refusés sans les
+    exécuter) et "half_open" (tentative de reconnexion en cours).
+
+    La reconnexion passe par attempt(): une seule tentative à la fois, avec un délai
+    doublé après chaque échec (initial_delay, 2 x initial_delay... jusqu'à max_delay).
+    """
+    def __init__(self, initial_delay=1.0, max_delay=30.0, max_attempts=5):
+        """
+        Args:
+            initial_delay: Délai avant la première tentative de reconnexion (secondes)
+            max_delay: Délai maximal entre deux tentatives (secondes)
+            max_attempts: Nombre de tentatives avant abandon (0: illimité)
+        """
+        self.initial_delay = float(initial_delay)
+        self.max_delay = float(max_delay)
+        self.max_attempts = int(max_attempts)
+        self.state = "closed"
+        self.reason = None
+        self.attempts = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    @property
+    def is_open(self):
+        """True si les appels à NetLogo doivent échouer immédiatement"""
+        return self.state == "open"
+
+    def add_listener(self, callback):
+        """
+        Enregistre callback(reason), appelé une fois à chaque ouverture du circuit
+
+        Le callback est appelé depuis le thread qui a constaté l'erreur (souvent
+        l'acteur NetLogo): une interface Tk doit le replanifier sur son propre thread.
+        """
+        self._listeners.append(callback)
+
+    def trip(self, error):
+        """
+        Ouvre le circuit après une erreur JVM (sans effet s'il est déjà ouvert)
+
+        Args:
+            error: Exception ou message à l'origine de l'ouverture
+
+        Returns:
+            bool: True si cet appel a ouvert le circuit
+        """
+        with self._lock:
+            if self.state == "open":
+                return False
+            self.state = "open"
+            self.reason = str(error)
+            self.opened_at = time.monotonic()
+
+        print(f"Erreur critique: JVM fermée ({self.reason}). Appels NetLogo suspendus jusqu'à reconnexion.")
+        for callback in list(self._listeners):
+            try:
+                callback(self.reason)
+            except Exception as e:
+                print(f"Erreur dans un écouteur du disjoncteur JVM: {e}")
+        return True
+
+    def reset(self):
+        """Referme le circuit (connexion rétablie)"""
+        with self._lock:
+            self.state = "closed"
+            self.reason = None
+            self.attempts = 0
+            self.opened_at = None
+
+    def next_delay(self):
+        """
+        Retourne le délai avant la prochaine tentative de reconnexion
+
+        Returns:
+            float: Délai en secondes, ou None si le nombre de tentatives est épuisé
+        """
+        if self.max_attempts and self.attempts >= self.max_attempts:
+            return None
+        return min(self.max_delay, self.initial_delay * (2 ** self.attempts))
+
+    def attempt(self, connect):
+        """
+        Effectue une tentative de reconnexion, sans attendre
+
+        Args:
+            connect: Fonction sans argument qui recrée le workspace et renvoie True si
+                     NetLogo répond de nouveau
+
+        Returns:
+            bool: True si la connexion est rétablie (circuit refermé)
+        """
+        with self._lock:
+            if self.state == "half_open":
+                # Une tentative est déjà en cours ailleurs
+                return False
+            if self.state == "closed":
+                return True
+            self.state = "half_open"
+            self.attempts += 1
+            attempt_number = self.attempts
+
+        print(f"Tentative de reconnexion à NetLogo ({attempt_number})...")
+        try:
+            connected = bool(connect())
+        except Exception as e:
+            print(f"Échec de la reconnexion: {e}")
+            connected = False
+
+        with self._lock:
+            # Une nouvelle erreur JVM pendant la tentative a déjà rouvert le circuit
+            if connected and self.state == "half_open":
+                self.state = "closed"
+                self.reason = None
+                self.attempts = 0
+                self.opened_at = None
+                print("Connexion à NetLogo rétablie")
+                return True
+            self.state = "open"
+        return False
+
+    def reconnect(self, connect):
+        """
+        Tente de se reconnecter avec attente exponentielle entre les tentatives (bloquant)
+
+        Args:
+            connect: Voir attempt()
+
+        Returns:
+            bool: True si la connexion est rétablie
+        """
+        while self.is_open:
+            delay = self.next_delay()
+            if delay is None:
+                print("Reconnexion abandonnée: redémarrer l'application pour relancer la JVM")
+                return False
+            time.sleep(delay)
+            if self.attempt(connect):
+                return True
+        return self.state == "closed"
+
+# Disjoncteur partagé par le processus (une JVM par processus)
+_jvm_breaker = JVMCircuitBreaker()
+
+def get_jvm_breaker():
+    """Retourne le disjoncteur JVM du processus courant"""
+    return _jvm_breaker
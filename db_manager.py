@@ -1,13 +1,19 @@
 import sqlite3
 import datetime
+import json
 import os
 import pandas as pd
 
 from utils import safe_float, safe_int
 
+# États acceptés par la contrainte CHECK de la table produit
+PRODUCT_STATES = ('Waiting', 'Movement', 'Processing.Product', 'Completed')
+
 class DatabaseManager:
     def __init__(self, db_path= "projet netlogo/simulation_data.db"):
         self.db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), db_path)
+        # Dernière ligne écrite par save_products pour chaque produit (id -> tuple)
+        self._product_rows = {}
         self._create_tables()
     
     def _connect(self):
@@ -21,6 +27,7 @@ class DatabaseManager:
             cursor.execute("PRAGMA foreign_keys = OFF")
             
             # Vider toutes les tables
+            self._product_rows.clear()
             cursor.execute("DELETE FROM production")
             cursor.execute("DELETE FROM snapshot")
             cursor.execute("DELETE FROM produit")
@@ -139,6 +146,84 @@ class DatabaseManager:
                 )
             ''')
             
+            # Réplications (une ligne par run, identifiée par run_id)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS replication (
+                    run_id TEXT PRIMARY KEY,
+                    scenario TEXT,
+                    seed INTEGER,
+                    product_mix TEXT,
+                    launch_interval REAL,
+                    status TEXT,
+                    produits_lances INTEGER,
+                    produits_completes INTEGER,
+                    temps_simule REAL,
+                    ticks INTEGER,
+                    duree_calcul REAL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # KPI détaillés des réplications (temps de cycle par type, utilisation par machine)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS replication_kpi (
+                    id_kpi INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id TEXT,
+                    kpi TEXT,
+                    cle TEXT,
+                    valeur REAL,
+                    effectif INTEGER,
+                    FOREIGN KEY(run_id) REFERENCES replication(run_id)
+                )
+            ''')
+            
+            # Balayages de paramètres: un point par (mix produit, intervalle de lancement)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sweep_point (
+                    sweep TEXT,
+                    point_key TEXT,
+                    product_mix TEXT,
+                    launch_interval REAL,
+                    replications INTEGER,
+                    status TEXT DEFAULT 'pending',
+                    produits_completes_moyen REAL,
+                    temps_simule_moyen REAL,
+                    temps_cycle_moyen REAL,
+                    utilisation_moyenne REAL,
+                    debit_moyen REAL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY(sweep, point_key)
+                )
+            ''')
+            
+            # Statistiques des appels NetLogo par modèle de requête, une ligne par période
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS netlogo_call_stats (
+                    id_stat INTEGER PRIMARY KEY AUTOINCREMENT,
+                    simulation_id INTEGER,
+                    type TEXT,
+                    modele TEXT,
+                    appels INTEGER,
+                    erreurs INTEGER,
+                    temps_total_ms REAL,
+                    temps_moyen_ms REAL,
+                    p50_ms REAL,
+                    p95_ms REAL,
+                    p99_ms REAL,
+                    max_ms REAL,
+                    ticks INTEGER,
+                    appels_par_tick REAL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY(simulation_id) REFERENCES simulation(id_simulation)
+                )
+            ''')
+            
+            # Index des agrégats du tableau de bord (GROUP BY et filtres sur des milliers de produits)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_produit_etat ON produit(etat)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_produit_type ON produit(type)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_completed_products_type ON completed_products(type, temps_cycle)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_netlogo_call_stats_simulation ON netlogo_call_stats(simulation_id)")
+            
             conn.commit()
     
     def execute(self, query, params=()):
@@ -356,6 +441,93 @@ class DatabaseManager:
             traceback.print_exc()  # Afficher la trace complète de l'erreur
             return None
     
+    def save_products(self, products):
+        """
+        Enregistre l'état de nombreux produits en une seule transaction
+        
+        Seuls les produits dont la ligne a changé depuis le dernier appel sont écrits:
+        avec des milliers de produits, la plupart n'ont pas bougé entre deux rafraîchissements.
+        
+        Args:
+            products: Liste de dictionnaires (mêmes clés que save_product)
+        
+        Returns:
+            int: Nombre de produits écrits
+        """
+        rows = []
+        for product_data in products:
+            who = safe_int(product_data.get("who", -1), -1)
+            if who < 0:
+                continue
+            
+            state = str(product_data.get("state", "Waiting"))
+            if state not in PRODUCT_STATES:
+                state = "Waiting"
+            
+            row = (
+                who,
+                str(product_data.get("type", "")),
+                state,
+                safe_int(product_data.get("sequence.order", 0), 0),
+                str(product_data.get("operations", "[]")),
+                str(product_data.get("next.operation", "")),
+                safe_float(product_data.get("start.time", 0), 0.0),
+                safe_float(product_data.get("end.time", 0), 0.0),
+                safe_int(product_data.get("last.node", 0), 0),
+                safe_int(product_data.get("next.node", 0), 0),
+                str(product_data.get("workstation", "")),
+                safe_int(product_data.get("next.status", 0), 0),
+                safe_float(product_data.get("remaining.time", 0), 0.0)
+            )
+            if self._product_rows.get(who) != row:
+                rows.append(row)
+        
+        if not rows:
+            return 0
+        
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO produit (id_produit, type, etat, sequence_order, operations, operation_suivante,
+                                                    heure_debut, heure_fin, dernier_noeud, prochain_noeud,
+                                                    poste_travail, statut_suivant, temps_restant)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                conn.commit()
+        except Exception as e:
+            print(f"Erreur SQLite lors de l'enregistrement de {len(rows)} produits: {e}")
+            self._product_rows.clear()
+            return 0
+        
+        for row in rows:
+            self._product_rows[row[0]] = row
+        return len(rows)
+    
+    def clear_products(self):
+        """Vide la table des produits actifs (nouvelle simulation)"""
+        self._product_rows.clear()
+        self.execute("DELETE FROM produit")
+    
+    def delete_products(self, product_ids):
+        """
+        Supprime des produits de la table des produits actifs
+        
+        Args:
+            product_ids: IDs (who NetLogo) des produits à supprimer
+        """
+        product_ids = [(int(product_id),) for product_id in product_ids]
+        if not product_ids:
+            return
+        
+        for (product_id,) in product_ids:
+            self._product_rows.pop(product_id, None)
+        
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("DELETE FROM produit WHERE id_produit = ?", product_ids)
+            conn.commit()
+    
     def save_production(self, machine_id, product_id, operation, start_time, end_time):
         """Enregistre une opération de production"""
         
@@ -430,6 +602,288 @@ class DatabaseManager:
             system_state.get("down_machines", 0)
         ))
     
+    def save_snapshots(self, simulation_id, samples):
+        """
+        Enregistre une série d'instantanés en une seule transaction
+        
+        Args:
+            simulation_id: ID de la simulation
+            samples: Liste de dicts (tick ou simulated_time, et champs de save_snapshot)
+        """
+        rows = [
+            (
+                simulation_id,
+                sample.get("tick", sample.get("simulated_time", 0)),
+                sample.get("waiting_products", 0),
+                sample.get("in_progress_products", 0),
+                sample.get("completed_products", 0),
+                sample.get("idle_machines", 0),
+                sample.get("processing_machines", 0),
+                sample.get("down_machines", 0)
+            )
+            for sample in samples
+        ]
+        if not rows:
+            return
+        
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO snapshot (
+                    simulation_id, tick, 
+                    nombre_produits_waiting, nombre_produits_in_progress, nombre_produits_completed,
+                    nombre_machines_idle, nombre_machines_processing, nombre_machines_down
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+    
+    def save_replication_result(self, result):
+        """
+        Enregistre les KPI d'une réplication (voir replications.run_scenario)
+        
+        Args:
+            result: Dictionnaire de résultats, identifié par result["run_id"]
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO replication (
+                    run_id, scenario, seed, product_mix, launch_interval, status,
+                    produits_lances, produits_completes, temps_simule, ticks, duree_calcul
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                result["run_id"],
+                result.get("scenario"),
+                safe_int(result.get("seed")),
+                json.dumps(result.get("product_mix", {}), sort_keys=True),
+                safe_float(result.get("launch_interval")),
+                result.get("status"),
+                safe_int(result.get("products_launched")),
+                safe_int(result.get("products_completed")),
+                safe_float(result.get("simulated_time")),
+                safe_int(result.get("ticks")),
+                safe_float(result.get("elapsed"))
+            ))
+            
+            cursor.execute("DELETE FROM replication_kpi WHERE run_id = ?", (result["run_id"],))
+            cycle_counts = result.get("cycle_counts", {})
+            rows = [
+                (result["run_id"], "cycle_time", product_type, safe_float(value), safe_int(cycle_counts.get(product_type)))
+                for product_type, value in result.get("cycle_times", {}).items()
+            ] + [
+                (result["run_id"], "utilization", machine_name, safe_float(value), None)
+                for machine_name, value in result.get("utilization", {}).items()
+            ]
+            cursor.executemany("""
+                INSERT INTO replication_kpi (run_id, kpi, cle, valeur, effectif)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+    
+    def save_call_stats(self, simulation_id, rows, ticks):
+        """
+        Enregistre les statistiques d'appels NetLogo d'une période (voir call_stats.CallStats.flush)
+        
+        Args:
+            simulation_id: ID de la simulation
+            rows: Liste de dicts renvoyée par CallStats.summary (plus une ligne de type
+                  "total" pour l'ensemble des appels de la période)
+            ticks: Ticks exécutés pendant la période
+        """
+        values = [
+            (
+                simulation_id, row["kind"], row["template"], row["calls"], row["errors"],
+                row["total_ms"], row["mean_ms"], row["p50_ms"], row["p95_ms"], row["p99_ms"], row["max_ms"],
+                ticks, row["calls_per_tick"]
+            )
+            for row in rows
+        ]
+        if not values:
+            return
+        
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO netlogo_call_stats (
+                    simulation_id, type, modele, appels, erreurs, temps_total_ms, temps_moyen_ms,
+                    p50_ms, p95_ms, p99_ms, max_ms, ticks, appels_par_tick
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, values)
+            conn.commit()
+    
+    def get_call_stats_summary(self, simulation_id=None):
+        """
+        Retourne le cumul des statistiques d'appels NetLogo par modèle de requête,
+        les plus coûteux en premier
+        
+        Args:
+            simulation_id: ID de la simulation (None: toutes les simulations)
+        
+        Returns:
+            pd.DataFrame: type, modele, appels, erreurs, temps_total_ms, temps_moyen_ms,
+                          max_ms, appels_par_tick
+        """
+        condition = "simulation_id = ?" if simulation_id is not None else "1 = 1"
+        params = (simulation_id,) * 2 if simulation_id is not None else ()
+        # Ticks de toutes les périodes (lignes "total"), y compris celles où un modèle n'a pas été appelé
+        return self.fetch_df(f"""
+            SELECT type, modele, SUM(appels) AS appels, SUM(erreurs) AS erreurs,
+                   SUM(temps_total_ms) AS temps_total_ms,
+                   SUM(temps_total_ms) / SUM(appels) AS temps_moyen_ms,
+                   MAX(max_ms) AS max_ms,
+                   SUM(appels) * 1.0 / NULLIF((
+                       SELECT SUM(ticks) FROM netlogo_call_stats WHERE type = 'total' AND {condition}
+                   ), 0) AS appels_par_tick
+            FROM netlogo_call_stats
+            WHERE type != 'total' AND {condition}
+            GROUP BY type, modele
+            ORDER BY temps_total_ms DESC
+        """, params)
+    
+    def get_replication_results(self, scenario=None):
+        """
+        Récupère les réplications enregistrées
+        
+        Args:
+            scenario: Nom du scénario (toutes les réplications si None)
+            
+        Returns:
+            DataFrame: Une ligne par réplication
+        """
+        if scenario is None:
+            return self.fetch_df("SELECT * FROM replication ORDER BY scenario, seed")
+        return self.fetch_df("SELECT * FROM replication WHERE scenario = ? ORDER BY seed", (scenario,))
+    
+    def get_completed_run_ids(self, run_ids):
+        """
+        Filtre les réplications déjà terminées avec succès
+        
+        Args:
+            run_ids: Identifiants de réplication à vérifier
+            
+        Returns:
+            set: Identifiants présents dans la table replication avec le statut "completed"
+        """
+        run_ids = list(run_ids)
+        completed = set()
+        # Requêtes par paquets pour rester sous la limite de paramètres de SQLite
+        for start in range(0, len(run_ids), 500):
+            batch = run_ids[start:start + 500]
+            placeholders = ", ".join("?" for _ in batch)
+            rows = self.fetch_all(
+                f"SELECT run_id FROM replication WHERE status = 'completed' AND run_id IN ({placeholders})",
+                tuple(batch)
+            )
+            completed.update(row[0] for row in rows)
+        return completed
+    
+    def get_replication_aggregates(self, run_ids):
+        """
+        Agrège les KPI d'un ensemble de réplications terminées
+        
+        Args:
+            run_ids: Identifiants des réplications à agréger
+            
+        Returns:
+            dict: Moyennes des produits complétés, du temps simulé, du temps de cycle
+                  (pondéré par le nombre de produits), de l'utilisation et du débit
+        """
+        run_ids = list(run_ids)
+        aggregates = {
+            "products_completed": 0.0,
+            "simulated_time": 0.0,
+            "cycle_time": 0.0,
+            "utilization": 0.0,
+            "throughput": 0.0,
+        }
+        if not run_ids:
+            return aggregates
+        
+        placeholders = ", ".join("?" for _ in run_ids)
+        params = tuple(run_ids)
+        
+        row = self.fetch_one(f"""
+            SELECT AVG(produits_completes), AVG(temps_simule),
+                   AVG(CASE WHEN temps_simule > 0 THEN produits_completes / temps_simule ELSE 0 END)
+            FROM replication
+            WHERE status = 'completed' AND run_id IN ({placeholders})
+        """, params)
+        if row:
+            aggregates["products_completed"] = safe_float(row[0])
+            aggregates["simulated_time"] = safe_float(row[1])
+            aggregates["throughput"] = safe_float(row[2])
+        
+        row = self.fetch_one(f"""
+            SELECT SUM(valeur * effectif) / NULLIF(SUM(effectif), 0)
+            FROM replication_kpi
+            WHERE kpi = 'cycle_time' AND run_id IN ({placeholders})
+        """, params)
+        if row:
+            aggregates["cycle_time"] = safe_float(row[0])
+        
+        row = self.fetch_one(f"""
+            SELECT AVG(valeur)
+            FROM replication_kpi
+            WHERE kpi = 'utilization' AND run_id IN ({placeholders})
+        """, params)
+        if row:
+            aggregates["utilization"] = safe_float(row[0])
+        
+        return aggregates
+    
+    def register_sweep_points(self, sweep, points, replications):
+        """
+        Enregistre les points d'un balayage (les points déjà connus sont conservés)
+        
+        Args:
+            sweep: Nom du balayage
+            points: Liste de dicts (point_key, product_mix, launch_interval)
+            replications: Nombre de réplications par point
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT OR IGNORE INTO sweep_point (sweep, point_key, product_mix, launch_interval, replications)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (sweep, point["point_key"], json.dumps(point["product_mix"], sort_keys=True),
+                 safe_float(point["launch_interval"]), int(replications))
+                for point in points
+            ])
+            conn.commit()
+    
+    def get_done_sweep_points(self, sweep):
+        """Retourne les clés des points du balayage déjà terminés"""
+        rows = self.fetch_all("SELECT point_key FROM sweep_point WHERE sweep = ? AND status = 'done'", (sweep,))
+        return {row[0] for row in rows}
+    
+    def save_sweep_point_result(self, sweep, point_key, aggregates):
+        """
+        Enregistre les agrégats d'un point et le marque comme terminé
+        
+        Args:
+            sweep: Nom du balayage
+            point_key: Clé du point
+            aggregates: Dictionnaire renvoyé par get_replication_aggregates
+        """
+        self.execute("""
+            UPDATE sweep_point
+            SET status = 'done', produits_completes_moyen = ?, temps_simule_moyen = ?,
+                temps_cycle_moyen = ?, utilisation_moyenne = ?, debit_moyen = ?,
+                timestamp = CURRENT_TIMESTAMP
+            WHERE sweep = ? AND point_key = ?
+        """, (
+            aggregates["products_completed"], aggregates["simulated_time"], aggregates["cycle_time"],
+            aggregates["utilization"], aggregates["throughput"], sweep, point_key
+        ))
+    
+    def get_sweep_results(self, sweep):
+        """Retourne les points d'un balayage et leurs agrégats sous forme de DataFrame"""
+        return self.fetch_df("SELECT * FROM sweep_point WHERE sweep = ? ORDER BY point_key", (sweep,))
+    
     def get_machine_utilization(self, sim_time_override=None):
         """Calcule le taux d'utilisation des machines en utilisant le temps réel de simulation"""
         # Vérifier d'abord si un temps de simulation a été fourni en paramètre
@@ -590,17 +1044,8 @@ class DatabaseManager:
                     
                     result_df = pd.DataFrame(result_list)
             
-            # Afficher des informations détaillées pour le débogage
-            raw_times = self.fetch_all("""
-                SELECT id_produit, type, heure_debut, heure_fin, temps_cycle
-                FROM completed_products
-                ORDER BY type, id_produit
-            """)
-            
-            print("Données brutes des temps de cycle des produits complétés:")
-            for prod in raw_times:
-                prod_id, prod_type, start, end, cycle = prod
-                print(f"  ID: {prod_id}, Type: {prod_type}, Début: {start}, Fin: {end}, Cycle: {cycle:.2f}")
+            # Résumé par type pour le débogage (une ligne par type, pas par produit)
+            print(f"Temps de cycle calculés sur {count} produits complétés")
             
             if not result_df.empty:
                 print("Utilisation des temps de cycle réels:")
@@ -647,7 +1092,7 @@ class DatabaseManager:
     def get_production_efficiency(self, total_products_created=None):
         """
         Calcule l'efficacité de production selon la formule:
-        (nombre de produits complétés réels) / nombre de produit théorique
+        (nombre de produits complétés réels) / nombre de produits lancés
         
         Args:
             total_products_created: Nombre total de produits créés lors du lancement
@@ -655,15 +1100,12 @@ class DatabaseManager:
         Returns:
             dict: Informations sur l'efficacité de production
         """
-        # Constante: capacité théorique fixée à 20
-        CAPACITE_THEORIQUE = 20
-        
         if total_products_created is None or total_products_created <= 0:
             total_products_created = 0
             print("Aucun produit créé - efficacité à 0%")
             return {
                 "completed": 0,
-                "total": CAPACITE_THEORIQUE,
+                "total": 0,
                 "efficiency": 0,
                 "sim_time": 0
             }
@@ -688,7 +1130,7 @@ class DatabaseManager:
         sim_time = 1.0 if not sim_time_result or not sim_time_result[0] else max(float(sim_time_result[0]), 1.0)
         
         # Calculer l'efficacité avec le nombre réel de produits complétés
-        efficiency = (total_completed_products / CAPACITE_THEORIQUE) * 100 if CAPACITE_THEORIQUE > 0 else 0
+        efficiency = (total_completed_products / total_products_created) * 100
         
         # Limiter l'efficacité à 100% maximum
         efficiency = min(efficiency, 100)
@@ -696,7 +1138,7 @@ class DatabaseManager:
         return {
             "completed": total_completed_products,
             "completed_with_cycle": completed_products_with_cycle,
-            "total": CAPACITE_THEORIQUE,
+            "total": total_products_created,
             "efficiency": efficiency,
             "sim_time": sim_time
         }
@@ -756,7 +1198,7 @@ class DatabaseManager:
     def clear_simulation_data(self):
         """Efface les données temporaires de la simulation en cours"""
         try:
-            self.execute("DELETE FROM produit")
+            self.clear_products()
             self.execute("DELETE FROM machine")
             self.execute("DELETE FROM production")
             print("Données temporaires de simulation effacées")
@@ -940,4 +1382,68 @@ class DatabaseManager:
             print(f"Erreur lors de la sauvegarde du produit complété {product_id}: {e}")
             import traceback
             traceback.print_exc()
-            return None
\ No newline at end of file
+            return None
+    
+    def save_completed_products(self, products, simulation_id=None):
+        """
+        Sauvegarde en une seule transaction les produits complétés d'un rafraîchissement
+        
+        Les produits non complétés (mêmes règles que save_completed_product) sont ignorés
+        sans message. Ceux dont le cycle ne peut pas être calculé à partir des données
+        fournies passent par save_completed_product, qui le cherche dans la table produit.
+        
+        Un produit déjà enregistré garde sa simulation et son horodatage: seules les
+        colonnes de complétion sont mises à jour, comme dans save_completed_product.
+        
+        Args:
+            products: Liste de dictionnaires produits (clés de get_products_state)
+            simulation_id: ID de la simulation (None: dernière simulation enregistrée)
+            
+        Returns:
+            int: Nombre de produits complétés enregistrés
+        """
+        rows = []
+        fallback = []
+        for product_data in products:
+            who = safe_int(product_data.get("who", -1), -1)
+            if who < 0:
+                continue
+            
+            start_time = safe_float(product_data.get("start.time", 0), 0.0)
+            end_time = safe_float(product_data.get("end.time", 0), 0.0)
+            is_completed = (
+                str(product_data.get("state", "")).lower() == "completed"
+                or end_time > 0
+                or (product_data.get("operations") and not product_data.get("next.operation"))
+            )
+            if not is_completed:
+                continue
+            
+            if end_time > start_time:
+                rows.append((who, str(product_data.get("type", "")), start_time, end_time, end_time - start_time))
+            else:
+                fallback.append(product_data)
+        
+        if rows:
+            if simulation_id is None:
+                simulation_id = self.fetch_one("SELECT MAX(id_simulation) FROM simulation")[0] or 1
+            try:
+                with self._connect() as conn:
+                    cursor = conn.cursor()
+                    cursor.executemany("""
+                        INSERT INTO completed_products (id_produit, type, heure_debut, heure_fin, temps_cycle, simulation_id)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(id_produit) DO UPDATE SET
+                            type = excluded.type, heure_debut = excluded.heure_debut,
+                            heure_fin = excluded.heure_fin, temps_cycle = excluded.temps_cycle
+                    """, [row + (simulation_id,) for row in rows])
+                    conn.commit()
+            except Exception as e:
+                print(f"Erreur lors de la sauvegarde de {len(rows)} produits complétés: {e}")
+                rows = []
+        
+        saved = len(rows)
+        for product_data in fallback:
+            if self.save_completed_product(product_data, str(product_data.get("type", ""))) is not None:
+                saved += 1
+        return saved
\ No newline at end of file
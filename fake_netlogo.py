@@ -0,0 +1,961 @@
+"""
+Faux NetLogoLink en Python pur: mesures de performance et essais sans JVM ni Alpha.nlogo
+
+Une usine synthétique (noeuds, machines, produits et variables globales du modèle Alpha)
+répond aux reporters et commandes envoyés par netlogo_utils, netlogo_helpers et
+NetLogoConnector. Les chaînes sont compilées une fois par un interpréteur d'un
+sous-ensemble de NetLogo (of, with, count, list, item, ifelse-value, set, repeat...);
+une latence artificielle par appel permet de mesurer les gains en allers-retours.
+"""
+import json
+import random
+import re
+import time
+
+from stepping import IDLE_COMPLETION, TICK_TIME
+
+# Machines du modèle Alpha (Set.Machines): nom, opérations, temps, xcor, ycor, heading
+ALPHA_MACHINES = [
+    ("M1", ["O8", "O9"], [10, 10], 115, 117, 180),
+    ("M2", ["O1", "O2", "O4"], [20, 20, 20], 193, 117, 180),
+    ("M3", ["O1", "O2", "O5"], [20, 20, 20], 226, 55.4, 0),
+    ("M4", ["O3", "O4", "O5"], [20, 20, 20], 188, 28, 0),
+    ("M5", ["O6"], [5], 110, 28, 0),
+    ("M6", ["O7"], [60], 28.5, 28, 0),
+    ("M7", ["O1", "O2", "O3", "O4"], [20, 20, 20, 20], 28.5, 117, 180),
+]
+
+# Gammes des produits du modèle Alpha (AgregateOperations)
+ALPHA_ROUTINGS = {
+    "B": ["O8", "O1", "O1", "O1", "O2", "O2", "O3", "O5", "O9"],
+    "E": ["O8", "O1", "O1", "O1", "O2", "O2", "O4", "O9"],
+    "L": ["O8", "O1", "O1", "O1", "O3", "O3", "O5", "O5", "O9"],
+    "T": ["O8", "O1", "O1", "O2", "O4", "O9"],
+    "A": ["O8", "O1", "O1", "O1", "O2", "O4", "O3", "O5", "O9"],
+    "I": ["O8", "O1", "O1", "O3", "O5", "O9"],
+    "P": ["O8", "O1", "O1", "O2", "O4", "O9"],
+}
+
+# Tortues créées avant les machines dans Alpha: les machines gardent les IDs 186 à 192
+ALPHA_NODE_COUNT = 186
+
+# Next.Completion des machines juste après setup
+SETUP_COMPLETION = 1000000000
+
+BREED_SINGULAR = {"nodes": "node", "machines": "machine", "products": "product"}
+
+_TOKEN_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]()]|[^\s\[\]()"]+')
+_NUMBER_PATTERN = re.compile(r'-?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$')
+
+# Opérateurs infixes et leur priorité (la plus forte en dernier)
+_INFIX = {
+    "or": 1, "xor": 1, "and": 2,
+    "=": 3, "!=": 3, "<": 3, ">": 3, "<=": 3, ">=": 3,
+    "+": 4, "-": 4, "*": 5, "/": 5, "^": 6,
+}
+
+class FakeNetLogoError(Exception):
+    """Erreur de compilation ou d'exécution NetLogo simulée (équivalent de NetLogoException)"""
+
+class FakeTurtle:
+    """Tortue de l'usine synthétique: race, who et variables (noms en minuscules)"""
+    __slots__ = ("who", "breed", "vars", "alive", "travel", "current")
+
+    def __init__(self, who, breed, variables):
+        self.who = who
+        self.breed = breed
+        self.vars = variables
+        self.alive = True
+        # Ticks de convoyage restants (produits) et produit en cours (machines)
+        self.travel = 0
+        self.current = None
+
+    def __repr__(self):
+        return f"({BREED_SINGULAR.get(self.breed, 'turtle')} {self.who})"
+
+class AgentSet:
+    """Ensemble de tortues; breed est renseigné quand l'ensemble est une race entière"""
+    __slots__ = ("agents", "breed")
+
+    def __init__(self, agents, breed=None):
+        self.agents = agents
+        self.breed = breed
+
+    def __repr__(self):
+        return self.breed or "(agentset)"
+
+class _Context:
+    """Contexte d'évaluation: tortue courante (None pour l'observateur) et variables locales"""
+    __slots__ = ("agent", "locals")
+
+    def __init__(self, agent=None, local_variables=None):
+        self.agent = agent
+        self.locals = {} if local_variables is None else local_variables
+
+    def child(self, agent):
+        return _Context(agent, self.locals)
+
+def _equal(left, right):
+    if isinstance(left, AgentSet) and isinstance(right, AgentSet):
+        if left.breed is not None and right.breed is not None:
+            return left.breed == right.breed
+        return {agent.who for agent in left.agents} == {agent.who for agent in right.agents}
+    if isinstance(left, bool) or isinstance(right, bool):
+        return left is right
+    return left == right
+
+def _binary(operator, left, right):
+    """Compile un opérateur infixe"""
+    if operator == "and":
+        return lambda ctx: bool(left(ctx)) and bool(right(ctx))
+    if operator == "or":
+        return lambda ctx: bool(left(ctx)) or bool(right(ctx))
+    if operator == "xor":
+        return lambda ctx: bool(left(ctx)) != bool(right(ctx))
+    if operator == "=":
+        return lambda ctx: _equal(left(ctx), right(ctx))
+    if operator == "!=":
+        return lambda ctx: not _equal(left(ctx), right(ctx))
+
+    functions = {
+        "<": lambda a, b: a < b,
+        ">": lambda a, b: a > b,
+        "<=": lambda a, b: a <= b,
+        ">=": lambda a, b: a >= b,
+        "+": lambda a, b: a + b,
+        "-": lambda a, b: a - b,
+        "*": lambda a, b: a * b,
+        "/": lambda a, b: a / b,
+        "^": lambda a, b: a ** b,
+    }
+    function = functions[operator]
+    return lambda ctx: function(left(ctx), right(ctx))
+
+def _agents(value):
+    if isinstance(value, AgentSet):
+        return value.agents
+    raise FakeNetLogoError(f"Ensemble d'agents attendu, reçu {value!r}")
+
+def _sentence(*values):
+    result = []
+    for value in values:
+        if isinstance(value, list):
+            result.extend(value)
+        else:
+            result.append(value)
+    return result
+
+def _to_string(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _position(item, values):
+    for index, value in enumerate(values):
+        if _equal(value, item):
+            return float(index)
+    return False
+
+# Reporters préfixes: nom -> (nombre d'arguments, fonction)
+_REPORTERS = {
+    "count": (1, lambda agents: float(len(_agents(agents)))),
+    "any?": (1, lambda agents: bool(_agents(agents))),
+    "not": (1, lambda value: not value),
+    "length": (1, lambda values: float(len(values))),
+    "first": (1, lambda values: values[0]),
+    "last": (1, lambda values: values[-1]),
+    "but-first": (1, lambda values: values[1:]),
+    "item": (2, lambda index, values: values[int(index)]),
+    "empty?": (1, lambda values: len(values) == 0),
+    "member?": (2, lambda item, values: _position(item, values) is not False),
+    "position": (2, _position),
+    "is-list?": (1, lambda value: isinstance(value, list)),
+    "is-string?": (1, lambda value: isinstance(value, str)),
+    "is-number?": (1, lambda value: isinstance(value, (int, float)) and not isinstance(value, bool)),
+    "is-turtle?": (1, lambda value: isinstance(value, FakeTurtle) and value.alive),
+    "is-agentset?": (1, lambda value: isinstance(value, AgentSet)),
+    "min": (1, min),
+    "max": (1, max),
+    "sum": (1, lambda values: float(sum(values))),
+    "mean": (1, lambda values: sum(values) / len(values)),
+    "abs": (1, abs),
+    "round": (1, lambda value: float(round(value))),
+    "precision": (2, lambda value, places: round(value, int(places))),
+    "list": (2, lambda first, second: [first, second]),
+    "sentence": (2, _sentence),
+    "word": (2, lambda first, second: _to_string(first) + _to_string(second)),
+}
+
+# Reporters acceptant un nombre variable d'arguments entre parenthèses: (list a b c)
+_VARIADIC = {
+    "list": lambda *values: list(values),
+    "sentence": _sentence,
+    "word": lambda *values: "".join(_to_string(value) for value in values),
+}
+
+def _export(value):
+    """Convertit une valeur interne en valeur renvoyée à Python (comme pynetlogo)"""
+    if isinstance(value, list):
+        return [_export(item) for item in value]
+    if isinstance(value, (FakeTurtle, AgentSet)):
+        return repr(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+def _count_values(value):
+    """Nombre de valeurs scalaires d'un résultat (pour la latence par valeur)"""
+    if isinstance(value, list):
+        return sum(_count_values(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_count_values(item) for item in value.values())
+    return 1
+
+class _Compiler:
+    """Compile une chaîne NetLogo (reporter ou commandes) en fonctions Python"""
+    def __init__(self, factory, tokens):
+        self.factory = factory
+        self.tokens = tokens
+        self.position = 0
+
+    @classmethod
+    def from_source(cls, factory, source):
+        return cls(factory, _TOKEN_PATTERN.findall(source))
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def peek_lower(self):
+        token = self.peek()
+        return token.lower() if token is not None else None
+
+    def next(self):
+        token = self.peek()
+        if token is None:
+            raise FakeNetLogoError("Fin d'expression inattendue")
+        self.position += 1
+        return token
+
+    def expect(self, expected):
+        token = self.next()
+        if token != expected:
+            raise FakeNetLogoError(f"'{expected}' attendu, '{token}' trouvé")
+
+    def at_end(self):
+        return self.position >= len(self.tokens)
+
+    def block(self):
+        """Lit un bloc [ ... ] et retourne un compilateur sur son contenu"""
+        self.expect("[")
+        start = self.position
+        depth = 1
+        while depth:
+            token = self.next()
+            if token == "[":
+                depth += 1
+            elif token == "]":
+                depth -= 1
+        return _Compiler(self.factory, self.tokens[start:self.position - 1])
+
+    # Reporters
+
+    def reporter(self):
+        """Programme reporter: "let" facultatifs puis une expression"""
+        bindings = []
+        while self.peek_lower() == "let":
+            self.next()
+            name = self.next().lower()
+            bindings.append((name, self.expression()))
+
+        expression = self.expression()
+        if not self.at_end():
+            raise FakeNetLogoError(f"Fin de reporter attendue, '{self.peek()}' trouvé")
+        if not bindings:
+            return expression
+
+        def run(ctx):
+            for name, value in bindings:
+                ctx.locals[name] = value(ctx)
+            return expression(ctx)
+        return run
+
+    def expression(self, min_precedence=1):
+        left = self.postfix()
+        while True:
+            operator = self.peek_lower()
+            precedence = _INFIX.get(operator)
+            if precedence is None or precedence < min_precedence:
+                return left
+            self.next()
+            left = _binary(operator, left, self.expression(precedence + 1))
+
+    def postfix(self):
+        node = self.primary()
+        while self.peek_lower() == "with":
+            self.next()
+            node = self._with(node, self.block().reporter())
+        return node
+
+    def primary(self):
+        token = self.next()
+        lower = token.lower()
+
+        if token == "(":
+            if self.peek_lower() in _VARIADIC:
+                function = _VARIADIC[self.next().lower()]
+                arguments = []
+                while self.peek() != ")":
+                    arguments.append(self.expression())
+                self.expect(")")
+                return lambda ctx: function(*[argument(ctx) for argument in arguments])
+            node = self.expression()
+            self.expect(")")
+            return node
+
+        if token == "[":
+            self.position -= 1
+            block = self.block()
+            if self.peek_lower() == "of":
+                self.next()
+                return self._of(block.reporter(), self.postfix())
+            value = block.literal()
+            return lambda ctx: list(value)
+
+        if token.startswith('"'):
+            value = json.loads(token)
+            return lambda ctx: value
+        if _NUMBER_PATTERN.match(token):
+            value = float(token)
+            return lambda ctx: value
+        if lower in ("true", "false"):
+            value = lower == "true"
+            return lambda ctx: value
+        if lower == "nobody":
+            return lambda ctx: None
+
+        if lower in ("ifelse-value", "ifelse"):
+            condition = self.expression()
+            if_true = self.block().reporter()
+            if_false = self.block().reporter()
+            return lambda ctx: if_true(ctx) if condition(ctx) else if_false(ctx)
+
+        factory = self.factory
+        if lower == "turtle" or lower in factory.singular_breeds:
+            breed = factory.singular_breeds.get(lower)
+            argument = self.postfix()
+            return lambda ctx: factory.turtle(argument(ctx), breed)
+
+        if lower in _REPORTERS:
+            arity, function = _REPORTERS[lower]
+            arguments = [self.postfix() for _ in range(arity)]
+            if arity == 1:
+                argument = arguments[0]
+                return lambda ctx: function(argument(ctx))
+            return lambda ctx: function(*[argument(ctx) for argument in arguments])
+
+        if lower == "ticks":
+            return lambda ctx: factory.ticks
+        if lower == "who":
+            return lambda ctx: float(ctx.agent.who)
+        if lower == "breed":
+            return lambda ctx: factory.breed_set(ctx.agent.breed)
+        if lower == "turtles":
+            return lambda ctx: AgentSet(factory.all_turtles(), "turtles")
+        if lower in factory.breeds:
+            return lambda ctx: factory.breed_set(lower)
+        if lower in factory.reporter_procedures:
+            procedure = factory.reporter_procedures[lower]
+            return lambda ctx: procedure()
+
+        return self._variable(lower)
+
+    def literal(self):
+        """Liste littérale: [1 2 "a" [3]]"""
+        values = []
+        while not self.at_end():
+            token = self.peek()
+            if token == "[":
+                values.append(self.block().literal())
+                continue
+            self.next()
+            if token.startswith('"'):
+                values.append(json.loads(token))
+            elif _NUMBER_PATTERN.match(token):
+                values.append(float(token))
+            elif token.lower() in ("true", "false"):
+                values.append(token.lower() == "true")
+            else:
+                raise FakeNetLogoError(f"Valeur littérale attendue, '{token}' trouvé")
+        return values
+
+    def _variable(self, name):
+        factory = self.factory
+
+        def lookup(ctx):
+            if name in ctx.locals:
+                return ctx.locals[name]
+            if ctx.agent is not None and name in ctx.agent.vars:
+                return ctx.agent.vars[name]
+            if name in factory.globals:
+                return factory.globals[name]
+            raise FakeNetLogoError(f"Nothing named {name.upper()} has been defined")
+        return lookup
+
+    def _of(self, reporter, target):
+        def run(ctx):
+            subject = target(ctx)
+            if isinstance(subject, AgentSet):
+                return [reporter(ctx.child(agent)) for agent in subject.agents]
+            if isinstance(subject, FakeTurtle) and subject.alive:
+                return reporter(ctx.child(subject))
+            raise FakeNetLogoError("OF expected input to be a turtle agentset or turtle but got NOBODY instead.")
+        return run
+
+    def _with(self, target, condition):
+        def run(ctx):
+            agents = _agents(target(ctx))
+            return AgentSet([agent for agent in agents if condition(ctx.child(agent))])
+        return run
+
+    # Commandes
+
+    def commands(self):
+        statements = []
+        while not self.at_end():
+            statements.append(self.command())
+
+        def run(ctx):
+            for statement in statements:
+                statement(ctx)
+        return run
+
+    def command(self):
+        token = self.next()
+        lower = token.lower()
+        factory = self.factory
+
+        if lower == "set":
+            name = self.next().lower()
+            value = self.expression()
+            return lambda ctx: factory.assign(ctx, name, value(ctx))
+        if lower == "let":
+            name = self.next().lower()
+            value = self.expression()
+            return lambda ctx: ctx.locals.__setitem__(name, value(ctx))
+        if lower == "if":
+            condition = self.expression()
+            body = self.block().commands()
+            return lambda ctx: body(ctx) if condition(ctx) else None
+        if lower == "ifelse":
+            condition = self.expression()
+            if_true = self.block().commands()
+            if_false = self.block().commands()
+            return lambda ctx: if_true(ctx) if condition(ctx) else if_false(ctx)
+        if lower == "repeat":
+            count = self.expression()
+            body = self.block().commands()
+
+            def run_repeat(ctx):
+                for _ in range(int(count(ctx))):
+                    body(ctx)
+            return run_repeat
+        if lower == "ask":
+            target = self.postfix()
+            body = self.block().commands()
+
+            def run_ask(ctx):
+                subject = target(ctx)
+                agents = list(subject.agents) if isinstance(subject, AgentSet) else [subject]
+                for agent in agents:
+                    if isinstance(agent, FakeTurtle) and agent.alive:
+                        body(ctx.child(agent))
+            return run_ask
+
+        if lower in factory.command_procedures:
+            arity, procedure = factory.command_procedures[lower]
+            arguments = [self.postfix() for _ in range(arity)]
+            return lambda ctx: procedure(*[argument(ctx) for argument in arguments])
+
+        raise FakeNetLogoError(f"Nothing named {token.upper()} has been defined")
+
+class FakeFactory:
+    """
+    État et procédures d'une usine synthétique au comportement du modèle Alpha.
+
+    Go enchaîne Moving.Product (fin du convoyage, prise en charge par une machine libre
+    proposant l'opération suivante), Product.Movement (fins d'opération, puis
+    simulated.time + 0.2) et le décompte de Time-for-Possible-launching. Comme dans
+    Alpha, ticks reste à 0 et un produit meurt à la fin de sa dernière opération.
+    """
+    def __init__(self, machines=None, routings=None, node_count=ALPHA_NODE_COUNT, travel_ticks=25, seed=0):
+        """
+        Args:
+            machines: Liste de tuples (nom, opérations, temps, xcor, ycor, heading)
+                      (défaut: machines du modèle Alpha)
+            routings: Dictionnaire {type de produit: liste d'opérations} (défaut: gammes Alpha)
+            node_count: Nombre de noeuds créés avant les machines
+            travel_ticks: Ticks de convoyage entre deux opérations
+            seed: Graine initiale (modifiable par la commande random-seed)
+        """
+        self.machine_specs = list(machines or ALPHA_MACHINES)
+        self.routings = {str(product_type): list(operations)
+                         for product_type, operations in (routings or ALPHA_ROUTINGS).items()}
+        self.node_count = int(node_count)
+        self.travel_ticks = max(1, int(travel_ticks))
+        self.random = random.Random(seed)
+        self.singular_breeds = {singular: breed for breed, singular in BREED_SINGULAR.items()}
+
+        self.command_procedures = {
+            "setup": (0, self.setup),
+            "go": (0, self.go),
+            "moving.product": (0, self.moving_product),
+            "product.movement": (0, self.product_movement),
+            "create.product": (1, self.create_product),
+            "clear-all": (0, self.clear_all),
+            "ca": (0, self.clear_all),
+            "reset-ticks": (0, self.reset_ticks),
+            "tick": (0, self.tick),
+            "random-seed": (1, self.random_seed),
+            "wait": (1, lambda seconds: None),
+            "export-world": (1, self.export_world),
+            "import-world": (1, self.import_world),
+        }
+        self.reporter_procedures = {
+            "system-snapshot": self.system_snapshot,
+        }
+        self.clear_all()
+
+    # Agents et variables
+
+    def clear_all(self):
+        self.globals = {
+            "simulated.time": 0.0,
+            "time-for-possible-launching": 0.0,
+            "mouse-aux": 0.0,
+            "operations": 0.0,
+            "speed": 1.0,
+        }
+        self.breeds = {breed: {} for breed in BREED_SINGULAR}
+        self.next_who = 0
+        self.ticks = 0.0
+        self.completed = 0
+
+    def create_turtle(self, breed, variables):
+        turtle = FakeTurtle(self.next_who, breed, variables)
+        self.breeds[breed][turtle.who] = turtle
+        self.next_who += 1
+        return turtle
+
+    def kill(self, turtle):
+        turtle.alive = False
+        self.breeds[turtle.breed].pop(turtle.who, None)
+
+    def turtle(self, who, breed=None):
+        """Tortue d'ID who (None, c'est-à-dire nobody, si elle n'existe pas)"""
+        who = int(who)
+        for name, turtles in self.breeds.items():
+            if (breed is None or breed == name) and who in turtles:
+                return turtles[who]
+        return None
+
+    def all_turtles(self):
+        return sorted((turtle for turtles in self.breeds.values() for turtle in turtles.values()),
+                      key=lambda turtle: turtle.who)
+
+    def breed_set(self, breed):
+        return AgentSet(list(self.breeds[breed].values()), breed)
+
+    def assign(self, ctx, name, value):
+        """set: variable locale, de la tortue courante ou globale"""
+        if name in ctx.locals:
+            ctx.locals[name] = value
+        elif ctx.agent is not None and name in ctx.agent.vars:
+            ctx.agent.vars[name] = value
+        elif name in self.globals:
+            self.globals[name] = value
+        else:
+            raise FakeNetLogoError(f"Nothing named {name.upper()} has been defined")
+
+    # Procédures du modèle
+
+    def reset_ticks(self):
+        self.ticks = 0.0
+
+    def tick(self):
+        self.ticks += 1.0
+
+    def random_seed(self, seed):
+        self.random.seed(int(seed))
+
+    def setup(self):
+        self.clear_all()
+        self.reset_ticks()
+
+        for index in range(self.node_count):
+            self.create_turtle("nodes", {
+                "addressed.to.node": "",
+                "xcor": float(index % 240),
+                "ycor": float(index // 240),
+                "heading": 0.0,
+            })
+
+        for name, operations, times, xcor, ycor, heading in self.machine_specs:
+            self.create_turtle("machines", {
+                "machine.name": name,
+                "machine.state": "Idle",
+                "next.completion": float(SETUP_COMPLETION),
+                "machine.operations.type": list(operations),
+                "machine.operations.time": [float(value) for value in times],
+                "xcor": float(xcor),
+                "ycor": float(ycor),
+                "heading": float(heading),
+            })
+
+    def create_product(self, product_type):
+        product_type = str(product_type)
+        operations = list(self.routings.get(product_type, []))
+        nodes = list(self.breeds["nodes"].values())
+        first_machine = self._machines_for(operations[0]) if operations else []
+
+        product = self.create_turtle("products", {
+            "product.state": "Movement",
+            "producttype": product_type,
+            "next.product.operation": operations[0] if operations else "",
+            "productoperations": operations,
+            "currentsequenceorder": 0.0,
+            "productplannedstart": [],
+            "productplannedcompletion": [],
+            "productrealstart": [],
+            "productrealcompletion": [],
+            "last.node": nodes[0] if nodes else None,
+            "next.node": nodes[1] if len(nodes) > 1 else None,
+            "heading.workstation": first_machine[0].vars["machine.name"] if first_machine else "",
+            "next.product.status": 0.0,
+            "next.product.completion.time": "",
+            "netlogoturtle-id": float(len(self.breeds["products"])),
+            "speed-factor": 1.0,
+            "priority": 0.0,
+            "platoon-position": -1.0,
+            "xcor": 0.0,
+            "ycor": 0.0,
+            "heading": 0.0,
+            "shape": "0-plate",
+            "color": 98.0,
+            "size": 15.0,
+            "label": "",
+        })
+        product.travel = self.travel_ticks
+
+    def _machines_for(self, operation):
+        return [machine for machine in self.breeds["machines"].values()
+                if operation in machine.vars["machine.operations.type"]]
+
+    def moving_product(self):
+        """Fin du convoyage et prise en charge des produits en attente par une machine libre"""
+        now = self.globals["simulated.time"]
+        for product in list(self.breeds["products"].values()):
+            state = product.vars["product.state"]
+            if state == "Movement":
+                product.travel -= 1
+                if product.travel > 0:
+                    continue
+                product.vars["product.state"] = state = "Waiting"
+            if state != "Waiting":
+                continue
+
+            operations = product.vars["productoperations"]
+            order = int(product.vars["currentsequenceorder"])
+            if order >= len(operations):
+                self.kill(product)
+                self.completed += 1
+                continue
+
+            operation = operations[order]
+            for machine in self._machines_for(operation):
+                if machine.vars["machine.state"] != "Idle":
+                    continue
+                position = machine.vars["machine.operations.type"].index(operation)
+                machine.vars["machine.state"] = "Machine.Processing"
+                machine.vars["next.completion"] = round(now + machine.vars["machine.operations.time"][position], 1)
+                machine.current = product
+                product.vars.update({
+                    "product.state": "Processing.Product",
+                    "heading.workstation": machine.vars["machine.name"],
+                    "next.product.status": 0.0,
+                    "xcor": machine.vars["xcor"],
+                    "ycor": machine.vars["ycor"],
+                    "heading": machine.vars["heading"],
+                })
+                product.vars["productrealstart"].append(now)
+                break
+
+    def product_movement(self):
+        """Fins d'opération (Cheking.Machine.Completion) puis avancement de simulated.time"""
+        now = self.globals["simulated.time"]
+        for machine in self.breeds["machines"].values():
+            if machine.vars["machine.state"] != "Machine.Processing" or machine.vars["next.completion"] > now + 1e-9:
+                continue
+            product = machine.current
+            machine.vars["machine.state"] = "Idle"
+            machine.vars["next.completion"] = float(IDLE_COMPLETION)
+            machine.current = None
+            if product is None or not product.alive:
+                continue
+
+            product.vars["productrealcompletion"].append(now)
+            product.vars["next.product.status"] = 1.0
+            product.vars["next.product.completion.time"] = now
+            order = int(product.vars["currentsequenceorder"]) + 1
+            product.vars["currentsequenceorder"] = float(order)
+            operations = product.vars["productoperations"]
+            if order >= len(operations):
+                self.kill(product)
+                self.completed += 1
+                continue
+            product.vars["next.product.operation"] = operations[order]
+            product.vars["product.state"] = "Movement"
+            product.travel = self.travel_ticks
+
+        self.globals["simulated.time"] = round(now + TICK_TIME, 1)
+
+    def go(self):
+        self.moving_product()
+        self.product_movement()
+        timer = self.globals["time-for-possible-launching"]
+        if timer > 0:
+            self.globals["time-for-possible-launching"] = round(timer - 1, 0)
+
+    def system_snapshot(self):
+        machines = [
+            [machine.vars[name] for name in ("machine.name", "machine.state", "next.completion",
+                                              "machine.operations.type", "machine.operations.time",
+                                              "xcor", "ycor", "heading")]
+            for machine in self.breeds["machines"].values()
+        ]
+        products = [
+            [product.vars[name] for name in ("product.state", "producttype", "next.product.operation",
+                                              "productoperations", "currentsequenceorder",
+                                              "next.product.completion.time", "xcor", "ycor", "heading")]
+            for product in self.breeds["products"].values()
+        ]
+        return [machines, products]
+
+    # Export et import du monde (JSON, lisible seulement par le faux link)
+
+    def export_world(self, path):
+        def encode(value):
+            if isinstance(value, FakeTurtle):
+                return {"turtle": value.who}
+            if isinstance(value, list):
+                return [encode(item) for item in value]
+            return value
+
+        turtles = [
+            {
+                "who": turtle.who,
+                "breed": turtle.breed,
+                "vars": {name: encode(value) for name, value in turtle.vars.items()},
+                "travel": turtle.travel,
+                "current": turtle.current.who if turtle.current is not None else None,
+            }
+            for turtle in self.all_turtles()
+        ]
+        world = {"globals": self.globals, "ticks": self.ticks, "next_who": self.next_who,
+                 "completed": self.completed, "turtles": turtles}
+        with open(str(path), "w", encoding="utf-8") as world_file:
+            json.dump(world, world_file)
+
+    def import_world(self, path):
+        try:
+            with open(str(path), encoding="utf-8") as world_file:
+                world = json.load(world_file)
+        except (OSError, ValueError) as e:
+            raise FakeNetLogoError(f"import-world: fichier illisible ({e})")
+
+        self.clear_all()
+        self.globals.update(world["globals"])
+        self.ticks = world["ticks"]
+        self.completed = world.get("completed", 0)
+        for data in world["turtles"]:
+            turtle = FakeTurtle(data["who"], data["breed"], data["vars"])
+            turtle.travel = data["travel"]
+            self.breeds[data["breed"]][turtle.who] = turtle
+        self.next_who = world["next_who"]
+
+        def decode(value):
+            if isinstance(value, dict) and "turtle" in value:
+                return self.turtle(value["turtle"])
+            if isinstance(value, list):
+                return [decode(item) for item in value]
+            return value
+
+        for data in world["turtles"]:
+            turtle = self.turtle(data["who"])
+            turtle.vars = {name: decode(value) for name, value in turtle.vars.items()}
+            if data["current"] is not None:
+                turtle.current = self.turtle(data["current"])
+
+class FakeNetLogoLink:
+    """
+    Remplaçant de pynetlogo.NetLogoLink (report, command, repeat_report, load_model,
+    kill_workspace) branché sur une FakeFactory au lieu de la JVM.
+
+    Chaque appel attend latency secondes, plus latency_per_value secondes par valeur
+    renvoyée: un reporter groupé paie un aller-retour, N reporters en paient N.
+    """
+    def __init__(self, factory=None, latency=0.0, latency_per_value=0.0, **factory_kwargs):
+        """
+        Args:
+            factory: FakeFactory existante (sinon créée avec factory_kwargs)
+            latency: Latence simulée par appel (secondes)
+            latency_per_value: Latence simulée par valeur renvoyée (secondes)
+            **factory_kwargs: Paramètres de FakeFactory (machines, routings, travel_ticks...)
+        """
+        self.factory = factory or FakeFactory(**factory_kwargs)
+        self.latency = float(latency)
+        self.latency_per_value = float(latency_per_value)
+        self.model_path = None
+        self.closed = False
+        self.jvm_stopped = False
+        self.call_counts = {"report": 0, "command": 0, "repeat_report": 0}
+        # Chaîne NetLogo -> fonction compilée
+        self._reporters = {}
+        self._commands = {}
+
+    def load_model(self, path):
+        self._enter("command")
+        self.model_path = path
+
+    def report(self, netlogo_reporter):
+        self._enter("report")
+        value = _export(self._run(self._compile_reporter(netlogo_reporter)))
+        self._wait(value)
+        return value
+
+    def command(self, netlogo_command):
+        self._enter("command")
+        self._run(self._compile_commands(netlogo_command))
+        self._wait()
+
+    def repeat_report(self, netlogo_reporter, reps, go="go", include_t0=True):
+        """
+        Exécute go reps fois et relève les reporters après chaque tick
+
+        Returns:
+            dict: {reporter: liste des valeurs} (pynetlogo renvoie un DataFrame de même forme)
+        """
+        self._enter("repeat_report")
+        reporters = [netlogo_reporter] if isinstance(netlogo_reporter, str) else list(netlogo_reporter)
+        compiled = [self._compile_reporter(reporter) for reporter in reporters]
+        go_command = self._compile_commands(go)
+
+        results = {reporter: [] for reporter in reporters}
+
+        def sample():
+            for reporter, function in zip(reporters, compiled):
+                results[reporter].append(_export(self._run(function)))
+
+        if include_t0:
+            sample()
+        for _ in range(int(reps)):
+            self._run(go_command)
+            sample()
+
+        self._wait(results)
+        return results
+
+    def kill_workspace(self):
+        self.closed = True
+
+    def stop_jvm(self):
+        """Simule l'arrêt de la JVM: tous les appels suivants échouent (essais du disjoncteur)"""
+        self.jvm_stopped = True
+
+    def _enter(self, kind):
+        if self.jvm_stopped:
+            raise RuntimeError("Java Virtual Machine is not running")
+        if self.closed:
+            raise FakeNetLogoError("Workspace fermé")
+        self.call_counts[kind] += 1
+
+    def _wait(self, value=None):
+        delay = self.latency
+        if self.latency_per_value and value is not None:
+            delay += self.latency_per_value * _count_values(value)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _compile_reporter(self, source):
+        function = self._reporters.get(source)
+        if function is None:
+            function = _Compiler.from_source(self.factory, source).reporter()
+            self._reporters[source] = function
+        return function
+
+    def _compile_commands(self, source):
+        function = self._commands.get(source)
+        if function is None:
+            function = _Compiler.from_source(self.factory, source).commands()
+            self._commands[source] = function
+        return function
+
+    def _run(self, function):
+        try:
+            return function(_Context())
+        except FakeNetLogoError:
+            raise
+        except (LookupError, TypeError, ValueError, ZeroDivisionError, AttributeError) as e:
+            raise FakeNetLogoError(f"Erreur d'exécution: {type(e).__name__}: {e}") from e
+
+def make_synthetic_factory(machine_count=7, operation_count=9, product_types="ABEILPT",
+                           route_length=(6, 9), seed=0, **link_kwargs):
+    """
+    Crée un faux NetLogoLink sur une usine générée aléatoirement (reproductible par seed)
+
+    Args:
+        machine_count: Nombre de machines (M1, M2...)
+        operation_count: Nombre d'opérations distinctes (O1, O2...)
+        product_types: Types de produits (un caractère ou une chaîne par type)
+        route_length: (min, max) du nombre d'opérations par gamme
+        seed: Graine du générateur
+        **link_kwargs: Paramètres de FakeNetLogoLink et FakeFactory (latency, travel_ticks...)
+
+    Returns:
+        FakeNetLogoLink: Le faux link (setup non exécuté)
+    """
+    rng = random.Random(seed)
+    machine_count = max(1, int(machine_count))
+    operations = [f"O{index + 1}" for index in range(max(1, int(operation_count)))]
+
+    # Chaque opération est proposée par au moins une machine
+    offered = [set() for _ in range(machine_count)]
+    for index, operation in enumerate(operations):
+        offered[index % machine_count].add(operation)
+    for machine_operations in offered:
+        machine_operations.update(rng.sample(operations, k=rng.randint(0, min(2, len(operations)))))
+
+    machines = []
+    for index, machine_operations in enumerate(offered):
+        machine_operations = sorted(machine_operations, key=lambda operation: int(operation[1:]))
+        machines.append((
+            f"M{index + 1}",
+            machine_operations,
+            [float(rng.choice((5, 10, 20, 30, 60))) for _ in machine_operations],
+            float(20 + (index * 37) % 220),
+            117.0 if index % 2 == 0 else 28.0,
+            180.0 if index % 2 == 0 else 0.0,
+        ))
+
+    minimum, maximum = route_length
+    routings = {
+        str(product_type): [rng.choice(operations) for _ in range(rng.randint(minimum, maximum))]
+        for product_type in product_types
+    }
+
+    factory_kwargs = {name: link_kwargs.pop(name) for name in ("node_count", "travel_ticks") if name in link_kwargs}
+    factory = FakeFactory(machines, routings, seed=seed, **factory_kwargs)
+    return FakeNetLogoLink(factory, **link_kwargs)
@@ -0,0 +1,130 @@
+"""
+Lancement des produits piloté par le temps simulé: la boucle d'avancement consulte le
+planificateur après chaque pas, à partir de la télémétrie déjà lue
+"""
+import math
+from collections import deque
+
+from stepping import TICK_TIME
+
+class LaunchScheduler:
+    """
+    Deux modes de lancement:
+
+    - "timer": une file de types de produits, un produit lancé chaque fois que le timer
+      Time-for-Possible-launching du modèle atteint 0 (puis timer remis à launch_interval)
+    - "schedule": des arrivées explicites (temps simulé, type), lancées dès que
+      simulated.time atteint leur date, indépendamment du timer
+    """
+    def __init__(self, queue=None, launch_interval=100, arrivals=None):
+        """
+        Args:
+            queue: Types de produits à lancer au timer (une deque existante est partagée)
+            launch_interval: Valeur du timer après chaque lancement (en ticks)
+            arrivals: Liste de tuples (temps simulé, type de produit); active le mode "schedule"
+        """
+        self.launch_interval = launch_interval
+        self.mode = "schedule" if arrivals else "timer"
+        self.queue = queue if isinstance(queue, deque) else deque(queue or [])
+        self.arrivals = deque(sorted((float(time_value), str(product_type)) for time_value, product_type in arrivals or []))
+        self.launched = 0
+
+    @property
+    def pending(self):
+        """True s'il reste des produits à lancer"""
+        return bool(self.arrivals) if self.mode == "schedule" else bool(self.queue)
+
+    @property
+    def remaining(self):
+        """Nombre de produits restant à lancer"""
+        return len(self.arrivals) if self.mode == "schedule" else len(self.queue)
+
+    def remaining_types(self):
+        """Types de produits restant à lancer, dans l'ordre (pour les points de reprise)"""
+        if self.mode == "schedule":
+            return [product_type for _, product_type in self.arrivals]
+        return list(self.queue)
+
+    def ticks_until_next(self, telemetry):
+        """
+        Nombre de ticks avant le prochain lancement, pour arrêter un bloc de ticks à temps
+
+        Args:
+            telemetry: telemetry.TelemetryRecord du dernier pas
+
+        Returns:
+            int: Nombre de ticks (0 si un lancement est dû), None si rien n'est à lancer
+        """
+        if not self.pending or telemetry is None:
+            return None
+        if self.mode == "schedule":
+            # simulated.time avance de TICK_TIME par tick; arrondi à 1e-6 près
+            delta = (self.arrivals[0][0] - telemetry.simulated_time) / TICK_TIME
+            return max(0, math.ceil(round(delta, 6)))
+        return max(0, int(math.ceil(telemetry.launch_timer)))
+
+    def due(self, telemetry):
+        """
+        Types de produits à lancer maintenant
+
+        Args:
+            telemetry: telemetry.TelemetryRecord du dernier pas
+
+        Returns:
+            list: Types de produits dus (vide si aucun)
+        """
+        if not self.pending or telemetry is None:
+            return []
+        if self.mode == "schedule":
+            now = telemetry.simulated_time + 1e-9
+            return [product_type for time_value, product_type in self.arrivals if time_value <= now]
+        return [self.queue[0]] if telemetry.launch_timer <= 0 else []
+
+    def launch_due(self, netlogo_command, telemetry):
+        """
+        Lance les produits dus et remet le timer à launch_interval (mode "timer")
+
+        Un produit n'est retiré de la file qu'une fois create.product exécuté.
+
+        Args:
+            netlogo_command: Fonction (commande) -> bool (ex: safe_netlogo_command partiel)
+            telemetry: telemetry.TelemetryRecord du dernier pas
+
+        Returns:
+            list: Types de produits effectivement lancés
+        """
+        launched = []
+        for product_type in self.due(telemetry):
+            if not netlogo_command(f'create.product "{product_type}"'):
+                break
+            if self.mode == "schedule":
+                self.arrivals.popleft()
+            else:
+                self.queue.popleft()
+                netlogo_command(f"set Time-for-Possible-launching {self.launch_interval}")
+            launched.append(product_type)
+
+        self.launched += len(launched)
+        return launched
+
+def parse_arrival_schedule(text):
+    """
+    Lit un planning d'arrivées au format "temps:type, temps:type" (ex: "0:A, 50:B, 50:I")
+
+    Args:
+        text: Planning (config.ini ou ligne de commande); vide pour aucun planning
+
+    Returns:
+        list: Tuples (temps simulé, type de produit) triés par temps
+    """
+    arrivals = []
+    for entry in (text or "").replace(";", ",").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            time_value, product_type = entry.split(":", 1)
+            arrivals.append((float(time_value), product_type.strip()))
+        except ValueError:
+            print(f"Arrivée ignorée (format attendu temps:type): '{entry}'")
+    return sorted(arrivals)
@@ -1,6 +1,5 @@
 from tkinter import ttk, IntVar, StringVar, messagebox
 import tkinter as tk
-import pynetlogo
 import os
 from collections import deque
 import matplotlib.pyplot as plt
@@ -15,17 +14,27 @@ import tkinter as tk
 from tkinter import ttk
 import threading
 from db_manager import DatabaseManager
-from netlogo_connector import NetLogoConnector
+from netlogo_connector import NetLogoConnector, read_sample
+from workspace_manager import get_workspace_manager
 from dashboard_manager import DashboardManager
 from main_controller import SimulationController
 
 # Importer les nouvelles fonctions utilitaires pour NetLogo
 from netlogo_utils import (
     count_breed, ensure_machines_exist, initialize_alpha_model, safe_netlogo_reporter, safe_netlogo_command,
-    get_machine_state, get_product_state, 
-    get_turtles_with_breed, get_system_state
+    get_machines_state, get_products_state, 
+    get_turtles_with_breed, get_system_state, ProductIndex, get_telemetry, collect_system_series,
+    wait_until_ready
 )
 from utils import safe_float, safe_int
+from settings import get_simulation_settings, get_netlogo_settings
+from stepping import ChunkSizer, run_chunk, run_series_chunk, run_to_next_event, get_go_command
+from checkpoint import CheckpointStore
+from netlogo_actor import get_actor
+from circuit_breaker import get_jvm_breaker, can_restart_jvm
+from launch_scheduler import LaunchScheduler, parse_arrival_schedule
+from snapshot_log import open_snapshot_recorder
+from call_stats import get_call_stats
 
 # Définir un thème de couleurs
 COLORS = {
@@ -41,6 +50,37 @@ COLORS = {
 # Initialiser la base de données
 db_manager = DatabaseManager()
 
+# Paramètres de déroulement (mode "single" ou "turbo") lus dans config.ini
+simulation_settings = get_simulation_settings()
+netlogo_settings = get_netlogo_settings()
+chunk_sizer = ChunkSizer(
+    target_interval=simulation_settings["sample_interval"],
+    max_chunk=simulation_settings["max_chunk_ticks"]
+)
+
+# Points de reprise des simulations longues (voir save_checkpoint / resume_ifmulation)
+MODEL_PATH = os.path.abspath("Alpha.nlogo")
+checkpoint_store = CheckpointStore(
+    os.path.join(get_netlogo_settings()["cache_dir"], "checkpoints"),
+    keep=simulation_settings["checkpoint_keep"]
+)
+
+# Durée maximale d'une ifmulation, en ticks exécutés (le Go du modèle Alpha n'appelle pas
+# tick: le compteur ticks de NetLogo reste à 0, les ticks sont comptés côté Python)
+MAX_TICKS = 5000
+
+def is_batch_collection():
+    """Indique si les KPI sont collectés par repeat_report (séries renvoyées par bloc)"""
+    return simulation_settings["collection"] == "batch"
+
+def is_next_event_mode():
+    """Indique si la simulation saute directement d'un événement au suivant"""
+    return simulation_settings["stepping"] == "next_event"
+
+def is_turbo_mode():
+    """Indique si la simulation avance par blocs de ticks"""
+    return simulation_settings["stepping"] in ("turbo", "next_event") or is_batch_collection()
+
 # Initialiser NetLogo
 netlogo = None
 
@@ -84,8 +124,16 @@ product_quantities = {
 
 # File d'attente pour les produits à créer
 product_queue = deque()
+# Planificateur des lancements, consulté par la boucle d'avancement (voir advance_ifmulation)
+launch_scheduler = None
+# Index des IDs de produits présents dans NetLogo, mis à jour à chaque sauvegarde
+product_index = ProductIndex()
 # Variable pour suivre if la création séquentielle est en cours
 creating_products = False
+# ID de la ligne simulation en cours (table simulation)
+ifmulation_id = None
+# Journal des états de la simulation en cours (record_dir dans config.ini), rejouable sans JVM
+snapshot_recorder = None
 
 # Cadre principal
 main_frame = ttk.Frame(root, padding="10")
@@ -142,7 +190,7 @@ for product_type in product_quantities.keys():
     quantity_spinbox = ttk.Spinbox(
         product_grid, 
         from_=0, 
-        to=20,  # Limitation à 20 maximum
+        to=10000,
         width=5, 
         textvariable=product_quantities[product_type]
     )
@@ -168,9 +216,11 @@ status_label.pack(fill="x", pady=(0, 15))
 def update_ifmulation_info():
     if hasattr(root, "ifmulation_running") and root.ifmulation_running:
         try:
-            # Récupérer le temps de ifmulation
-            ticks = netlogo.report("ticks")
-            ifmulation_time.set(f"{float(ticks):.1f}")
+            # Récupérer le temps de ifmulation depuis la dernière télémétrie de la boucle
+            # Rien à afficher avant la première télémétrie (pas d'appel NetLogo sur le thread Tk)
+            telemetry = getattr(root, "last_telemetry", None)
+            if telemetry is not None:
+                ifmulation_time.set(f"{float(telemetry.ticks):.1f}")
             
             # Mettre à jour le statut
             if creating_products:
@@ -186,10 +236,13 @@ def update_ifmulation_info():
         ifmulation_status.set("ifmulation inactive")
 
 def start_ifmulation():
-    global creating_products, product_queue, ifmulation_id
+    global creating_products, product_queue, ifmulation_id, launch_scheduler
+    
+    # Planning d'arrivées explicite (config.ini) ou file lancée au timer du modèle
+    arrivals = parse_arrival_schedule(simulation_settings["arrival_schedule"])
     
     # Compter le nombre total de produits à créer
-    total_products = sum(quantity_var.get() for quantity_var in product_quantities.values())
+    total_products = len(arrivals) or sum(quantity_var.get() for quantity_var in product_quantities.values())
     
     # Vérifier s'il y a des produits à créer
     if total_products == 0:
@@ -201,24 +254,26 @@ def start_ifmulation():
     products_created.set(0)
     
     # Remplir la file d'attente avec les produits à créer
-    for product_type, quantity_var in product_quantities.items():
-        quantity = quantity_var.get()
-        for i in range(quantity):
-            product_queue.append(product_type)
+    if not arrivals:
+        for product_type, quantity_var in product_quantities.items():
+            quantity = quantity_var.get()
+            for i in range(quantity):
+                product_queue.append(product_type)
+    else:
+        print(f"Planning d'arrivées: {len(arrivals)} produits (quantités de l'interface ignorées)")
+    
+    # La boucle de simulation lance les produits d'après la télémétrie de chaque pas
+    launch_scheduler = LaunchScheduler(product_queue, simulation_settings["launch_interval"], arrivals)
     
     # Mettre à jour la barre de progresifon
     progress_var.set(0)
-    progress_max = len(product_queue)
+    progress_max = total_products
     progress["maximum"] = progress_max
     
     # Désactiver le bouton pendant la création des produits
     launch_button.config(state="disabled")
     ifmulation_status.set("Préparation de la ifmulation...")
-    
-    # Commencer la création séquentielle
-    if not creating_products:
-        creating_products = True
-        create_next_product()
+    creating_products = True
     
     # Démarrer la boucle de ifmulation if elle n'est pas déjà en cours
     if not hasattr(root, "ifmulation_running") or not root.ifmulation_running:
@@ -226,59 +281,205 @@ def start_ifmulation():
         run_ifmulation()
         update_ifmulation_info()
 
-def create_next_product():
-    global creating_products, product_queue
-    if product_queue:
-        product_type = product_queue.popleft()
-        try:
-            time_value = safe_float(safe_netlogo_reporter(netlogo, "Time-for-Posifble-launching", 100), 100)
-            if time_value == 0:
-                if safe_netlogo_command(netlogo, f'create.product "{product_type}"'):
-                    safe_netlogo_command(netlogo, "set Time-for-Posifble-launching 100")  # Réinitialiser le timer
-                    products_created.set(products_created.get() + 1)
-                    progress_var.set(products_created.get())
-                    remaining = len(product_queue)
-                    if remaining > 0:
-                        status_label.config(text=f"Création: Produit {product_type} ajouté (reste: {remaining})")
-                    else:
-                        status_label.config(text=f"Dernier produit ajouté: {product_type}")
-                root.after(6000, create_next_product)
-            else:
-                progress_var.set(products_created.get() + (1 - time_value/100))
-                status_label.config(text=f"Attente du timer ({time_value})...")
-                root.after(100, create_next_product)
-        except Exception as e:
-            print(f"Erreur création produit: {str(e)}")
-            status_label.config(text=f"Erreur: {str(e)}")
-            root.after(1000, create_next_product)
-    else:
+def launch_due_products(telemetry=None):
+    """
+    Lance les produits dus d'après la télémétrie du dernier pas
+    
+    Exécutée sur le thread de l'acteur NetLogo, dans la boucle d'avancement.
+    
+    Args:
+        telemetry: Télémétrie du dernier pas (lue dans NetLogo si None)
+        
+    Returns:
+        tuple: (types lancés, télémétrie à jour)
+    """
+    if launch_scheduler is None or not launch_scheduler.pending:
+        return [], telemetry
+    
+    if telemetry is None:
+        telemetry = get_telemetry(netlogo)
+    
+    launched = launch_scheduler.launch_due(lambda command: safe_netlogo_command(netlogo, command), telemetry)
+    if launched:
+        # Le timer vient d'être remis à launch_interval: relire l'état
+        telemetry = get_telemetry(netlogo) or telemetry
+    return launched, telemetry
+
+def on_products_launched(launched):
+    """Met à jour la progression après les lancements d'un pas (thread Tk)"""
+    global creating_products
+    
+    if launched:
+        products_created.set(products_created.get() + len(launched))
+        progress_var.set(products_created.get())
+        remaining = launch_scheduler.remaining
+        if remaining > 0:
+            status_label.config(text=f"Création: Produit {launched[-1]} ajouté (reste: {remaining})")
+        else:
+            status_label.config(text=f"Dernier produit ajouté: {launched[-1]}")
+    
+    if creating_products and (launch_scheduler is None or not launch_scheduler.pending):
         creating_products = False
         launch_button.config(state="normal")
         status_label.config(text="Tous les produits ajoutés")
         ifmulation_status.set("ifmulation en cours")
 
+def get_turbo_chunk_limit(telemetry, executed_ticks=0):
+    """
+    Calcule le nombre maximal de ticks du prochain bloc en mode turbo, pour que la fin
+    du bloc coïncide avec le prochain lancement de produit et ne dépasse pas MAX_TICKS
+    
+    Args:
+        telemetry: Télémétrie du pas précédent
+        executed_ticks: Ticks déjà exécutés par la ifmulation
+    """
+    limit = max(1, MAX_TICKS - executed_ticks)
+    if launch_scheduler is not None:
+        ticks = launch_scheduler.ticks_until_next(telemetry)
+        if ticks is not None and ticks > 0:
+            return min(ticks, limit)
+    return limit
+
+def advance_ifmulation(telemetry=None, executed_ticks=0):
+    """
+    Avance la simulation d'un pas (ou d'un bloc), lit la télémétrie et lance les produits dus
+    
+    Exécutée sur le thread de l'acteur NetLogo: le thread Tk ne bloque pas pendant le calcul.
+    
+    Args:
+        telemetry: Télémétrie du pas précédent (limite des blocs avant un lancement)
+        executed_ticks: Ticks déjà exécutés (les blocs s'arrêtent à MAX_TICKS)
+    
+    Returns:
+        tuple: (step_ok, telemetry, types de produits lancés, ticks exécutés)
+    """
+    # Premier pas: les produits dus au temps 0 sont lancés avant d'avancer
+    launched_before = []
+    if telemetry is None:
+        launched_before, telemetry = launch_due_products()
+    launch_pending = launch_scheduler is not None and launch_scheduler.pending
+    
+    # Exécuter la commande go (ou un bloc "repeat N [ go ]" en mode turbo)
+    if is_batch_collection():
+        # La JVM exécute le bloc et renvoie les KPI de chaque tick en une fois
+        chunk_ticks, samples = run_series_chunk(
+            lambda ticks, go_command: collect_system_series(netlogo, ticks, go_command),
+            chunk_sizer,
+            get_turbo_chunk_limit(telemetry, executed_ticks),
+            get_go_command(simulation_settings["run_mode"])
+        )
+        step_ok = chunk_ticks > 0
+        if samples:
+            db_manager.save_snapshots(ifmulation_id, samples)
+    elif is_next_event_mode():
+        # Un seul bloc jusqu'à la prochaine fin d'opération ou au prochain lancement
+        max_skip = min(simulation_settings["max_chunk_ticks"], max(1, MAX_TICKS - executed_ticks))
+        if launch_pending and launch_scheduler.mode == "schedule":
+            # Arrivée planifiée: le timer du modèle ne la signale pas
+            max_skip = min(max_skip, launch_scheduler.ticks_until_next(telemetry) or 1)
+        chunk_ticks = run_to_next_event(
+            lambda reporter: safe_netlogo_reporter(netlogo, reporter, None),
+            lambda command: safe_netlogo_command(netlogo, command),
+            launch_pending=launch_pending and launch_scheduler.mode == "timer",
+            max_skip=max_skip,
+            go_command=get_go_command(simulation_settings["run_mode"])
+        )
+        step_ok = chunk_ticks is not None
+        chunk_ticks = chunk_ticks or 0
+    elif is_turbo_mode():
+        chunk_ticks = run_chunk(
+            lambda command: safe_netlogo_command(netlogo, command),
+            chunk_sizer,
+            get_turbo_chunk_limit(telemetry, executed_ticks),
+            get_go_command(simulation_settings["run_mode"])
+        )
+        step_ok = chunk_ticks > 0
+    else:
+        step_ok = safe_netlogo_command(netlogo, get_go_command(simulation_settings["run_mode"]))
+        chunk_ticks = 1 if step_ok else 0
+    
+    if not step_ok:
+        return False, None, launched_before, 0
+    
+    # Récupérer tous les scalaires du tick en un seul appel, puis lancer les produits dus
+    launched, telemetry = launch_due_products(get_telemetry(netlogo))
+    return True, telemetry, launched_before + launched, chunk_ticks
+
+def after_future(future, callback, poll_ms=5):
+    """
+    Appelle callback(future) sur le thread Tk une fois le future terminé, sans bloquer
+    
+    Args:
+        future: Future renvoyé par l'acteur NetLogo
+        callback: Fonction appelée avec le future terminé
+        poll_ms: Intervalle de vérification (millisecondes)
+    """
+    if future.done():
+        callback(future)
+    else:
+        root.after(poll_ms, lambda: after_future(future, callback, poll_ms))
+
 def run_ifmulation_step():
     if not hasattr(root, "ifmulation_running") or not root.ifmulation_running:
         return
+    # Le calcul se fait sur le thread de l'acteur; la suite est traitée par finish_ifmulation_step
+    telemetry = getattr(root, "last_telemetry", None)
+    executed_ticks = getattr(root, "executed_ticks", 0)
+    after_future(get_actor(netlogo).submit(lambda link: advance_ifmulation(telemetry, executed_ticks)),
+                 finish_ifmulation_step)
+
+def finish_ifmulation_step(future):
+    if not hasattr(root, "ifmulation_running") or not root.ifmulation_running:
+        return
+    if get_jvm_breaker().is_open:
+        # Ne pas replanifier: chaque pas échouerait immédiatement
+        handle_jvm_failure()
+        return
     try:
-        # Exécuter la commande go avec gestion d'erreur
-        if not safe_netlogo_command(netlogo, "go"):
+        step_ok, telemetry, launched, chunk_ticks = future.result()
+        on_products_launched(launched)
+        # Ticks comptés côté Python: le compteur ticks de NetLogo reste à 0 (voir MAX_TICKS)
+        root.executed_ticks = getattr(root, "executed_ticks", 0) + chunk_ticks
+        
+        if not step_ok:
             # if la commande échoue, ne pas essayer de vérifier if NetLogo est actif
             # car cette vérification était la source de l'erreur "is-observer?"
             root.after(500, run_ifmulation_step)
             return
         
         try:
-            # Récupérer le temps actuel
-            ticks = safe_float(safe_netlogo_reporter(netlogo, "ticks", 0), 0)
+            if telemetry is None:
+                root.after(500, run_ifmulation_step)
+                return
+            root.last_telemetry = telemetry
+            ticks = root.executed_ticks
+            
+            # Point de reprise périodique
+            if simulation_settings["checkpoint_interval"] > 0:
+                if time.perf_counter() - getattr(root, "last_checkpoint", 0) >= simulation_settings["checkpoint_interval"]:
+                    save_checkpoint()
+            
+            # Statistiques des appels NetLogo de la période écoulée (table netlogo_call_stats)
+            if netlogo_settings["call_stats_interval"] > 0:
+                if time.perf_counter() - getattr(root, "last_call_stats", 0) >= netlogo_settings["call_stats_interval"]:
+                    root.last_call_stats = time.perf_counter()
+                    get_call_stats().flush(db_manager, ifmulation_id)
+            
+            # Enregistrement périodique de l'état affiché, sur le thread de l'acteur
+            if snapshot_recorder is not None:
+                if time.perf_counter() - getattr(root, "last_record", 0) >= simulation_settings["record_interval"]:
+                    root.last_record = time.perf_counter()
+                    recorder = snapshot_recorder
+                    get_actor(netlogo).submit(lambda link: recorder.record(read_sample(netlogo, telemetry)))
             
             # Enregistrer périodiquement les opérations de production (toutes les 5 ticks)
             # Cela permet de capturer l'activité des machines pendant la ifmulation
             if hasattr(root, "last_production_save"):
                 if ticks - root.last_production_save >= 5:
-                    # Sauvegarder les opérations de production actuelles
+                    # Sauvegarder les opérations de production actuelles (sur le thread de l'acteur)
                     from netlogo_utils import save_production_operations
-                    save_production_operations(netlogo, db_manager, ifmulation_id)
+                    simulation_id = ifmulation_id
+                    get_actor(netlogo).submit(lambda link: save_production_operations(netlogo, db_manager, simulation_id))
                     root.last_production_save = ticks
             else:
                 root.last_production_save = ticks
@@ -286,7 +487,7 @@ def run_ifmulation_step():
             # Vérifier if tous les produits ont été créés et traités
             if creating_products == False and products_created.get() > 0:
                 # Compter les produits terminés
-                completed_products = safe_int(safe_netlogo_reporter(netlogo, 'count products with [product.state = "Completed"]', 0), 0)
+                completed_products = telemetry.completed_products
                 
                 # if tous les produits sont terminés, terminer la ifmulation
                 if completed_products == products_created.get():
@@ -297,51 +498,185 @@ def run_ifmulation_step():
                     root.ifmulation_running = False
                     return
             
-            # Arrêter après 5000 ticks quoi qu'il arrive
-            if ticks < 5000:
-                root.after(10, run_ifmulation_step)
+            # Arrêter après MAX_TICKS ticks quoi qu'il arrive
+            if ticks < MAX_TICKS:
+                root.after(1 if is_turbo_mode() else 10, run_ifmulation_step)
             else:
                 save_final_ifmulation_state(ticks)
                 root.ifmulation_running = False
-                ifmulation_status.set("ifmulation terminée (5000 ticks)")
+                ifmulation_status.set(f"ifmulation terminée ({MAX_TICKS} ticks)")
                 status_label.config(text="ifmulation terminée")
         except Exception as e:
             print(f"Erreur lors de la progresifon de la ifmulation: {str(e)}")
             root.after(100, run_ifmulation_step)
     except Exception as e:
-        print(f"Erreur dans run_ifmulation_step: {str(e)}")
+        print(f"Erreur dans finish_ifmulation_step: {str(e)}")
         # Récupération d'erreur - attente plus longue en cas d'erreur
         root.after(500, run_ifmulation_step)
 
+def handle_jvm_failure():
+    """Arrête les boucles planifiées après la perte de la JVM et programme la reconnexion"""
+    root.ifmulation_running = False
+    ifmulation_status.set("JVM fermée: ifmulation suspendue")
+    if not getattr(root, "reconnect_pending", False):
+        schedule_reconnect()
+
+def schedule_reconnect():
+    """Planifie la prochaine tentative de reconnexion (délai doublé après chaque échec)"""
+    # JPype ne relance pas la JVM dans le même processus: inutile de réessayer
+    delay = get_jvm_breaker().next_delay() if can_restart_jvm() else None
+    if delay is None:
+        root.reconnect_pending = False
+        ifmulation_status.set("Reconnexion impossible: redémarrer l'application")
+        status_label.config(text="La JVM ne peut pas être relancée dans ce processus")
+        return
+    
+    root.reconnect_pending = True
+    status_label.config(text=f"Reconnexion à NetLogo dans {delay:.0f} s...")
+    root.after(int(delay * 1000), reconnect_ifmulation)
+
+def reconnect_ifmulation():
+    """Recrée le workspace NetLogo puis reprend la ifmulation depuis son dernier point de reprise"""
+    root.reconnect_pending = False
+    
+    if not initialize_netlogo():
+        schedule_reconnect()
+        return
+    
+    if checkpoint_store.latest(MODEL_PATH) is not None:
+        resume_ifmulation()
+    else:
+        ifmulation_status.set("NetLogo reconnecté")
+        status_label.config(text="Aucun point de reprise: réinitialiser la ifmulation")
+
 def save_final_ifmulation_state(ticks):
-    """Sauvegarde l'état final de la ifmulation pour l'analyse ultérieure"""
-    global ifmulation_id
+    """
+    Sauvegarde l'état final de la ifmulation pour l'analyse ultérieure
     
+    Les lectures NetLogo et les écritures sont exécutées sur le thread de l'acteur:
+    le thread Tk n'attend pas la JVM.
+    """
     print("Sauvegarde de l'état final de la ifmulation...")
-    try:
+    simulation_id = ifmulation_id
+    recorder = snapshot_recorder
+    
+    def save_final_state(link):
         # Sauvegarder l'état de toutes les machines
         save_machine_state()
         
         # Sauvegarder les opérations de production finales
         from netlogo_utils import save_production_operations
-        save_production_operations(netlogo, db_manager, ifmulation_id)
+        save_production_operations(netlogo, db_manager, simulation_id)
         
         # Sauvegarder l'état global du système
         system_state = get_system_state(netlogo)
-        db_manager.save_snapshot(ifmulation_id, ticks, system_state)
+        db_manager.save_snapshot(simulation_id, ticks, system_state)
         
         # Terminer la ifmulation dans la base de données
-        db_manager.end_ifmulation(ifmulation_id, ticks)
+        db_manager.end_ifmulation(simulation_id, ticks)
+        
+        # Simulation terminée normalement: les points de reprise ne servent plus
+        checkpoint_store.clear(simulation_id)
         
-        print("État final sauvegardé avec succès.")
+        if recorder is not None:
+            recorder.close()
+        
+        # Dernière période des statistiques d'appels, puis le bilan de la simulation
+        call_stats = get_call_stats()
+        call_stats.flush(db_manager, simulation_id)
+        call_stats.print_report()
+    
+    def finish_final_save(future):
+        if future.exception() is not None:
+            print(f"Erreur lors de la sauvegarde de l'état final: {str(future.exception())}")
+        else:
+            print("État final sauvegardé avec succès.")
+    
+    after_future(get_actor(netlogo).submit(save_final_state), finish_final_save)
+
+def save_checkpoint():
+    """Enregistre un point de reprise (monde NetLogo, ID de simulation, file de produits)"""
+    root.last_checkpoint = time.perf_counter()
+    if netlogo is None or ifmulation_id is None:
+        return
+    
+    try:
+        # État Python lu sur le thread Tk, export du monde sur le thread de l'acteur
+        telemetry = getattr(root, "last_telemetry", None)
+        state = {
+            "products_created": products_created.get(),
+            "total_products": int(progress["maximum"]),
+            "creating_products": creating_products,
+            "simulated_time": telemetry.simulated_time if telemetry is not None else 0.0,
+            "executed_ticks": getattr(root, "executed_ticks", 0),
+        }
+        if launch_scheduler is not None and launch_scheduler.mode == "schedule":
+            # Dates des arrivées restantes, pour reprendre le même planning
+            state["arrivals"] = [list(arrival) for arrival in launch_scheduler.arrivals]
+        queue_snapshot = launch_scheduler.remaining_types() if launch_scheduler is not None else list(product_queue)
+        simulation_id = ifmulation_id
+        get_actor(netlogo).submit(
+            lambda link: checkpoint_store.save(netlogo, simulation_id, queue_snapshot, MODEL_PATH, state))
     except Exception as e:
-        print(f"Erreur lors de la sauvegarde de l'état final: {str(e)}")
+        print(f"Erreur lors de l'enregistrement du point de reprise: {str(e)}")
+
+def resume_ifmulation():
+    """Reprend la dernière simulation interrompue depuis son point de reprise le plus récent"""
+    global creating_products, product_queue, ifmulation_id, launch_scheduler
+    
+    if hasattr(root, "ifmulation_running") and root.ifmulation_running:
+        ifmulation_status.set("Une ifmulation est déjà en cours")
+        return
+    
+    metadata = checkpoint_store.latest(MODEL_PATH)
+    if metadata is None:
+        ifmulation_status.set("Aucun point de reprise disponible")
+        return
+    
+    if not initialize_netlogo() or not checkpoint_store.restore(netlogo, metadata):
+        ifmulation_status.set("Erreur: reprise impossible")
+        return
+    
+    # Restaurer l'état côté Python associé au monde importé
+    state = metadata.get("state", {})
+    ifmulation_id = metadata["simulation_id"]
+    product_queue = deque(metadata["product_queue"] if "arrivals" not in state else [])
+    launch_scheduler = LaunchScheduler(product_queue, simulation_settings["launch_interval"], state.get("arrivals"))
+    products_created.set(state.get("products_created", 0))
+    progress["maximum"] = max(state.get("total_products", 0), 1)
+    progress_var.set(products_created.get())
+    product_index.reset()
+    root.executed_ticks = state.get("executed_ticks", 0)
+    root.last_production_save = root.executed_ticks
+    root.last_checkpoint = time.perf_counter()
+    
+    print(f"Reprise de la ifmulation {ifmulation_id} ({launch_scheduler.remaining} produits restant à lancer)")
+    ifmulation_status.set("ifmulation reprise")
+    
+    creating_products = launch_scheduler.pending
+    if creating_products:
+        launch_button.config(state="disabled")
+    
+    root.last_telemetry = None
+    root.ifmulation_running = True
+    run_ifmulation_step()
+    update_ifmulation_info()
 
 def run_ifmulation():
-    global ifmulation_id
+    global ifmulation_id, snapshot_recorder
     ifmulation_id = db_manager.start_ifmulation()
     
+    # Un journal d'états par simulation
+    if snapshot_recorder is not None:
+        snapshot_recorder.close()
+    snapshot_recorder = open_snapshot_recorder(MODEL_PATH)
+    
     # Initialiser les variables pour le suivi des données
+    root.last_telemetry = None
+    root.executed_ticks = 0
+    root.last_checkpoint = time.perf_counter()
+    root.last_record = 0
+    root.last_call_stats = time.perf_counter()
     root.last_production_save = 0
     root.last_snapshot_save = 0
     
@@ -352,36 +687,32 @@ def run_ifmulation():
     run_ifmulation_step()
 
 def stop_ifmulation():
-    global ifmulation_id
-    ticks_final = netlogo.report("ticks")
-    db_manager.end_ifmulation(ifmulation_id, ticks_final)
+    # Ticks comptés côté Python (voir MAX_TICKS): aucun appel NetLogo sur le thread Tk
+    db_manager.end_ifmulation(ifmulation_id, getattr(root, "executed_ticks", 0))
 
 def save_machine_state():
     """Enregistre l'état des machines en s'assurant que les types sont compatibles avec SQLite"""
     try:
-        # Utiliser directement les IDs connus pour les machines du modèle Alpha
-        machine_ids = [186, 187, 188, 189, 190, 191, 192]
+        # Machines issues de l'introspection du modèle, état de toutes lu en un seul appel
+        machines = get_machines_state(netlogo)
         
-        if not machine_ids:
+        if not machines:
             print("Aucune machine trouvée")
             return
             
-        print(f"Sauvegarde de l'état de {len(machine_ids)} machine(s)")
-        for machine_id in machine_ids:
+        print(f"Sauvegarde de l'état de {len(machines)} machine(s)")
+        for machine_id, machine_data in machines:
             try:
-                # Utiliser la fonction ifmplifiée pour obtenir les données de la machine
-                machine_data = get_machine_state(netlogo, machine_id)
-                
                 # Assurer la converifon des types Java en types Python
                 sanitized_data = {
                     "name": str(machine_data.get("name", f"Machine{machine_id}")),
                     "state": str(machine_data.get("state", "Idle")),
-                    "remaining.time": float(safe_float(machine_data.get("remaining.time", 0), 0.0)),
+                    "remaining.time": safe_float(machine_data.get("remaining.time", 0), 0.0),
                     "operations": str(machine_data.get("operations", "[]")),
                     "operation.times": str(machine_data.get("operation.times", "[]")),
-                    "xcor": float(safe_float(machine_data.get("xcor", 0), 0.0)),
-                    "ycor": float(safe_float(machine_data.get("ycor", 0), 0.0)),
-                    "heading": float(safe_float(machine_data.get("heading", 0), 0.0))
+                    "xcor": safe_float(machine_data.get("xcor", 0), 0.0),
+                    "ycor": safe_float(machine_data.get("ycor", 0), 0.0),
+                    "heading": safe_float(machine_data.get("heading", 0), 0.0)
                 }
                 
                 # Enregistrer dans la base de données avec les données assainies
@@ -397,54 +728,34 @@ def save_machine_state():
 def save_product_state():
     """Enregistre l'état des produits et détecte les produits complétés"""
     try:
-        # Récupérer les IDs des produits NetLogo actifs
-        products = []
+        # Récupérer l'état de tous les produits NetLogo actifs en un seul appel
+        products_data = None
         try:
-            # Vérifier d'abord combien de produits sont attendus
-            count_products = safe_int(safe_netlogo_reporter(netlogo, "count products", 0), 0)
-            print(f"Nombre de produits détectés dans NetLogo: {count_products}")
-            
-            # IMPORTANT: Vider la table des produits avant de sauvegarder les nouveaux
-            # mais NE PAS vider la table des produits complétés
-            db_manager.execute("DELETE FROM produit")
-            
-            # Récupérer les IDs des produits actuellement actifs
-            if count_products > 0:
-                for potential_id in range(200, 300):
-                    is_product = safe_netlogo_reporter(
-                        netlogo, 
-                        f"is-turtle? turtle {potential_id} and [breed] of turtle {potential_id} = products", 
-                        False,
-                        False  # Ne pas logger les erreurs
-                    )
-                    if is_product:
-                        products.append(potential_id)
-                        if len(products) >= count_products:
-                            break
+            products_data = get_products_state(netlogo)
+            if products_data is not None:
+                product_index.update(product["who"] for product in products_data)
+                print(f"Nombre de produits détectés dans NetLogo: {len(products_data)} "
+                      f"(+{len(product_index.added)}, -{len(product_index.removed)})")
+                
+                # IMPORTANT: Ne retirer que les produits disparus de NetLogo
+                # mais NE PAS toucher à la table des produits complétés
+                db_manager.delete_products(product_index.removed)
         except Exception as e:
             print(f"Erreur lors de la recherche des produits: {e}")
             
-        if products:
-            print(f"Sauvegarde de l'état de {len(products)} produit(s): {products}")
-            
+        if products_data:
             # Variable pour suivre les produits presque terminés
             near_completion_products = []
+            sanitized_products = []
             
-            for product_id in products:
+            for product_data in products_data:
                 try:
-                    # Obtenir les données du produit
-                    product_data = get_product_state(netlogo, product_id)
-                    
-                    # Afficher le type et l'état pour chaque produit
-                    product_type = str(product_data["type"])
                     product_state = str(product_data["state"])
-                    print(f"Type récupéré pour produit {product_id}: {product_type}")
-                    print(f"Données récupérées pour produit {product_id}: type={product_type}, état={product_state}")
                     
                     # Convertir tous les types Java en types Python natifs
                     sanitized_data = {
                         "who": safe_int(product_data["who"], -1),
-                        "type": product_type,
+                        "type": str(product_data["type"]),
                         "state": product_state,
                         "sequence.order": safe_int(product_data["sequence.order"], 0),
                         "operations": str(product_data["operations"]),
@@ -460,8 +771,8 @@ def save_product_state():
                     
                     # Vérifier if le produit est sur le point d'être complété
                     # en vérifiant la séquence d'opérations ou le pourcentage d'achèvement
-                    operations = str(product_data["operations"])
-                    next_operation = str(product_data["next.operation"])
+                    operations = sanitized_data["operations"]
+                    next_operation = sanitized_data["next.operation"]
                     
                     # if le produit est dans le dernier 20% de sa séquence ou est dans l'état "Completed"
                     if product_state == "Completed" or (
@@ -469,31 +780,28 @@ def save_product_state():
                         (operations.count(',') - next_operation.count(',')) / max(1, operations.count(',')) >= 0.8
                     ):
                         near_completion_products.append(sanitized_data)
-                        # if déjà complété, changer l'état explicitement
-                        if product_state == "Completed":
-                            sanitized_data["state"] = "Completed"
                     
                     # Convertir l'état NetLogo en état compatible avec la BD
-                    if sanitized_data["state"] == "Procesifng.Product":
-                        sanitized_data["state"] = "In Progress"
-                    elif sanitized_data["state"] in ["Waiting", "Movement", "Completed"]:
-                        pass  # États déjà compatibles
-                    else:
+                    if sanitized_data["state"] not in ["Waiting", "Movement", "Completed"]:
                         sanitized_data["state"] = "Waiting"  # État par défaut
                     
-                    # Sauvegarder dans la base de données des produits actifs
-                    db_manager.save_product(sanitized_data)
+                    sanitized_products.append(sanitized_data)
                 except Exception as e:
-                    print(f"Erreur lors du traitement du produit {product_id}: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    print(f"Erreur lors du traitement du produit {product_data.get('who')}: {e}")
+            
+            # Sauvegarder dans la base de données des produits actifs (une transaction,
+            # seuls les produits modifiés depuis le dernier rafraîchissement sont écrits)
+            written = db_manager.save_products(sanitized_products)
+            print(f"État de {len(sanitized_products)} produit(s) sauvegardé ({written} modifié(s))")
             
-            # Traiter les produits presque complétés
-            for product_data in near_completion_products:
-                if product_data["state"] == "Completed" or product_data["next.operation"] == "":
-                    # Sauvegarder dans la table des produits complétés
-                    print(f"Sauvegarde du produit complété ID={product_data['who']}, Type={product_data['type']}")
-                    db_manager.save_completed_product(product_data, ifmulation_id)
+            # Traiter les produits presque complétés en une seule transaction
+            completed = [
+                product_data for product_data in near_completion_products
+                if product_data["state"] == "Completed" or product_data["next.operation"] == ""
+            ]
+            if completed:
+                saved = db_manager.save_completed_products(completed, ifmulation_id)
+                print(f"Sauvegarde de {saved} produit(s) complété(s)")
         else:
             print("Aucun produit trouvé à sauvegarder")
             
@@ -517,17 +825,12 @@ def save_production_operations():
     """Verifon ifmplifiée pour la sauvegarde des opérations de production"""
     # Utiliser une implémentation minimaliste qui n'utilise que les données des machines
     try:
-        # Utiliser directement les IDs connus
-        machine_ids = [186, 187, 188, 189, 190, 191, 192]
-        
         # Récupérer le temps ifmulé globalement ou utiliser ticks
         ifm_time = safe_float(safe_netlogo_reporter(netlogo, "ticks", 0), 0)
         
-        for machine_id in machine_ids:
+        # Données de base de toutes les machines du modèle en un seul appel
+        for machine_id, machine_data in get_machines_state(netlogo):
             try:
-                # Récupérer les données de base de la machine
-                machine_data = get_machine_state(netlogo, machine_id)
-                
                 # Ne sauvegarder que if la machine est en état de traitement
                 if machine_data["state"] == "Procesifng":
                     machine_name = machine_data["name"]
@@ -563,9 +866,8 @@ def save_system_snapshot():
         }
         
         # Essayer de calculer l'état des machines directement
-        for machine_id in [186, 187, 188, 189, 190, 191, 192]:
+        for machine_id, machine_data in get_machines_state(netlogo):
             try:
-                machine_data = get_machine_state(netlogo, machine_id)
                 if machine_data["state"] == "Idle":
                     system_state["idle_machines"] += 1
                 elif machine_data["state"] == "Procesifng":
@@ -589,37 +891,24 @@ def collect_ifmulation_data(current_tick):
         print(f"Erreur lors de la collecte des données: {str(e)}")
 
 def initialize_netlogo():
-    """Initialise NetLogo de manière sécurisée"""
+    """Initialise NetLogo de manière sécurisée, en réutilisant le workspace déjà chargé"""
     global netlogo
     
-    # Fermer l'instance précédente if elle existe
-    if 'netlogo' in globals() and netlogo is not None:
-        try:
-            netlogo.kill_workspace()
-            print("Workspace précédent fermé")
-        except:
-            pass
-    
-    # Créer une nouvelle instance
-    try:
-        jvm_path = r"jdk\openjdk-23.0.2_windows-x64_bin\jdk-23.0.2\bin\server\jvm.dll"
-        netlogo = pynetlogo.NetLogoLink(gui=True, jvm_path=jvm_path)
-        print("NetLogo initialisé avec succès")
-        
-        # Charger le modèle
-        MODEL_PATH = os.path.abspath("Alpha.nlogo")
-        print(f"Chargement du modèle depuis: {MODEL_PATH}")
-        netlogo.load_model(MODEL_PATH)
-        print("Modèle chargé avec succès")
-        
-        # Initialiser le modèle
-        netlogo.command("setup")
-        print("Modèle initialisé avec succès")
-        
-        return True
-    except Exception as e:
-        print(f"Erreur lors de l'initialisation de NetLogo: {str(e)}")
+    # Mode GUI ou headless et chemin de la JVM selon config.ini; la JVM et le modèle
+    # restent chargés d'une initialisation à l'autre, seul setup est réexécuté
+    # Après une perte de la JVM, acquire passe par le disjoncteur (tentative de reconnexion)
+    netlogo_settings = get_netlogo_settings()
+    netlogo = get_workspace_manager().acquire(
+        MODEL_PATH,
+        gui=netlogo_settings["gui"],
+        jvm_path=netlogo_settings["jvm_path"]
+    )
+    if netlogo is None:
+        print("Erreur lors de l'initialisation de NetLogo")
         return False
+    
+    print("Modèle initialisé avec succès")
+    return True
 
 def initialize_ifmulation():
     """Initialise la ifmulation avec des vérifications améliorées et gestion d'erreur robuste"""
@@ -634,33 +923,26 @@ def initialize_ifmulation():
     db_manager.execute("DELETE FROM completed_products")
     print("Table des produits complétés nettoyée")
     
-    # Vérification du modèle avec pluifeurs tentatives
-    max_attempts = 3
-    for attempt in range(1, max_attempts+1):
-        print(f"Tentative d'initialisation {attempt}/{max_attempts}...")
-        
-        # Réinitialiser et exécuter setup
-        safe_netlogo_command(netlogo, "clear-all")
-        time.sleep(0.5)
-        
-        safe_netlogo_command(netlogo, "setup")
-        time.sleep(1)
-        
-        # Vérifier if le modèle est correctement initialisé
-        machine_count = safe_int(safe_netlogo_reporter(netlogo, "count machines", 0))
-        node_count = safe_int(safe_netlogo_reporter(netlogo, "count nodes", 0))
-        
-        if machine_count > 0 and node_count > 0:
-            print(f"Modèle initialisé avec succès: {machine_count} machines et {node_count} nœuds")
-            break
-        
-        if attempt == max_attempts:
-            print("Échec d'initialisation du modèle après pluifeurs tentatives")
-            # Utiliser des valeurs codées en dur spécifiques au modèle Alpha
-            print("Utilisation des valeurs connues pour le modèle Alpha")
+    # Vérification du modèle: setup a déjà été exécuté et attendu par le gestionnaire
+    # de workspaces; une seconde tentative seulement si le modèle n'est pas prêt
+    if not wait_until_ready(netlogo, timeout=1.0):
+        get_workspace_manager().reset(netlogo)
+    
+    machine_count = safe_int(safe_netlogo_reporter(netlogo, "count machines", 0))
+    node_count = safe_int(safe_netlogo_reporter(netlogo, "count nodes", 0))
+    if machine_count > 0 and node_count > 0:
+        print(f"Modèle initialisé avec succès: {machine_count} machines et {node_count} nœuds")
+    else:
+        print("Échec d'initialisation du modèle")
+        # Utiliser des valeurs codées en dur spécifiques au modèle Alpha
+        print("Utilisation des valeurs connues pour le modèle Alpha")
             
-    # Définir explicitement Time-for-Posifble-launching à 0
-    safe_netlogo_command(netlogo, "set Time-for-Posifble-launching 0")
+    # Définir explicitement Time-for-Possible-launching à 0
+    safe_netlogo_command(netlogo, "set Time-for-Possible-launching 0")
+    
+    # Réinitialiser l'index des produits et la table des produits actifs associée
+    product_index.reset()
+    db_manager.clear_products()
     
     # Réinitialiser les variables
     ifmulation_time.set("0.0")
@@ -748,46 +1030,53 @@ def show_dashboard():
     bottom_right_frame = ttk.LabelFrame(graphs_frame, text="Cycle time moyen par type de produit", padding=5)
     bottom_right_frame.grid(row=1, column=1, padx=5, pady=5, sticky="nsew")
     
+    # Lecture NetLogo et sauvegarde de l'état courant, exécutées sur le thread de l'acteur
+    def save_dashboard_state():
+        try:
+            # Récupérer le temps ifmulé actuel directement depuis NetLogo
+            from netlogo_utils import get_ifmulation_time
+            current_ifmulation_time = get_ifmulation_time(netlogo)
+            
+            ticks = safe_float(safe_netlogo_reporter(netlogo, "ticks", 0), 0)
+            
+            # Vider les tables avant de sauvegarder les nouvelles données
+            # IMPORTANT: Ne pas vider la table des produits complétés; la table des
+            # produits est mise à jour par différence dans save_product_state
+            db_manager.execute("DELETE FROM machine")
+            db_manager.execute("DELETE FROM production")
+            
+            save_machine_state()  # Sauvegarde l'état actuel des machines
+            
+            # AJOUT IMPORTANT: Sauvegarder ausif l'état des produits
+            save_product_state()  # Ajouter cette ligne cruciale
+            
+            # Sauvegarder également les opérations de production actuelles
+            from netlogo_utils import save_production_operations
+            save_production_operations(netlogo, db_manager, ifmulation_id)
+            
+            # Sauvegarder l'état global du système
+            system_state = get_system_state(netlogo)
+            db_manager.save_snapshot(ifmulation_id, ticks, system_state)
+            
+            print("État actuel de la ifmulation sauvegardé pour le tableau de bord.")
+            return current_ifmulation_time
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde de l'état pour le tableau de bord: {str(e)}")
+            return None
+    
     # Fonction pour créer les graphiques avec taille réduite
     # IMPORTANT: La fonction doit être définie AVANT d'être référencée dans le bouton
     def create_charts():
+        # IMPORTANT: Forcer une mise à jour de l'état de ifmulation avant de rafraîchir
+        if hasattr(root, "ifmulation_running") and root.ifmulation_running and 'netlogo' in globals() and netlogo is not None:
+            # Le thread Tk n'attend pas la JVM: les graphiques sont tracés une fois l'état sauvegardé
+            after_future(get_actor(netlogo).submit(lambda link: save_dashboard_state()),
+                         lambda done: draw_charts(None if done.exception() else done.result()))
+        else:
+            draw_charts(None)
+    
+    def draw_charts(current_ifmulation_time):
         try:
-            # IMPORTANT: Forcer une mise à jour de l'état de ifmulation avant de rafraîchir
-            if hasattr(root, "ifmulation_running") and root.ifmulation_running and 'netlogo' in globals() and netlogo is not None:
-                # Sauvegarder l'état actuel de la ifmulation avant de rafraîchir
-                try:
-                    # Récupérer le temps ifmulé actuel directement depuis NetLogo
-                    from netlogo_utils import get_ifmulation_time
-                    current_ifmulation_time = get_ifmulation_time(netlogo)
-                    
-                    ticks = safe_float(safe_netlogo_reporter(netlogo, "ticks", 0), 0)
-                    
-                    # Vider les tables avant de sauvegarder les nouvelles données
-                    # IMPORTANT: Ne pas vider la table des produits complétés
-                    db_manager.execute("DELETE FROM machine")
-                    db_manager.execute("DELETE FROM produit")
-                    db_manager.execute("DELETE FROM production")
-                    
-                    save_machine_state()  # Sauvegarde l'état actuel des machines
-                    
-                    # AJOUT IMPORTANT: Sauvegarder ausif l'état des produits
-                    save_product_state()  # Ajouter cette ligne cruciale
-                    
-                    # Sauvegarder également les opérations de production actuelles
-                    from netlogo_utils import save_production_operations
-                    save_production_operations(netlogo, db_manager, ifmulation_id)
-                    
-                    # Sauvegarder l'état global du système
-                    system_state = get_system_state(netlogo)
-                    db_manager.save_snapshot(ifmulation_id, ticks, system_state)
-                    
-                    print("État actuel de la ifmulation sauvegardé pour le tableau de bord.")
-                except Exception as e:
-                    print(f"Erreur lors de la sauvegarde de l'état pour le tableau de bord: {str(e)}")
-                    current_ifmulation_time = None
-            else:
-                current_ifmulation_time = None
-            
             # Créer une nouvelle instance de DatabaseManager
             # Mais utiliser l'instance globale pour éviter les problèmes de connexion
             db_temp = db_manager  # Utiliser l'instance globale au lieu d'en créer une nouvelle
@@ -1290,6 +1579,15 @@ launch_button = ttk.Button(
 )
 launch_button.pack(side=tk.LEFT, padx=10)
 
+# Bouton pour reprendre une simulation interrompue depuis son dernier point de reprise
+resume_button = ttk.Button(
+    buttons_frame,
+    text="Reprendre",
+    command=resume_ifmulation,
+    style="Secondary.TButton"
+)
+resume_button.pack(side=tk.LEFT, padx=10)
+
 # Ajouter le bouton pour afficher le tableau de bord
 dashboard_button = ttk.Button(
     buttons_frame,
@@ -1304,10 +1602,16 @@ def on_cloifng():
     """Fonction appelée lorsque l'application se ferme"""
     global netlogo
     
+    # Conserver l'avancement d'une simulation en cours pour pouvoir la reprendre
+    if hasattr(root, "ifmulation_running") and root.ifmulation_running:
+        save_checkpoint()
+    
+    if snapshot_recorder is not None:
+        snapshot_recorder.close()
+    
     try:
-        if 'netlogo' in globals() and netlogo is not None:
-            netlogo.kill_workspace()
-            print("Workspace NetLogo fermé")
+        get_workspace_manager().shutdown()
+        netlogo = None
     except Exception as e:
         print(f"Erreur lors de la fermeture de NetLogo: {str(e)}")
     
@@ -2,6 +2,11 @@ import tkinter as tk
 import time
 import threading
 from utils import safe_float, safe_int
+from settings import get_simulation_settings, get_netlogo_settings
+from stepping import ChunkSizer, get_go_command
+from circuit_breaker import get_jvm_breaker, can_restart_jvm
+from snapshot_log import open_snapshot_recorder
+from call_stats import get_call_stats
 
 class SimulationController:
     """
@@ -25,11 +30,25 @@ class SimulationController:
         self.db_manager = db_manager
         self.dashboard_manager = dashboard_manager
         
+        # Mode d'avancement (single ou turbo) lu dans config.ini
+        self.settings = get_simulation_settings()
+        self.chunk_sizer = ChunkSizer(
+            target_interval=self.settings["sample_interval"],
+            max_chunk=self.settings["max_chunk_ticks"]
+        )
+        
         # Variables de simulation
         self.simulation_running = False
         self.simulation_id = None
         self.products_created = 0
         
+        # Journal des états affichés (record_dir dans config.ini), rejouable sans JVM
+        self.recorder = None
+        
+        # Statistiques des appels NetLogo enregistrées toutes les call_stats_interval secondes
+        self.call_stats_interval = get_netlogo_settings()["call_stats_interval"]
+        self.last_call_stats = time.perf_counter()
+        
         # Initialisation de l'interface
         self.init_ui()
         
@@ -103,6 +122,7 @@ class SimulationController:
                 
                 # Exécuter la commande setup de NetLogo
                 self.netlogo_connector.execute_command("setup")
+                self.recorder = open_snapshot_recorder(self.netlogo_connector.model_path)
                 
                 # Mettre à jour l'interface
                 self.status_label.config(text="Status: Simulation en cours...")
@@ -123,35 +143,78 @@ class SimulationController:
         Exécute la simulation NetLogo de manière continue.
         """
         try:
+            turbo = self.settings["stepping"] in ("turbo", "next_event")
             while self.simulation_running:
-                # Exécuter une étape de la simulation
-                self.netlogo_connector.execute_command("go")
+                # Exécuter une étape de la simulation (ou un bloc de ticks en mode turbo)
+                if self.settings["stepping"] == "next_event":
+                    if not self.netlogo_connector.step_to_next_event(
+                            max_skip=self.settings["max_chunk_ticks"], run_mode=self.settings["run_mode"]):
+                        # Aucun événement à venir: attendre au lieu d'interroger NetLogo en boucle
+                        time.sleep(0.05)
+                elif turbo:
+                    self.netlogo_connector.step_chunk(self.chunk_sizer, run_mode=self.settings["run_mode"])
+                else:
+                    self.netlogo_connector.execute_command(get_go_command(self.settings["run_mode"]))
+                
+                # JVM perdue: sortir de la boucle au lieu d'échouer à chaque itération
+                if get_jvm_breaker().is_open:
+                    self.simulation_running = False
+                    self.reconnect()
+                    return
                 
-                # Récupérer les informations actuelles
-                current_time = self.netlogo_connector.get_reporter_value("ticks", 0.0)
+                # Récupérer les informations actuelles en un seul appel
+                telemetry = self.netlogo_connector.get_telemetry()
+                if telemetry is None:
+                    continue
                 
                 # Mettre à jour l'interface
-                self.root.after(0, lambda t=current_time: self.update_ui(t))
+                self.root.after(0, lambda t=telemetry.ticks, n=telemetry.products: self.update_ui(t, n))
                 
-                # Courte pause pour ne pas surcharger NetLogo
-                time.sleep(0.05)
+                # Courte pause pour ne pas surcharger NetLogo (inutile en mode turbo,
+                # chaque bloc durant déjà l'intervalle d'échantillonnage visé, et en
+                # mode débit maximal)
+                if not turbo and self.settings["run_mode"] != "max_throughput":
+                    time.sleep(0.05)
         except Exception as e:
             print(f"Erreur dans la boucle de simulation: {e}")
             self.root.after(0, lambda: self.status_label.config(text=f"Status: Erreur: {str(e)}"))
             self.simulation_running = False
     
-    def update_ui(self, current_time):
+    def reconnect(self):
+        """
+        Recrée le workspace NetLogo après une perte de la JVM, avec attente
+        exponentielle entre les tentatives (appelée depuis le thread de simulation).
+        Avec le backend pynetlogo, la JVM ne peut pas être relancée: l'utilisateur
+        est invité à redémarrer l'application.
+        """
+        if can_restart_jvm():
+            self.root.after(0, lambda: self.status_label.config(text="Status: JVM fermée, reconnexion..."))
+            connected = get_jvm_breaker().reconnect(
+                lambda: self.netlogo_connector.initialize(self.netlogo_connector.model_path or "Alpha.nlogo"))
+        else:
+            # JPype ne relance pas la JVM dans le même processus
+            print("JVM fermée: redémarrer l'application pour relancer NetLogo")
+            connected = False
+        
+        def show_result():
+            if connected:
+                self.status_label.config(text="Status: NetLogo reconnecté")
+            else:
+                self.status_label.config(text="Status: Reconnexion impossible, redémarrer l'application")
+            self.start_button.config(state=tk.NORMAL if connected else tk.DISABLED)
+            self.stop_button.config(state=tk.DISABLED)
+        self.root.after(0, show_result)
+    
+    def update_ui(self, current_time, count_products):
         """
         Met à jour l'interface utilisateur avec les informations actuelles.
         
         Args:
             current_time: Temps actuel de la simulation
+            count_products: Nombre de produits présents dans la simulation
         """
         # Mettre à jour les étiquettes
         self.time_label.config(text=f"Temps: {current_time:.1f}")
-        
-        # Compter les produits
-        count_products = self.netlogo_connector.get_reporter_value("count products", 0)
         self.products_label.config(text=f"Produits: {count_products}")
     
     def stop_simulation(self):
@@ -167,9 +230,26 @@ class SimulationController:
             self.start_button.config(state=tk.NORMAL)
             self.stop_button.config(state=tk.DISABLED)
             
-            # Finaliser la simulation dans la base de données
-            current_time = self.netlogo_connector.get_reporter_value("ticks", 0.0)
-            self.db_manager.end_simulation(self.simulation_id, current_time)
+            # Lecture des ticks sur le thread de l'acteur, après les lectures déjà en file;
+            # la simulation est finalisée dans la base une fois la valeur reçue
+            future = self.netlogo_connector.submit(self.netlogo_connector.get_reporter_value, "ticks", 0.0)
+            self.after_future(future, self.finish_stop)
+    
+    def finish_stop(self, future):
+        """
+        Finalise la simulation arrêtée: base de données, journal d'états, statistiques d'appels
+        
+        Args:
+            future: Future terminé de la lecture des ticks (0 en cas d'échec)
+        """
+        current_time = 0.0 if future.exception() is not None else future.result()
+        self.db_manager.end_simulation(self.simulation_id, current_time)
+        
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        
+        get_call_stats().flush(self.db_manager, self.simulation_id)
     
     def start_dashboard_timer(self):
         """
@@ -178,24 +258,88 @@ class SimulationController:
         # Mettre à jour le tableau de bord toutes les 2 secondes
         def update_timer():
             if self.simulation_running:
-                self.update_dashboard()
+                # Lecture NetLogo (et enregistrement) sur le thread de l'acteur; le thread Tk
+                # ne fait que l'affichage
+                future = self.netlogo_connector.submit(self.read_sample)
+                self.after_future(future, self.finish_sample)
+                
+                if self.call_stats_interval > 0 and time.perf_counter() - self.last_call_stats >= self.call_stats_interval:
+                    self.last_call_stats = time.perf_counter()
+                    get_call_stats().flush(self.db_manager, self.simulation_id)
             self.root.after(2000, update_timer)
         
         # Démarrer le timer
         self.root.after(2000, update_timer)
     
-    def update_dashboard(self):
+    def read_sample(self):
+        """
+        Lit les données du tableau de bord et les ajoute au journal d'états s'il est ouvert
+        
+        Returns:
+            dict: Échantillon de NetLogoConnector.sample, ou None en cas d'erreur
+        """
+        sample = self.netlogo_connector.sample()
+        if self.recorder is not None:
+            self.recorder.record(sample)
+        return sample
+    
+    def finish_sample(self, future):
+        """
+        Affiche l'échantillon lu par read_sample, ou journalise l'échec de la lecture
+        (connecteur non initialisé, erreur NetLogo...). Le timer du tableau de bord est
+        replanifié indépendamment: la lecture suivante a lieu normalement.
+        
+        Args:
+            future: Future terminé renvoyé par NetLogoConnector.submit
+        """
+        error = future.exception()
+        if error is not None:
+            print(f"Erreur lors de la lecture du tableau de bord: {str(error)}")
+            return
+        self.show_sample(future.result())
+    
+    def show_sample(self, sample):
+        """
+        Affiche un échantillon lu par read_sample (thread Tk)
+        
+        Args:
+            sample: dict {"products", "machines", ...} ou None
+        """
+        if sample is not None:
+            self.update_dashboard(sample["products"], sample["machines"])
+    
+    def after_future(self, future, callback, poll_ms=20):
+        """
+        Appelle callback(future) sur le thread Tk une fois le future terminé, sans bloquer
+        
+        Args:
+            future: Future renvoyé par l'acteur NetLogo
+            callback: Fonction appelée avec le future terminé
+            poll_ms: Intervalle de vérification (millisecondes)
+        """
+        if future.done():
+            callback(future)
+        else:
+            self.root.after(poll_ms, lambda: self.after_future(future, callback, poll_ms))
+    
+    def update_dashboard(self, products_data=None, machines_data=None):
         """
         Met à jour le tableau de bord avec les données de la simulation
+        
+        Args:
+            products_data: Données des produits déjà lues (lues dans NetLogo si None)
+            machines_data: Données des machines déjà lues (lues dans NetLogo si None)
         """
         # Récupérer les données des produits
-        products_data = self.netlogo_connector.get_products_data()
+        if products_data is None:
+            products_data = self.netlogo_connector.get_products_data()
         
         # Mettre à jour les statistiques avec les données récupérées
         self.dashboard_manager.update_product_stats(products_data)
         
         # Récupérer les données des machines
-        machines_data = self.netlogo_connector.get_machines_data()
+        if machines_data is None:
+            machines_data = self.netlogo_connector.get_machines_data()
         self.dashboard_manager.update_machine_stats(machines_data)
         
         # Vérification de cohérence
@@ -0,0 +1,139 @@
+"""
+Introspection du modèle après setup: IDs, noms, opérations et temps des machines lus en
+un seul appel, mis en cache par empreinte du fichier modèle
+"""
+from collections import namedtuple
+
+from utils import safe_int, safe_float, safe_str, to_python_list, model_file_hash
+from netlogo_utils import safe_netlogo_reporter
+
+# Attributs statiques d'une machine (fixés par setup)
+MachineInfo = namedtuple("MachineInfo", ["who", "name", "operations", "operation_times", "xcor", "ycor", "heading"])
+
+MACHINE_LAYOUT_REPORTER = (
+    "[(list who Machine.Name Machine.Operations.Type Machine.Operations.Time xcor ycor heading)] of machines"
+)
+
+# Empreinte du modèle -> ModelLayout
+_layout_cache = {}
+# id du workspace -> ModelLayout du modèle qui y est chargé
+_workspace_layouts = {}
+
+class ModelLayout:
+    """
+    Disposition des machines d'un modèle, triée par who.
+
+    Les collecteurs (get_machine_state, sauvegardes de main.py, instantanés) s'en servent
+    à la place d'IDs codés en dur: un modèle avec plus de machines fonctionne sans
+    modification du code.
+    """
+    def __init__(self, machines):
+        """
+        Args:
+            machines: Liste de MachineInfo
+        """
+        self.machines = sorted(machines, key=lambda machine: machine.who)
+        self.machine_ids = [machine.who for machine in self.machines]
+        self.by_id = {machine.who: machine for machine in self.machines}
+        self.by_name = {machine.name: machine for machine in self.machines}
+
+    def __len__(self):
+        return len(self.machines)
+
+def introspect_model(netlogo):
+    """
+    Lit les attributs statiques de toutes les machines en un seul appel
+
+    Args:
+        netlogo: L'instance NetLogoLink (après setup)
+
+    Returns:
+        ModelLayout ou None si le reporter a échoué ou s'il n'y a aucune machine
+    """
+    rows = safe_netlogo_reporter(netlogo, MACHINE_LAYOUT_REPORTER, None)
+    if rows is None:
+        return None
+
+    machines = []
+    for row in to_python_list(rows):
+        row = to_python_list(row)
+        if len(row) < 7:
+            continue
+        who = safe_int(row[0], -1)
+        if who < 0:
+            continue
+        machines.append(MachineInfo(
+            who=who,
+            name=safe_str(row[1], f"Machine{who}") or f"Machine{who}",
+            operations=[safe_str(operation) for operation in to_python_list(row[2])],
+            operation_times=[safe_float(time_value) for time_value in to_python_list(row[3])],
+            xcor=safe_float(row[4]),
+            ycor=safe_float(row[5]),
+            heading=safe_float(row[6]),
+        ))
+
+    if not machines:
+        return None
+    return ModelLayout(machines)
+
+def load_model_layout(netlogo, model_path):
+    """
+    Retourne la disposition du modèle, introspectée une seule fois par version du fichier
+
+    Args:
+        netlogo: L'instance NetLogoLink (après setup)
+        model_path: Chemin vers le fichier modèle chargé
+
+    Returns:
+        ModelLayout ou None en cas d'échec
+    """
+    try:
+        model_hash = model_file_hash(model_path)
+    except OSError:
+        model_hash = None
+
+    layout = _layout_cache.get(model_hash) if model_hash is not None else None
+    if layout is None:
+        layout = introspect_model(netlogo)
+        if layout is None:
+            return None
+        print(f"Introspection du modèle: {len(layout)} machines ({', '.join(machine.name for machine in layout.machines)})")
+        if model_hash is not None:
+            _layout_cache[model_hash] = layout
+
+    _workspace_layouts[id(netlogo)] = layout
+    return layout
+
+def get_model_layout(netlogo):
+    """
+    Retourne la disposition du modèle chargé dans un workspace
+
+    Le gestionnaire de workspaces l'enregistre après chaque setup; un workspace
+    créé sans lui est introspecté au premier appel.
+
+    Args:
+        netlogo: L'instance NetLogoLink
+
+    Returns:
+        ModelLayout ou None si le modèle ne peut pas être introspecté
+    """
+    layout = _workspace_layouts.get(id(netlogo))
+    if layout is None:
+        layout = introspect_model(netlogo)
+        if layout is not None:
+            _workspace_layouts[id(netlogo)] = layout
+    return layout
+
+def get_machine_ids(netlogo):
+    """
+    Retourne les IDs (who) des machines du modèle chargé
+
+    Returns:
+        list: IDs triés, liste vide si le modèle ne peut pas être introspecté
+    """
+    layout = get_model_layout(netlogo)
+    return list(layout.machine_ids) if layout is not None else []
+
+def forget_workspace(netlogo):
+    """Oublie la disposition associée à un workspace fermé"""
+    _workspace_layouts.pop(id(netlogo), None)
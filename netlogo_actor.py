@@ -0,0 +1,164 @@
+"""
+Acteur NetLogo: un thread unique possède le NetLogoLink, les autres threads lui soumettent
+commandes et reporters et reçoivent des futures
+"""
+import queue
+import threading
+from concurrent.futures import Future
+
+from netlogo_utils import safe_netlogo_reporter
+
+_STOP = object()
+
+class NetLogoActor:
+    """
+    Sérialise tous les accès à la JVM sur un thread dédié. Pour évaluer plusieurs
+    reporters en un seul aller-retour, utiliser report_many().
+    """
+    def __init__(self, link, name="netlogo-actor"):
+        """
+        Args:
+            link: Instance NetLogoLink possédée par l'acteur
+            name: Nom du thread
+        """
+        self.link = link
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self.proxy = NetLogoLinkProxy(self)
+
+    def is_actor_thread(self):
+        """Indique si l'appelant est le thread de l'acteur"""
+        return threading.current_thread() is self._thread
+
+    def submit(self, function, *args):
+        """
+        Exécute function(link, *args) sur le thread de l'acteur
+
+        Returns:
+            Future: Résultat de la fonction (ou son exception)
+        """
+        future = Future()
+        if self.is_actor_thread():
+            # Appel imbriqué depuis une tâche de l'acteur: exécution directe
+            self._resolve(future, function, self.link, *args)
+        else:
+            self._jobs.put(("call", (function, args), future))
+        return future
+
+    def command(self, command):
+        """Soumet une commande NetLogo; le future renvoie None ou lève l'erreur NetLogo"""
+        return self.submit(lambda link: link.command(command))
+
+    def report(self, reporter):
+        """
+        Soumet un reporter NetLogo
+
+        Returns:
+            Future: Valeur renvoyée par NetLogo (ou l'erreur NetLogo)
+        """
+        return self.submit(lambda link: link.report(reporter))
+
+    def report_many(self, reporters):
+        """
+        Soumet plusieurs reporters évalués en un seul appel
+
+        L'appel passe par safe_netlogo_reporter (disjoncteur JVM et statistiques d'appels)
+
+        Returns:
+            Future: Liste des valeurs, dans l'ordre des reporters (RuntimeError en cas d'échec)
+        """
+        reporters = list(reporters)
+        expression = "(list " + " ".join(f"({reporter})" for reporter in reporters) + ")"
+
+        def evaluate(link):
+            if not reporters:
+                return []
+            values = safe_netlogo_reporter(link, expression, None)
+            if values is None:
+                raise RuntimeError(f"Échec de l'évaluation des reporters {reporters}")
+            return list(values)
+        return self.submit(evaluate)
+
+    def stop(self, timeout=5.0):
+        """Arrête le thread après les tâches déjà soumises"""
+        if self._thread.is_alive():
+            self._jobs.put((_STOP, None, None))
+            if not self.is_actor_thread():
+                self._thread.join(timeout)
+
+    def _resolve(self, future, function, *args):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def _run(self):
+        while True:
+            kind, payload, future = self._jobs.get()
+            if kind is _STOP:
+                break
+            function, args = payload
+            self._resolve(future, function, self.link, *args)
+
+class NetLogoLinkProxy:
+    """
+    Objet compatible avec NetLogoLink (report, command, repeat_report, load_model,
+    kill_workspace) dont chaque appel passe par l'acteur et attend son résultat.
+
+    Permet d'utiliser safe_netlogo_reporter / safe_netlogo_command et les autres
+    utilitaires existants depuis n'importe quel thread sans accès concurrent à la JVM.
+    """
+    def __init__(self, actor):
+        self.actor = actor
+
+    def report(self, reporter):
+        return self.actor.report(reporter).result()
+
+    def command(self, command):
+        return self.actor.command(command).result()
+
+    def repeat_report(self, *args, **kwargs):
+        return self.actor.submit(lambda link: link.repeat_report(*args, **kwargs)).result()
+
+    def load_model(self, model_path):
+        return self.actor.submit(lambda link: link.load_model(model_path)).result()
+
+    def kill_workspace(self):
+        try:
+            return self.actor.submit(lambda link: link.kill_workspace()).result()
+        finally:
+            stop_actor(self.actor.link)
+
+# Un acteur par NetLogoLink (clé: id du link)
+_actors = {}
+_actors_lock = threading.Lock()
+
+def get_actor(link):
+    """
+    Retourne l'acteur propriétaire d'un NetLogoLink, en le créant si besoin
+
+    Args:
+        link: Instance NetLogoLink, ou un proxy déjà associé à un acteur
+
+    Returns:
+        NetLogoActor
+    """
+    if isinstance(link, NetLogoLinkProxy):
+        return link.actor
+
+    with _actors_lock:
+        actor = _actors.get(id(link))
+        if actor is None or actor.link is not link:
+            actor = NetLogoActor(link)
+            _actors[id(link)] = actor
+        return actor
+
+def stop_actor(link):
+    """Arrête l'acteur associé à un NetLogoLink (à la fermeture du workspace)"""
+    with _actors_lock:
+        actor = _actors.pop(id(link), None)
+    if actor is not None:
+        actor.stop()
@@ -1,21 +1,242 @@
-import pynetlogo
 import os
-from utils import safe_float, safe_int
+import numpy as np
+from utils import safe_float, safe_int, safe_str, to_python_list
+from settings import get_netlogo_settings
+from concurrent.futures import Future
+from workspace_manager import get_workspace_manager
+from netlogo_actor import get_actor
+from stepping import (
+    build_repeat_command, run_chunk, run_series_chunk, run_to_next_event, run_max_throughput, get_go_command
+)
 from netlogo_utils import (
     safe_netlogo_reporter, safe_netlogo_command,
-    get_machine_state, get_product_state, get_system_state
+    get_products_state, get_system_state, ProductIndex, get_telemetry,
+    collect_system_series
 )
 
+# Colonnes renvoyées par le reporter "system-snapshot" du modèle Alpha,
+# dans l'ordre exact des listes construites côté NetLogo
+SNAPSHOT_MACHINE_FIELDS = [
+    ("name", "str"),
+    ("state", "str"),
+    ("next.completion", "float"),
+    ("operations", "list"),
+    ("operation.times", "list"),
+    ("xcor", "float"),
+    ("ycor", "float"),
+    ("heading", "float"),
+]
+
+SNAPSHOT_PRODUCT_FIELDS = [
+    ("state", "str"),
+    ("type", "str"),
+    ("next.operation", "str"),
+    ("operations", "list"),
+    ("sequence.order", "int"),
+    ("next.completion.time", "float"),
+    ("xcor", "float"),
+    ("ycor", "float"),
+    ("heading", "float"),
+]
+
+def _decode_snapshot_rows(rows, fields):
+    """
+    Convertit une liste de lignes NetLogo en colonnes NumPy
+    
+    Args:
+        rows: Liste de lignes (une liste NetLogo par agent)
+        fields: Liste de tuples (nom de colonne, type) décrivant chaque position
+        
+    Returns:
+        dict: Dictionnaire {nom de colonne: tableau NumPy}
+    """
+    rows = [to_python_list(row) for row in to_python_list(rows)]
+    columns = {}
+    
+    for index, (name, kind) in enumerate(fields):
+        values = [row[index] if index < len(row) else None for row in rows]
+        
+        if kind == "float":
+            columns[name] = np.array([safe_float(v, 0.0) for v in values], dtype=np.float64)
+        elif kind == "int":
+            columns[name] = np.array([safe_int(v, 0) for v in values], dtype=np.int64)
+        elif kind == "list":
+            column = np.empty(len(values), dtype=object)
+            for i, v in enumerate(values):
+                column[i] = [safe_str(item) if not isinstance(item, (int, float)) else item
+                             for item in to_python_list(v)]
+            columns[name] = column
+        else:
+            columns[name] = np.array([safe_str(v) for v in values], dtype=object)
+    
+    return columns
+
+def decode_system_snapshot(raw_snapshot):
+    """
+    Décode le résultat du reporter "system-snapshot" en tableaux colonnes
+    
+    Les machines sont triées par nom pour obtenir un ordre stable, NetLogo
+    renvoyant les agents d'un "of" dans un ordre aléatoire.
+    
+    Args:
+        raw_snapshot: Valeur renvoyée par netlogo.report("system-snapshot")
+        
+    Returns:
+        dict: {"machines": {colonne: ndarray}, "products": {colonne: ndarray}}
+              ou None si le résultat n'a pas la forme attendue
+    """
+    parts = to_python_list(raw_snapshot)
+    if len(parts) != 2:
+        return None
+    
+    machines = _decode_snapshot_rows(parts[0], SNAPSHOT_MACHINE_FIELDS)
+    products = _decode_snapshot_rows(parts[1], SNAPSHOT_PRODUCT_FIELDS)
+    
+    # Ordre stable des machines (M1, M2, ...)
+    order = np.argsort(machines["name"].astype(str), kind="stable")
+    machines = {name: column[order] for name, column in machines.items()}
+    
+    return {"machines": machines, "products": products}
+
+def normalize_machine_state(state, remaining_time):
+    """
+    Convertit l'état NetLogo d'une machine en état compatible avec la base de données
+    
+    Args:
+        state: État NetLogo (ex: "Machine.Processing")
+        remaining_time: Valeur de Next.Completion de la machine
+        
+    Returns:
+        str: "Idle", "Processing" ou "Down"
+    """
+    if state == "Machine.Processing":
+        return "Processing"
+    if state in ["Idle", "Down"]:
+        # Une machine avec une complétion prévue est considérée active
+        if state == "Idle" and 0 < remaining_time < 1000000:
+            return "Processing"
+        return state
+    return "Idle"
+
+def machines_from_snapshot(snapshot):
+    """
+    Convertit les colonnes machines d'un instantané décodé en liste de dictionnaires
+    
+    Args:
+        snapshot: Résultat de decode_system_snapshot
+        
+    Returns:
+        list: Données des machines (format de NetLogoConnector.get_machines_data)
+    """
+    machines = snapshot["machines"]
+    machines_data = []
+    for i in range(len(machines["name"])):
+        remaining_time = float(machines["next.completion"][i])
+        machines_data.append({
+            "name": machines["name"][i],
+            "state": normalize_machine_state(machines["state"][i], remaining_time),
+            "remaining.time": remaining_time,
+            "operations": str(machines["operations"][i]),
+            "operation.times": str(machines["operation.times"][i]),
+            "xcor": float(machines["xcor"][i]),
+            "ycor": float(machines["ycor"][i]),
+            "heading": float(machines["heading"][i])
+        })
+    
+    return machines_data
+
+def read_sample(netlogo, telemetry=None):
+    """
+    Lit en trois appels tout ce qu'affiche le tableau de bord: télémétrie,
+    instantané system-snapshot et état groupé des produits
+    
+    Args:
+        netlogo: L'instance NetLogoLink
+        telemetry: Télémétrie déjà lue pour ce pas (lue dans NetLogo si None)
+        
+    Returns:
+        dict: {"telemetry": TelemetryRecord, "snapshot": valeur brute de system-snapshot,
+               "products": liste de get_products_state, "machines": liste de machines_from_snapshot}
+              ou None si l'instantané ou les produits n'ont pas pu être lus
+    """
+    if telemetry is None:
+        telemetry = get_telemetry(netlogo)
+    
+    raw_snapshot = safe_netlogo_reporter(netlogo, "system-snapshot", None)
+    products = get_products_state(netlogo)
+    if raw_snapshot is None or products is None:
+        return None
+    
+    try:
+        snapshot = decode_system_snapshot(raw_snapshot)
+        machines = machines_from_snapshot(snapshot) if snapshot is not None else []
+    except Exception as e:
+        print(f"Erreur lors du décodage de system-snapshot: {str(e)}")
+        return None
+    
+    return {"telemetry": telemetry, "snapshot": raw_snapshot, "products": products, "machines": machines}
+
+def create_netlogo_link(gui=None, jvm_path=None, netlogo_home=None):
+    """
+    Crée une instance NetLogoLink à partir de la configuration
+    
+    Les paramètres fournis explicitement sont prioritaires sur config.ini. Avec
+    backend = fake, retourne un fake_netlogo.FakeNetLogoLink (aucune JVM démarrée).
+    
+    Args:
+        gui (bool): True pour l'interface NetLogo, False pour le mode headless
+        jvm_path (str): Chemin vers la JVM
+        netlogo_home (str): Répertoire d'installation de NetLogo
+        
+    Returns:
+        pynetlogo.NetLogoLink: La nouvelle instance
+    """
+    settings = get_netlogo_settings()
+    if settings["backend"] == "fake":
+        from fake_netlogo import FakeNetLogoLink
+        print(f"Démarrage du faux NetLogo (usine synthétique, latence {settings['fake_latency']} s)")
+        return FakeNetLogoLink(latency=settings["fake_latency"])
+    
+    if gui is None:
+        gui = settings["gui"]
+    if jvm_path is None:
+        jvm_path = settings["jvm_path"]
+    if netlogo_home is None:
+        netlogo_home = settings["netlogo_home"]
+    
+    link_kwargs = {"gui": gui}
+    if jvm_path:
+        link_kwargs["jvm_path"] = jvm_path
+    if netlogo_home:
+        link_kwargs["netlogo_home"] = netlogo_home
+    
+    # Import différé: le backend fake fonctionne sans pynetlogo ni JPype
+    import pynetlogo
+    print(f"Démarrage de NetLogo en mode {'GUI' if gui else 'headless'}")
+    return pynetlogo.NetLogoLink(**link_kwargs)
+
 class NetLogoConnector:
     """
     Classe qui fournit une interface pour interagir avec NetLogo.
     """
-    def __init__(self):
-        """Initialisation du connecteur NetLogo"""
+    def __init__(self, gui=None, jvm_path=None, workspace_name=None):
+        """
+        Initialisation du connecteur NetLogo
+        
+        Args:
+            gui (bool): Mode d'affichage; None pour utiliser le mode de config.ini
+            jvm_path (str): Chemin vers la JVM; None pour la détection automatique
+            workspace_name (str): Nom d'un workspace dédié (None: workspace partagé du mode)
+        """
         self.netlogo = None
         self.model_path = None
         self.initialized = False
-        self.jvm_path = r"jdk\openjdk-23.0.2_windows-x64_bin\jdk-23.0.2\bin\server\jvm.dll"
+        self.product_index = ProductIndex()
+        
+        settings = get_netlogo_settings()
+        self.gui = settings["gui"] if gui is None else gui
+        self.jvm_path = jvm_path or settings["jvm_path"]
+        self.workspace_name = workspace_name
 
     def initialize(self, model_path="Alpha.nlogo"):
         """
@@ -28,28 +249,16 @@ class NetLogoConnector:
             bool: True si l'initialisation est réussie, False sinon
         """
         try:
-            # Fermer l'instance précédente si elle existe
-            if self.netlogo is not None:
-                try:
-                    self.netlogo.kill_workspace()
-                    print("Workspace précédent fermé")
-                except:
-                    pass
-            
-            # Créer une nouvelle instance
-            self.netlogo = pynetlogo.NetLogoLink(gui=True, jvm_path=self.jvm_path)
-            print("NetLogo initialisé avec succès")
-            
-            # Définir et charger le modèle
+            # Réutiliser la JVM et le modèle déjà chargés: seul setup est exécuté
             self.model_path = os.path.abspath(model_path)
-            print(f"Chargement du modèle depuis: {self.model_path}")
-            self.netlogo.load_model(self.model_path)
-            print("Modèle chargé avec succès")
-            
-            # Initialiser le modèle
-            self.netlogo.command("setup")
+            self.netlogo = get_workspace_manager().acquire(
+                self.model_path, gui=self.gui, jvm_path=self.jvm_path, name=self.workspace_name)
+            if self.netlogo is None:
+                self.initialized = False
+                return False
             print("Modèle initialisé avec succès")
             
+            self.product_index.reset()
             self.initialized = True
             return True
         except Exception as e:
@@ -68,35 +277,83 @@ class NetLogoConnector:
             return []
         
         try:
-            # Récupérer le nombre de produits
-            count_products = safe_int(safe_netlogo_reporter(self.netlogo, "count products", 0), 0)
-            
-            products_data = []
-            if count_products > 0:
-                # Récupérer les IDs des produits
-                for potential_id in range(200, 300):  # Plage typique pour les IDs de produits dans NetLogo
-                    is_product = safe_netlogo_reporter(
-                        self.netlogo, 
-                        f"is-turtle? turtle {potential_id} and [breed] of turtle {potential_id} = products", 
-                        False,
-                        False  # Ne pas logger les erreurs pour chaque tentative
-                    )
-                    
-                    if is_product:
-                        # Récupérer les données du produit
-                        product_data = get_product_state(self.netlogo, potential_id)
-                        if product_data:
-                            products_data.append(product_data)
-                        
-                        # Si on a trouvé tous les produits, on arrête
-                        if len(products_data) >= count_products:
-                            break
+            # Un seul appel pour tous les produits, quel que soit leur nombre
+            products_data = get_products_state(self.netlogo)
+            if products_data is None:
+                return []
             
+            self.product_index.update(product["who"] for product in products_data)
             return products_data
         except Exception as e:
             print(f"Erreur lors de la récupération des données des produits: {str(e)}")
             return []
 
+    def get_snapshot(self):
+        """
+        Capture l'état complet des machines et des produits en un seul appel
+        au reporter "system-snapshot" du modèle
+        
+        Returns:
+            dict: {"machines": {colonne: ndarray}, "products": {colonne: ndarray}}
+                  ou None en cas d'erreur
+        """
+        if not self.initialized or self.netlogo is None:
+            return None
+        
+        raw_snapshot = safe_netlogo_reporter(self.netlogo, "system-snapshot", None)
+        if raw_snapshot is None:
+            return None
+        
+        try:
+            return decode_system_snapshot(raw_snapshot)
+        except Exception as e:
+            print(f"Erreur lors du décodage de system-snapshot: {str(e)}")
+            return None
+
+    def submit(self, function, *args):
+        """
+        Exécute function(*args) sur le thread de l'acteur qui possède le workspace
+        
+        Les méthodes du connecteur appelées depuis function s'exécutent directement,
+        sans repasser par la file de l'acteur.
+        
+        Returns:
+            concurrent.futures.Future: Résultat de la fonction
+        """
+        if not self.initialized or self.netlogo is None:
+            future = Future()
+            future.set_exception(RuntimeError("NetLogo n'est pas initialisé"))
+            return future
+        
+        return get_actor(self.netlogo).submit(lambda link: function(*args))
+
+    def sample(self):
+        """
+        Lit en une passe les données du tableau de bord (voir read_sample)
+        
+        Returns:
+            dict: {"telemetry", "snapshot", "products", "machines"} ou None en cas d'erreur
+        """
+        if not self.initialized or self.netlogo is None:
+            return None
+        
+        sample = read_sample(self.netlogo)
+        if sample is not None:
+            self.product_index.update(product["who"] for product in sample["products"])
+        return sample
+
+    def get_telemetry(self):
+        """
+        Récupère tous les scalaires suivis à chaque tick en un seul appel
+        
+        Returns:
+            telemetry.TelemetryRecord ou None en cas d'erreur
+        """
+        if not self.initialized or self.netlogo is None:
+            return None
+        
+        return get_telemetry(self.netlogo)
+
     def get_machines_data(self):
         """
         Récupère les données des machines depuis NetLogo
@@ -108,20 +365,11 @@ class NetLogoConnector:
             return []
         
         try:
-            # Les IDs connus des machines pour le modèle Alpha
-            machine_ids = [186, 187, 188, 189, 190, 191, 192]
+            snapshot = self.get_snapshot()
+            if snapshot is None:
+                return []
             
-            machines_data = []
-            for machine_id in machine_ids:
-                try:
-                    # Récupérer les données de la machine
-                    machine_data = get_machine_state(self.netlogo, machine_id)
-                    if machine_data:
-                        machines_data.append(machine_data)
-                except Exception as e:
-                    print(f"Erreur lors de la récupération des données de la machine {machine_id}: {e}")
-            
-            return machines_data
+            return machines_from_snapshot(snapshot)
         except Exception as e:
             print(f"Erreur lors de la récupération des données des machines: {str(e)}")
             return []
@@ -141,6 +389,89 @@ class NetLogoConnector:
         
         return safe_netlogo_command(self.netlogo, command)
 
+    def step(self, ticks=1, run_mode="normal"):
+        """
+        Exécute plusieurs ticks en une seule commande NetLogo
+        
+        Args:
+            ticks (int): Nombre de ticks à exécuter
+            run_mode (str): "normal" ou "max_throughput" (sans le wait de go)
+            
+        Returns:
+            bool: True si la commande est exécutée avec succès, False sinon
+        """
+        return self.execute_command(build_repeat_command(ticks, get_go_command(run_mode)))
+
+    def step_chunk(self, sizer, limit=None, run_mode="normal"):
+        """
+        Exécute un bloc de ticks dont la taille est adaptée par un ChunkSizer
+        
+        Args:
+            sizer: Instance de stepping.ChunkSizer
+            limit (int): Nombre maximal de ticks pour ce bloc
+            run_mode (str): "normal" ou "max_throughput" (sans le wait de go)
+            
+        Returns:
+            int: Nombre de ticks exécutés (0 en cas d'échec)
+        """
+        return run_chunk(self.execute_command, sizer, limit, get_go_command(run_mode))
+
+    def step_to_next_event(self, launch_pending=False, max_skip=500, run_mode="normal"):
+        """
+        Avance jusqu'au prochain événement (fin d'opération machine ou lancement possible)
+        
+        Args:
+            launch_pending (bool): True s'il reste des produits à lancer
+            max_skip (int): Nombre maximal de ticks sautés en une fois
+            run_mode (str): "normal" ou "max_throughput" (sans le wait de go)
+            
+        Returns:
+            int: Nombre de ticks exécutés, None en cas d'erreur
+        """
+        if not self.initialized or self.netlogo is None:
+            return None
+        
+        return run_to_next_event(
+            lambda reporter: safe_netlogo_reporter(self.netlogo, reporter, None),
+            self.execute_command, launch_pending, max_skip, get_go_command(run_mode)
+        )
+
+    def collect_series(self, sizer, limit=None, run_mode="normal"):
+        """
+        Exécute un bloc de ticks en échantillonnant l'état du système côté JVM
+        
+        Args:
+            sizer: Instance de stepping.ChunkSizer
+            limit (int): Nombre maximal de ticks pour ce bloc
+            run_mode (str): "normal" ou "max_throughput" (sans le wait de go)
+            
+        Returns:
+            tuple: (ticks exécutés, liste d'échantillons) - (0, None) en cas d'échec
+        """
+        if not self.initialized or self.netlogo is None:
+            return 0, None
+        
+        return run_series_chunk(
+            lambda ticks, go_command: collect_system_series(self.netlogo, ticks, go_command),
+            sizer, limit, get_go_command(run_mode)
+        )
+
+    def run_max_throughput(self, total_ticks, chunk_ticks=1000):
+        """
+        Exécute des ticks sans l'attente artificielle de go et mesure le débit
+        
+        Args:
+            total_ticks (int): Nombre de ticks à exécuter
+            chunk_ticks (int): Nombre de ticks par commande NetLogo
+            
+        Returns:
+            dict: {"ticks", "elapsed", "ticks_per_second"} ou None si NetLogo n'est pas initialisé
+        """
+        if not self.initialized or self.netlogo is None:
+            return None
+        
+        return run_max_throughput(self.execute_command, total_ticks, chunk_ticks)
+
     def get_reporter_value(self, reporter, default=None):
         """
         Récupère la valeur d'un reporter NetLogo
@@ -157,16 +488,17 @@ class NetLogoConnector:
         
         return safe_netlogo_reporter(self.netlogo, reporter, default)
 
-    def close(self):
+    def close(self, keep_warm=False):
         """
         Ferme la connexion avec NetLogo
+        
+        Args:
+            keep_warm (bool): Si True, le workspace reste chargé pour la prochaine initialisation
         """
         if self.netlogo is not None:
-            try:
-                self.netlogo.kill_workspace()
+            if not keep_warm:
+                get_workspace_manager().discard(self.gui, self.workspace_name)
                 print("NetLogo fermé")
-            except Exception as e:
-                print(f"Erreur lors de la fermeture de NetLogo: {str(e)}")
             
             self.netlogo = None
             self.initialized = False
\ No newline at end of file
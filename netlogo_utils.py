@@ -1,7 +1,14 @@
 """
 Utilitaires spécifiques pour l'interaction avec NetLogo
 """
-from utils import safe_int, safe_float, safe_str
+from utils import safe_int, safe_float, safe_str, to_python_list
+from telemetry import (
+    TELEMETRY_REPORTER, decode_telemetry, telemetry_to_system_state, SYSTEM_STATE_FIELDS,
+    SERIES_REPORTERS, decode_series
+)
+from circuit_breaker import get_jvm_breaker, is_jvm_failure
+from call_stats import get_call_stats
+import numpy as np
 import time
 
 def safe_netlogo_reporter(netlogo, reporter, default_value=None, log_error=True):
@@ -17,19 +24,28 @@ def safe_netlogo_reporter(netlogo, reporter, default_value=None, log_error=True)
     Returns:
         Le résultat du reporter ou default_value en cas d'erreur
     """
+    # JVM perdue: échec immédiat, sans appel ni message
+    breaker = get_jvm_breaker()
+    if breaker.is_open:
+        return default_value
+    
+    # Chaque appel est compté par modèle de requête (voir call_stats)
+    stats = get_call_stats()
+    start = time.perf_counter()
     try:
         # Essayer d'exécuter directement le reporter
         # Sans vérification préalable pour éviter l'erreur "is-observer?"
         result = netlogo.report(reporter)
+        stats.record("report", reporter, time.perf_counter() - start)
         return result
     except Exception as e:
-        if log_error:
+        stats.record("report", reporter, time.perf_counter() - start, error=True)
+        # Vérifier si l'erreur est liée à la JVM: le disjoncteur le signale une seule fois
+        if is_jvm_failure(e):
+            breaker.trip(e)
+        elif log_error:
             print(f"Erreur NetLogo reporter '{reporter}': {e}")
             
-        # Vérifier si l'erreur est liée à la JVM
-        if "Java Virtual Machine is not running" in str(e) or "JVM is closed" in str(e):
-            print("Erreur critique: JVM fermée. Impossible de communiquer avec NetLogo.")
-            
         return default_value
 
 def safe_netlogo_command(netlogo, command, log_error=True):
@@ -44,21 +60,202 @@ def safe_netlogo_command(netlogo, command, log_error=True):
     Returns:
         True si la commande s'est exécutée avec succès, False sinon
     """
+    breaker = get_jvm_breaker()
+    if breaker.is_open:
+        return False
+    
+    stats = get_call_stats()
+    start = time.perf_counter()
     try:
         # Exécuter directement la commande sans vérification préalable
         netlogo.command(command)
+        stats.record("command", command, time.perf_counter() - start, ticks=None)
         return True
     except Exception as e:
-        if log_error:
+        stats.record("command", command, time.perf_counter() - start, error=True)
+        if is_jvm_failure(e):
+            breaker.trip(e)
+        elif log_error:
             print(f"Erreur NetLogo commande '{command}': {e}")
             
-        # Vérifier si l'erreur est liée à la JVM
-        if "Java Virtual Machine is not running" in str(e) or "JVM is closed" in str(e):
-            print("Erreur critique: JVM fermée. Impossible de communiquer avec NetLogo.")
-            
         return False
 
-def get_turtle_attribute(netlogo, turtle_id, attribute, default_value=None):
+def safe_netlogo_repeat_report(netlogo, reporters, ticks, go_command="go", log_error=True):
+    """
+    Exécute plusieurs ticks en échantillonnant des reporters côté JVM (repeat_report)
+    
+    Args:
+        netlogo: L'instance NetLogoLink
+        reporters: Liste des reporters NetLogo à échantillonner à chaque tick
+        ticks: Nombre de ticks à exécuter
+        go_command: Procédure NetLogo exécutée à chaque tick
+        log_error: Si True, affiche l'erreur dans la console
+        
+    Returns:
+        Résultats de repeat_report (une série par reporter) ou None en cas d'erreur
+    """
+    breaker = get_jvm_breaker()
+    if breaker.is_open:
+        return None
+    
+    stats = get_call_stats()
+    source = f"repeat_report {len(reporters)} reporters [ {go_command} ]"
+    start = time.perf_counter()
+    try:
+        results = netlogo.repeat_report(reporters, int(ticks), go=go_command, include_t0=False)
+        stats.record("repeat_report", source, time.perf_counter() - start, ticks=int(ticks))
+        return results
+    except Exception as e:
+        stats.record("repeat_report", source, time.perf_counter() - start, error=True)
+        if is_jvm_failure(e):
+            breaker.trip(e)
+        elif log_error:
+            print(f"Erreur NetLogo repeat_report ({int(ticks)} ticks): {e}")
+            
+        return None
+
+def _normalize_breed_attributes(attributes):
+    """
+    Normalise la liste d'attributs demandés en tuples (nom de colonne, expression)
+    
+    Args:
+        attributes: Liste de noms d'attributs NetLogo ou de tuples (nom, expression)
+        
+    Returns:
+        list: Liste de tuples (nom de colonne, expression NetLogo)
+    """
+    normalized = []
+    for attribute in attributes:
+        if isinstance(attribute, (tuple, list)):
+            name, expression = attribute
+        else:
+            name, expression = attribute, attribute
+        normalized.append((str(name), str(expression)))
+    return normalized
+
+def node_column(node_property, attribute="who"):
+    """
+    Construit la colonne (nom, expression) donnant un attribut d'un noeud référencé
+    
+    Args:
+        node_property: Propriété de la tortue qui contient le noeud (ex: 'Last.Node')
+        attribute: Attribut du noeud à récupérer
+        
+    Returns:
+        tuple: (nom de colonne, expression NetLogo) utilisable dans get_breed_table
+    """
+    name = f"{node_property}.{attribute}"
+    expression = f"ifelse-value is-turtle? {node_property} [ [{attribute}] of {node_property} ] [ 0 ]"
+    return (name, expression)
+
+def list_item_column(list_property, index=0, default_value=0):
+    """
+    Construit la colonne (nom, expression) donnant un élément d'une liste d'une tortue
+    
+    Args:
+        list_property: Propriété de la tortue qui contient la liste
+        index: Index de l'élément à récupérer
+        default_value: Valeur par défaut si la liste est vide
+        
+    Returns:
+        tuple: (nom de colonne, expression NetLogo) utilisable dans get_breed_table
+    """
+    name = f"{list_property}[{index}]"
+    expression = (f"ifelse-value (is-list? {list_property} and length {list_property} > {index}) "
+                  f"[ item {index} {list_property} ] [ {default_value} ]")
+    return (name, expression)
+
+def build_breed_table_reporter(breed, attributes):
+    """
+    Construit le reporter qui récupère tous les attributs d'une race en un seul appel
+    
+    Args:
+        breed: Nom de la race (ex: 'machines', 'products')
+        attributes: Liste d'attributs (voir get_breed_table)
+        
+    Returns:
+        str: Reporter de la forme "[ (list who attr1 attr2 ...) ] of <breed>"
+    """
+    expressions = " ".join(f"({expression})" for _, expression in _normalize_breed_attributes(attributes))
+    return f"[ (list who {expressions}) ] of {breed}"
+
+def _infer_column_dtype(values):
+    """Détermine le type NumPy d'une colonne à partir de ses valeurs"""
+    if values and all(isinstance(v, bool) for v in values):
+        return np.bool_
+    if values and all(isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool)
+                      for v in values):
+        return np.float64
+    return object
+
+def get_breed_table(netlogo, breed, attributes, as_dataframe=False):
+    """
+    Récupère en un seul appel NetLogo les attributs de toutes les tortues d'une race
+    
+    Args:
+        netlogo: L'instance NetLogoLink
+        breed: Nom de la race (ex: 'machines', 'products')
+        attributes: Liste de noms d'attributs NetLogo, ou de tuples (nom de colonne, expression)
+                    pour les valeurs calculées (voir node_column et list_item_column)
+        as_dataframe: Si True, retourne un DataFrame pandas au lieu d'un tableau structuré
+        
+    Returns:
+        Un tableau NumPy structuré (colonne "who" puis une colonne par attribut), trié par who,
+        ou un DataFrame pandas. Tableau vide en cas d'erreur.
+    """
+    normalized = _normalize_breed_attributes(attributes)
+    names = ["who"] + [name for name, _ in normalized]
+    
+    reporter = build_breed_table_reporter(breed, normalized)
+    raw_rows = safe_netlogo_reporter(netlogo, reporter, [])
+    rows = [to_python_list(row) for row in to_python_list(raw_rows)]
+    rows = [row for row in rows if len(row) == len(names)]
+    rows.sort(key=lambda row: safe_int(row[0], -1))
+    
+    # Typage des colonnes: "who" en entier, numériques en float, le reste en objet
+    dtypes = [("who", np.int64)]
+    for index, name in enumerate(names[1:], start=1):
+        column = [row[index] for row in rows]
+        dtypes.append((name, _infer_column_dtype(column)))
+    
+    records = []
+    for row in rows:
+        record = [safe_int(row[0], -1)]
+        for index, (_, dtype) in enumerate(dtypes[1:], start=1):
+            value = row[index]
+            if dtype is object and not isinstance(value, (str, list)):
+                value = to_python_list(value) if hasattr(value, '__iter__') else value
+            record.append(value)
+        records.append(tuple(record))
+    
+    table = np.array(records, dtype=dtypes)
+    
+    if as_dataframe:
+        import pandas as pd
+        return pd.DataFrame.from_records(table, columns=names)
+    
+    return table
+
+def lookup_breed_row(table, turtle_id):
+    """
+    Retrouve la ligne d'une tortue dans une table issue de get_breed_table
+    
+    Args:
+        table: Tableau structuré retourné par get_breed_table
+        turtle_id: ID de la tortue
+        
+    Returns:
+        La ligne (numpy.void) ou None si la tortue n'est pas dans la table
+    """
+    if table is None or len(table) == 0:
+        return None
+    
+    position = np.searchsorted(table["who"], turtle_id)
+    if position < len(table) and table["who"][position] == turtle_id:
+        return table[position]
+    return None
+
+def get_turtle_attribute(netlogo, turtle_id, attribute, default_value=None, table=None):
     """
     Obtient un attribut d'une tortue NetLogo de façon sécurisée
     
@@ -67,20 +264,25 @@ def get_turtle_attribute(netlogo, turtle_id, attribute, default_value=None):
         turtle_id: ID de la tortue
         attribute: Attribut à récupérer
         default_value: Valeur par défaut
+        table: Table issue de get_breed_table; si fournie, aucun appel NetLogo n'est fait
         
     Returns:
         La valeur de l'attribut ou default_value en cas d'erreur
     """
-    # Vérifier d'abord si la tortue existe
-    exists = safe_netlogo_reporter(netlogo, f"is-turtle? turtle {turtle_id}", False)
-    if not exists:
-        return default_value
+    if table is not None:
+        row = lookup_breed_row(table, turtle_id)
+        if row is None or attribute not in table.dtype.names:
+            return default_value
+        return row[attribute]
     
-    # Récupérer l'attribut
-    reporter = f"[{attribute}] of turtle {turtle_id}"
-    return safe_netlogo_reporter(netlogo, reporter, default_value)
+    # Un seul appel: l'existence de la tortue est vérifiée dans le reporter
+    reporter = f"ifelse-value is-turtle? turtle {turtle_id} [ [{attribute}] of turtle {turtle_id} ] [ \"__absent__\" ]"
+    value = safe_netlogo_reporter(netlogo, reporter, default_value)
+    if isinstance(value, str) and value == "__absent__":
+        return default_value
+    return value
 
-def get_node_attribute(netlogo, turtle_id, node_property, attribute="who"):
+def get_node_attribute(netlogo, turtle_id, node_property, attribute="who", table=None):
     """
     Récupère un attribut d'un noeud référencé par une tortue
     
@@ -89,10 +291,14 @@ def get_node_attribute(netlogo, turtle_id, node_property, attribute="who"):
         turtle_id: ID de la tortue
         node_property: Propriété de la tortue qui contient le noeud
         attribute: Attribut du noeud à récupérer
+        table: Table issue de get_breed_table contenant la colonne node_column(node_property, attribute)
         
     Returns:
         L'attribut du noeud ou 0 en cas d'erreur
     """
+    if table is not None:
+        return get_turtle_attribute(netlogo, turtle_id, node_column(node_property, attribute)[0], 0, table)
+    
     # Utiliser un reporter plus simple
     reporter = f"""
     ifelse is-turtle? ([{node_property}] of turtle {turtle_id}) 
@@ -101,7 +307,7 @@ def get_node_attribute(netlogo, turtle_id, node_property, attribute="who"):
     """
     return safe_netlogo_reporter(netlogo, reporter, 0)
 
-def get_list_attribute(netlogo, turtle_id, list_property, index=0, default_value=0):
+def get_list_attribute(netlogo, turtle_id, list_property, index=0, default_value=0, table=None):
     """
     Récupère un élément d'une liste d'une tortue
     
@@ -111,10 +317,15 @@ def get_list_attribute(netlogo, turtle_id, list_property, index=0, default_value
         list_property: Propriété de la tortue qui contient la liste
         index: Index de l'élément à récupérer
         default_value: Valeur par défaut
+        table: Table issue de get_breed_table contenant la colonne list_item_column(list_property, index)
         
     Returns:
         L'élément de la liste ou default_value en cas d'erreur
     """
+    if table is not None:
+        column = list_item_column(list_property, index, default_value)[0]
+        return get_turtle_attribute(netlogo, turtle_id, column, default_value, table)
+    
     # Reporter plus simple
     reporter = f"""
     let lst [{list_property}] of turtle {turtle_id}
@@ -152,10 +363,51 @@ def check_model_initialized(netlogo):
         print(f"Erreur lors de la vérification de l'initialisation du modèle: {e}")
         return False
 
+# Attributs d'une machine qui changent pendant la simulation (les autres viennent de l'introspection)
+MACHINE_DYNAMIC_REPORTER = "(list machine.state next.completion)"
+
+def _build_machine_data(machine, state, remaining_time):
+    """
+    Construit le dictionnaire d'une machine à partir de sa disposition et de son état courant
+    
+    Args:
+        machine: model_introspection.MachineInfo
+        state: Valeur NetLogo de machine.state
+        remaining_time: Valeur NetLogo de next.completion
+        
+    Returns:
+        dict: Propriétés de la machine
+    """
+    remaining_time = safe_float(remaining_time, 0.0)
+    
+    if state == "Machine.Processing":
+        state = "Processing"
+    elif state not in ("Idle", "Down"):
+        state = "Idle"  # Valeur par défaut sûre
+    
+    # Détection améliorée de l'activité: si next.completion est différent de 10000000 et supérieur à 0,
+    # la machine est probablement en traitement même si l'état n'est pas explicitement "Processing"
+    if state == "Idle" and 0 < remaining_time < 1000000:
+        state = "Processing"
+    
+    return {
+        "name": machine.name,
+        "state": state,
+        "remaining.time": remaining_time,
+        "operations": str(machine.operations),
+        "operation.times": str(machine.operation_times),
+        "xcor": machine.xcor,
+        "ycor": machine.ycor,
+        "heading": machine.heading
+    }
+
 def get_machine_state(netlogo, machine_id):
     """
     Récupère l'état d'une machine avec une meilleure détection de l'activité
     
+    Le nom, les opérations et la position viennent de l'introspection du modèle:
+    seuls l'état et le temps restant sont lus dans NetLogo, en un seul appel.
+    
     Args:
         netlogo: L'instance NetLogoLink
         machine_id: ID de la machine
@@ -163,92 +415,12 @@ def get_machine_state(netlogo, machine_id):
     Returns:
         Un dictionnaire avec les propriétés de la machine
     """
-    # Valeurs par défaut codées en dur pour le modèle Alpha
-    machine_defaults = {
-        186: {"name": "M1", "operations": ["O8", "O9"], "times": [10, 10]},
-        187: {"name": "M2", "operations": ["O1", "O2", "O4"], "times": [20, 20, 20]},
-        188: {"name": "M3", "operations": ["O1", "O2", "O5"], "times": [20, 20, 20]},
-        189: {"name": "M4", "operations": ["O3", "O4", "O5"], "times": [20, 20, 20]},
-        190: {"name": "M5", "operations": ["O6"], "times": [5]},
-        191: {"name": "M6", "operations": ["O7"], "times": [60]},
-        192: {"name": "M7", "operations": ["O1", "O2", "O3", "O4"], "times": [20, 20, 20, 20]}
-    }
+    from model_introspection import get_model_layout
     
-    # Utiliser les valeurs par défaut pour cette machine
-    if machine_id in machine_defaults:
-        default_data = machine_defaults[machine_id]
-        
-        # Structure de base pour les données de la machine avec conversion en types Python
-        machine_data = {
-            "name": str(default_data["name"]),  # Assurer que c'est une chaîne Python
-            "state": "Idle",            # État par défaut
-            "remaining.time": 0.0,       # Assurer que c'est un float Python
-            "operations": str(default_data["operations"]),  # Convertir en chaîne Python
-            "operation.times": str(default_data["times"]),  # Convertir en chaîne Python
-            "xcor": 0.0,                # Assurer que c'est un float Python
-            "ycor": 0.0,                # Assurer que c'est un float Python 
-            "heading": 0.0              # Assurer que c'est un float Python
-        }
-        
-        # Essayer d'obtenir l'état actuel de la machine
-        try:
-            # Vérifier si la machine existe
-            exists = safe_netlogo_reporter(netlogo, f"is-turtle? turtle {machine_id}", False)
-            
-            if exists:
-                # Essayer d'obtenir l'état
-                state = safe_netlogo_reporter(netlogo, f"[machine.state] of turtle {machine_id}", "Idle")
-                if isinstance(state, str) and state == "Machine.Processing":
-                    machine_data["state"] = "Processing"
-                elif isinstance(state, str) and state in ["Idle", "Down"]:
-                    machine_data["state"] = str(state)
-                else:
-                    machine_data["state"] = "Idle"  # Valeur par défaut sûre
-                    
-                # Essayer d'obtenir le temps restant et assurer que c'est un float Python
-                remaining_time = safe_netlogo_reporter(netlogo, f"[next.completion] of turtle {machine_id}", 0)
-                machine_data["remaining.time"] = float(safe_float(remaining_time, 0.0))
-                
-                # Détection améliorée de l'activité: si next.completion est différent de 10000000 et supérieur à 0,
-                # la machine est probablement en traitement même si l'état n'est pas explicitement "Processing"
-                if machine_data["state"] == "Idle" and machine_data["remaining.time"] > 0 and machine_data["remaining.time"] < 1000000:
-                    machine_data["state"] = "Processing"
-                    print(f"Machine {machine_id} détectée comme active avec temps restant: {machine_data['remaining.time']}")
-                
-                # Pour machine_id 192, s'assurer d'utiliser le nom correct M7 et non Machine192.0
-                if machine_id == 192:
-                    machine_name = safe_netlogo_reporter(netlogo, f"[machine.name] of turtle {machine_id}", "M7")
-                    if machine_name == "Machine192.0":
-                        machine_data["name"] = "M7"
-                    else:
-                        machine_data["name"] = str(machine_name)
-                else:
-                    # Essayer d'obtenir le nom de la machine
-                    machine_name = safe_netlogo_reporter(netlogo, f"[machine.name] of turtle {machine_id}", default_data["name"])
-                    machine_data["name"] = str(machine_name)
-                
-                # Essayer d'obtenir les coordonnées et assurer que ce sont des float Python
-                xcor = safe_netlogo_reporter(netlogo, f"[xcor] of turtle {machine_id}", 0)
-                machine_data["xcor"] = float(safe_float(xcor, 0.0))
-                
-                ycor = safe_netlogo_reporter(netlogo, f"[ycor] of turtle {machine_id}", 0)
-                machine_data["ycor"] = float(safe_float(ycor, 0.0))
-                
-                heading = safe_netlogo_reporter(netlogo, f"[heading] of turtle {machine_id}", 0)
-                machine_data["heading"] = float(safe_float(heading, 0.0))
-                
-                # Assurer que operations et operation.times sont des chaînes Python
-                operations = safe_netlogo_reporter(netlogo, f"[machine.operations.type] of turtle {machine_id}", [])
-                machine_data["operations"] = str(operations)
-                
-                op_times = safe_netlogo_reporter(netlogo, f"[machine.operations.time] of turtle {machine_id}", [])
-                machine_data["operation.times"] = str(op_times)
-                
-        except Exception as e:
-            print(f"Erreur lors de l'accès à la machine {machine_id}: {e}")
-        
-        return machine_data
-    else:
+    layout = get_model_layout(netlogo)
+    machine = layout.by_id.get(machine_id) if layout is not None else None
+    
+    if machine is None:
         # Retourner des données par défaut si l'ID de machine n'est pas reconnu
         return {
             "name": str(f"Machine{machine_id}"),
@@ -260,6 +432,40 @@ def get_machine_state(netlogo, machine_id):
             "ycor": 0.0,
             "heading": 0.0
         }
+    
+    values = to_python_list(safe_netlogo_reporter(
+        netlogo, f"[{MACHINE_DYNAMIC_REPORTER}] of turtle {machine_id}", ["Idle", 0]))
+    if len(values) < 2:
+        values = ["Idle", 0]
+    return _build_machine_data(machine, values[0], values[1])
+
+def get_machines_state(netlogo):
+    """
+    Récupère l'état de toutes les machines du modèle en un seul appel
+    
+    Args:
+        netlogo: L'instance NetLogoLink
+        
+    Returns:
+        list: Liste de tuples (who, dictionnaire de la machine), triée par who
+    """
+    from model_introspection import get_model_layout
+    
+    layout = get_model_layout(netlogo)
+    if layout is None:
+        return []
+    
+    rows = safe_netlogo_reporter(netlogo, f"[(sentence who {MACHINE_DYNAMIC_REPORTER})] of machines", None)
+    current = {}
+    for row in to_python_list(rows):
+        row = to_python_list(row)
+        if len(row) >= 3:
+            current[safe_int(row[0], -1)] = (row[1], row[2])
+    
+    return [
+        (machine.who, _build_machine_data(machine, *current.get(machine.who, ("Idle", 0))))
+        for machine in layout.machines
+    ]
 
 def get_product_state(netlogo, product_id):
     """
@@ -398,10 +604,167 @@ def get_product_state(netlogo, product_id):
     
     return product_data
 
+# Colonnes lues pour tous les produits en un seul appel (voir get_products_state)
+PRODUCT_TABLE_COLUMNS = [
+    ("state", "product.state"),
+    ("type", "ProductType"),
+    ("sequence.order", "currentsequenceorder"),
+    ("operations", "ProductOperations"),
+    ("next.operation", "next.product.operation"),
+    ("workstation", "Heading.Workstation"),
+    ("next.status", "Next.Product.status"),
+    ("remaining.time", "Next.Product.Completion.Time"),
+    ("start.time", list_item_column("ProductRealStart")[1]),
+    ("end.time", list_item_column("ProductRealCompletion")[1]),
+]
+
+def get_products_state(netlogo):
+    """
+    Récupère l'état de tous les produits en un seul appel NetLogo
+    
+    Équivalent de get_product_state appliqué à chaque produit (mêmes clés, mêmes règles
+    de détection de complétion), sans un aller-retour avec la JVM par attribut et par
+    produit: le coût d'un rafraîchissement ne dépend plus du nombre de produits que
+    par la taille de la réponse.
+    
+    Args:
+        netlogo: L'instance NetLogoLink
+        
+    Returns:
+        list: Dictionnaires des produits triés par who, ou None si le reporter a échoué
+    """
+    reporter = f"(list ticks {build_breed_table_reporter('products', PRODUCT_TABLE_COLUMNS)})"
+    raw = safe_netlogo_reporter(netlogo, reporter, None)
+    if raw is None:
+        return None
+    
+    raw = to_python_list(raw)
+    if len(raw) < 2:
+        return []
+    ticks = safe_float(raw[0], 0)
+    
+    products = []
+    for row in to_python_list(raw[1]):
+        row = to_python_list(row)
+        if len(row) != len(PRODUCT_TABLE_COLUMNS) + 1:
+            continue
+        who = safe_int(row[0], -1)
+        if who < 0:
+            continue
+        
+        product_data = {"who": who, "last.node": 0, "next.node": 0}
+        for (name, _), value in zip(PRODUCT_TABLE_COLUMNS, row[1:]):
+            product_data[name] = value
+        
+        product_data["state"] = safe_str(product_data["state"], "Waiting") or "Waiting"
+        product_data["type"] = safe_str(product_data["type"], "Unknown") or "Unknown"
+        product_data["next.operation"] = safe_str(product_data["next.operation"], "")
+        product_data["workstation"] = safe_str(product_data["workstation"], "")
+        if isinstance(product_data["operations"], np.ndarray):
+            product_data["operations"] = product_data["operations"].tolist()
+        product_data["start.time"] = safe_float(product_data["start.time"], 0)
+        product_data["end.time"] = safe_float(product_data["end.time"], 0)
+        
+        # Produit sans opération suivante: toutes ses opérations sont faites
+        if product_data["next.operation"] == "":
+            product_data["state"] = "Completed"
+            if product_data["start.time"] > 0 and product_data["end.time"] <= 0:
+                product_data["end.time"] = ticks
+        
+        # Temps de fin défini: produit terminé
+        if product_data["end.time"] > 0:
+            product_data["state"] = "Completed"
+        
+        products.append(product_data)
+    
+    products.sort(key=lambda product: product["who"])
+    return products
+
+def get_breed_ids(netlogo, breed_name):
+    """
+    Récupère les IDs (who) de toutes les tortues d'une race en un seul appel
+    
+    Args:
+        netlogo: L'instance NetLogoLink
+        breed_name: Nom de la race (ex: 'machines', 'products')
+        
+    Returns:
+        Liste triée des IDs, ou None si le reporter a échoué
+    """
+    raw_ids = safe_netlogo_reporter(netlogo, f"[who] of {breed_name}", None)
+    if raw_ids is None:
+        return None
+    
+    ids = {safe_int(who, -1) for who in to_python_list(raw_ids)}
+    ids.discard(-1)
+    return sorted(ids)
+
+class ProductIndex:
+    """
+    Index incrémental des IDs de produits présents dans NetLogo.
+    
+    Chaque rafraîchissement récupère "[who] of products" en un seul appel et
+    calcule les IDs ajoutés, retirés et inchangés depuis le rafraîchissement précédent.
+    """
+    def __init__(self, breed_name="products"):
+        self.breed_name = breed_name
+        self.reset()
+    
+    def reset(self):
+        """Vide l'index (à appeler au début d'une nouvelle simulation)"""
+        self.ids = set()
+        self.added = set()
+        self.removed = set()
+        self.unchanged = set()
+    
+    def refresh(self, netlogo):
+        """
+        Met à jour l'index depuis NetLogo
+        
+        Args:
+            netlogo: L'instance NetLogoLink
+            
+        Returns:
+            True si l'index a été mis à jour, False si le reporter a échoué
+            (l'index conserve alors son état précédent)
+        """
+        current_ids = get_breed_ids(netlogo, self.breed_name)
+        if current_ids is None:
+            return False
+        
+        self.update(current_ids)
+        return True
+    
+    def update(self, current_ids):
+        """
+        Met à jour l'index à partir d'IDs déjà lus (ex: par get_products_state)
+        
+        Args:
+            current_ids: IDs des produits actuellement présents dans NetLogo
+        """
+        current = set(current_ids)
+        self.added = current - self.ids
+        self.removed = self.ids - current
+        self.unchanged = current & self.ids
+        self.ids = current
+    
+    def sorted_ids(self):
+        """Retourne les IDs actuellement présents, triés"""
+        return sorted(self.ids)
+    
+    def has_changes(self):
+        """Indique si le dernier rafraîchissement a modifié l'ensemble des IDs"""
+        return bool(self.added or self.removed)
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def __contains__(self, product_id):
+        return product_id in self.ids
+
 def get_turtles_with_breed(netlogo, breed_name):
     """
-    Récupère les IDs des tortues d'une race donnée avec une approche simplifiée
-    qui ne s'appuie pas sur des variables globales ou des commandes complexes.
+    Récupère les IDs des tortues d'une race donnée
     
     Args:
         netlogo: L'instance NetLogoLink
@@ -410,97 +773,109 @@ def get_turtles_with_breed(netlogo, breed_name):
     Returns:
         Liste des IDs ou liste vide en cas d'erreur
     """
-    # Pour les machines, nous connaissons les IDs dans le modèle Alpha
+    # Pour les machines, les IDs viennent de l'introspection faite après setup
     if breed_name == "machines" or breed_name == "turtles with [breed = machines]":
-        print("Utilisation des IDs prédéfinis pour les machines du modèle Alpha")
-        return [186, 187, 188, 189, 190, 191, 192]
+        from model_introspection import get_machine_ids
+        return get_machine_ids(netlogo)
     
-    # Pour les produits, procédure plus complexe
-    if breed_name == "products" or breed_name == "turtles with [breed = products]":
-        try:
-            # Essayer d'obtenir le nombre de produits
-            count = safe_int(safe_netlogo_reporter(netlogo, "count products", 0))
-            print(f"Nombre de produits détectés: {count}")
-            
-            if count == 0:
-                return []
-            
-            # Option 1: si peu de produits, créer une liste manuellement
-            if count > 0 and count < 20:  # Limite raisonnable
-                product_ids = []
-                
-                # Tester les IDs potentiels pour les produits
-                # Dans le modèle Alpha, les produits commencent souvent à l'ID 200
-                for potential_id in range(200, 250):
-                    is_product = safe_netlogo_reporter(
-                        netlogo, 
-                        f"is-turtle? turtle {potential_id} and [breed] of turtle {potential_id} = products", 
-                        False
-                    )
-                    if is_product:
-                        product_ids.append(potential_id)
-                        
-                        # Si nous avons trouvé tous les produits, sortir de la boucle
-                        if len(product_ids) >= count:
-                            break
-                
-                if product_ids:
-                    print(f"Produits trouvés via recherche directe: {product_ids}")
-                    return product_ids
-            
-            # Si aucun produit n'a été trouvé, retourner une liste vide
-            print("Aucun produit trouvé")
-            return []
-        except Exception as e:
-            print(f"Erreur lors de la recherche des produits: {e}")
-            return []
+    if breed_name == "turtles with [breed = products]":
+        breed_name = "products"
+    
+    ids = get_breed_ids(netlogo, breed_name)
+    if ids is None:
+        print(f"Erreur lors de la recherche des tortues de la race {breed_name}")
+        return []
+    
+    return ids
+
+def get_telemetry(netlogo):
+    """
+    Récupère tous les scalaires suivis à chaque tick en un seul appel NetLogo
+    
+    Args:
+        netlogo: L'instance NetLogoLink
+        
+    Returns:
+        telemetry.TelemetryRecord ou None en cas d'erreur
+    """
+    raw_values = safe_netlogo_reporter(netlogo, TELEMETRY_REPORTER, None)
+    if raw_values is None:
+        return None
+    return decode_telemetry(raw_values)
+
+def collect_system_series(netlogo, ticks, go_command="go"):
+    """
+    Exécute un bloc de ticks et renvoie l'état du système échantillonné à chaque tick
     
-    # Pour les autres races, retourner une liste vide
-    return []
+    Args:
+        netlogo: L'instance NetLogoLink
+        ticks: Nombre de ticks à exécuter
+        go_command: Procédure NetLogo exécutée à chaque tick
+        
+    Returns:
+        list: Un dict par tick (simulated_time et compteurs de la table snapshot),
+              ou None en cas d'erreur
+    """
+    results = safe_netlogo_repeat_report(netlogo, SERIES_REPORTERS, ticks, go_command)
+    if results is None:
+        return None
+    
+    try:
+        return decode_series(results)
+    except Exception as e:
+        print(f"Erreur lors du décodage des séries repeat_report: {e}")
+        return None
 
-def get_system_state(netlogo):
+def get_system_state(netlogo, telemetry=None):
     """
     Récupère l'état global du système de manière simplifiée
     
     Args:
         netlogo: L'instance NetLogoLink
+        telemetry: Enregistrement de télémétrie déjà récupéré pour ce tick (facultatif)
         
     Returns:
         Dictionnaire avec les statistiques du système
     """
-    state = {
-        "waiting_products": 0,
-        "in_progress_products": 0,
-        "completed_products": 0,
-        "idle_machines": 0,
-        "processing_machines": 0,
-        "down_machines": 0
-    }
+    state = {field: 0 for field in SYSTEM_STATE_FIELDS}
     
     try:
-        # Utiliser des reporters plus robustes
-        state["waiting_products"] = safe_int(safe_netlogo_reporter(
-            netlogo, 'count products with [product.state = "Waiting"]', 0), 0)
-        
-        state["in_progress_products"] = safe_int(safe_netlogo_reporter(
-            netlogo, 'count products with [product.state = "Processing.Product"]', 0), 0)
-        
-        state["completed_products"] = safe_int(safe_netlogo_reporter(
-            netlogo, 'count products with [product.state = "Completed"]', 0), 0)
-        
-        state["idle_machines"] = safe_int(safe_netlogo_reporter(
-            netlogo, 'count machines with [machine.state = "Idle"]', 0), 0)
-        
-        state["processing_machines"] = safe_int(safe_netlogo_reporter(
-            netlogo, 'count machines with [machine.state = "Machine.Processing"]', 0), 0)
-        
-        state["down_machines"] = safe_int(safe_netlogo_reporter(
-            netlogo, 'count machines with [machine.state = "Down"]', 0), 0)
+        if telemetry is None:
+            telemetry = get_telemetry(netlogo)
+        if telemetry is not None:
+            state = telemetry_to_system_state(telemetry)
     except Exception as e:
         print(f"Erreur lors de la récupération de l'état du système: {e}")
     
     return state
 
+def wait_until_ready(netlogo, timeout=5.0, poll_interval=0.02):
+    """
+    Attend que le modèle soit prêt (machines et nœuds créés par Setup)
+    
+    Remplace les pauses fixes après setup: on interroge NetLogo jusqu'à ce que
+    la disposition soit construite, ce qui prend en général quelques millisecondes.
+    
+    Args:
+        netlogo: L'instance NetLogoLink
+        timeout: Durée maximale d'attente (secondes)
+        poll_interval: Intervalle initial entre deux interrogations (secondes)
+        
+    Returns:
+        True si le modèle est prêt, False si le délai est dépassé
+    """
+    deadline = time.perf_counter() + timeout
+    while True:
+        counts = to_python_list(safe_netlogo_reporter(
+            netlogo, "(list count machines count nodes)", [], log_error=False))
+        if len(counts) == 2 and safe_int(counts[0]) > 0 and safe_int(counts[1]) > 0:
+            return True
+        
+        if time.perf_counter() >= deadline:
+            return False
+        time.sleep(poll_interval)
+        poll_interval = min(poll_interval * 2, 0.25)
+
 def ensure_machines_exist(netlogo):
     """
     Vérifie si des machines existent dans le modèle, sinon force leur création
@@ -522,12 +897,9 @@ def ensure_machines_exist(netlogo):
         # Si échec, essayer de réinitialiser le modèle
         print("Tentative de réinitialisation du modèle...")
         
-        # Essayer clear-all puis setup
-        safe_netlogo_command(netlogo, "clear-all")
-        time.sleep(0.5)  # Pause pour laisser NetLogo réagir
-        
+        # Setup (qui commence par clear-all) puis attente active du modèle
         safe_netlogo_command(netlogo, "setup")
-        time.sleep(1)  # Pause plus longue pour l'initialisation
+        wait_until_ready(netlogo)
         
         # Vérifier à nouveau pour les machines
         machine_ids = get_turtles_with_breed(netlogo, "machines")
@@ -555,13 +927,9 @@ def initialize_alpha_model(netlogo):
         True si l'initialisation a réussi, False sinon
     """
     try:
-        # Réinitialiser complètement
-        safe_netlogo_command(netlogo, "clear-all")
-        time.sleep(0.5)
-        
-        # Exécuter setup
+        # Réinitialiser complètement (Setup commence par clear-all)
         safe_netlogo_command(netlogo, "setup")
-        time.sleep(1)
+        wait_until_ready(netlogo)
         
         # Vérifier les composants clés du modèle Alpha
         has_ticks = safe_netlogo_reporter(netlogo, "ticks >= 0", False)
@@ -621,15 +989,16 @@ def get_simulation_time(netlogo):
     Returns:
         Temps de simulation réel (float)
     """
-    # Essayer de récupérer directement la variable globale simulated.time
-    sim_time = safe_netlogo_reporter(netlogo, "simulated.time", 0)
+    # Récupérer simulated.time et ticks en un seul appel
+    values = to_python_list(safe_netlogo_reporter(netlogo, "(list simulated.time ticks)", [0, 0]))
+    sim_time = values[0] if len(values) > 0 else 0
     
     # Si simulated.time n'est pas disponible ou est égal à 0, utiliser ticks
-    if sim_time is None or sim_time == 0:
-        sim_time = safe_netlogo_reporter(netlogo, "ticks", 0)
+    if (sim_time is None or sim_time == 0) and len(values) > 1:
+        sim_time = values[1]
     
     # Convertir en float et assurer une valeur minimale
-    sim_time = float(safe_float(sim_time, 0))
+    sim_time = safe_float(sim_time, 0.0)
     if sim_time < 0.1:
         sim_time = 0.1  # Éviter la division par zéro
         
@@ -646,22 +1015,12 @@ def save_production_operations(netlogo, db_manager, simulation_id):
         simulation_id: ID de la simulation actuelle
     """
     try:
-        # Utiliser les IDs connus des machines du modèle Alpha
-        machine_ids = [186, 187, 188, 189, 190, 191, 192]
-        
         # Récupérer le temps simulé actuel - utiliser simulated.time
         current_tick = get_simulation_time(netlogo)
         
-        # Pour chaque machine
-        for machine_id in machine_ids:
+        # Pour chaque machine du modèle (état de toutes les machines lu en un seul appel)
+        for machine_id, machine_data in get_machines_state(netlogo):
             try:
-                # Récupérer les données de la machine
-                machine_data = get_machine_state(netlogo, machine_id)
-                
-                # S'assurer que le nom est correct pour M7 (éviter Machine192.0)
-                if machine_id == 192 and machine_data["name"] == "Machine192.0":
-                    machine_data["name"] = "M7"
-                    
                 machine_name = machine_data["name"]
                 machine_state = machine_data["state"]
                 remaining_time = safe_float(machine_data.get("remaining.time", 0), 0)
@@ -735,27 +1094,9 @@ def get_active_products(netlogo):
     Returns:
         list: Liste des IDs des produits actifs
     """
-    products = []
-    try:
-        # Obtenir le nombre de produits
-        count_products = safe_int(safe_netlogo_reporter(netlogo, "count products", 0), 0)
-        
-        if count_products > 0:
-            # Récupérer les IDs des produits existants
-            for potential_id in range(200, 300):  # Plage étendue pour être sûr
-                # Vérifier si c'est un produit valide
-                is_product = safe_netlogo_reporter(
-                    netlogo, 
-                    f"is-turtle? turtle {potential_id} and [breed] of turtle {potential_id} = products", 
-                    False,
-                    False  # Ne pas logger les erreurs
-                )
-                if is_product:
-                    products.append(potential_id)
-                    # Si nous avons trouvé suffisamment de produits, arrêter
-                    if len(products) >= count_products:
-                        break
-    except Exception as e:
-        print(f"Erreur lors de la récupération des produits actifs: {e}")
+    products = get_breed_ids(netlogo, "products")
+    if products is None:
+        print("Erreur lors de la récupération des produits actifs")
+        return []
     
     return products
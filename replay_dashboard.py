@@ -0,0 +1,103 @@
+"""
+Profilage du tableau de bord sur un journal d'états enregistré (snapshot_log), sans JVM:
+SimulationController.update_dashboard et DashboardManager sont appelés pour chaque état
+rejoué, avec une base de données temporaire alimentée comme pendant la simulation
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import tempfile
+import time
+import tkinter as tk
+
+from db_manager import DatabaseManager
+from dashboard_manager import DashboardManager
+from main_controller import SimulationController
+from snapshot_log import ReplayConnector
+
+def replay_dashboard(log_path, speed=0.0, max_frames=0, profile=False, show=False):
+    """
+    Rejoue un journal et mesure le temps de chaque rafraîchissement du tableau de bord
+
+    Args:
+        log_path: Chemin du journal d'états
+        speed: Multiple de la vitesse d'enregistrement (0: tous les états, sans attente)
+        max_frames: Nombre maximal de rafraîchissements (0: tout le journal)
+        profile: Si True, affiche les fonctions les plus coûteuses (cProfile)
+        show: Si True, la fenêtre reste visible pendant le rejeu
+
+    Returns:
+        list: Durée de chaque rafraîchissement (secondes)
+    """
+    replay = ReplayConnector(log_path, speed=speed)
+    if not replay.initialize():
+        return []
+
+    root = tk.Tk()
+    if not show:
+        root.withdraw()
+    simulation_tab = tk.Frame(root)
+    simulation_tab.pack()
+    dashboard_tab = tk.Frame(root)
+    dashboard_tab.pack(fill=tk.BOTH, expand=True)
+
+    # Base temporaire: le rejeu ne touche pas à simulation_data.db
+    db_path = os.path.join(tempfile.mkdtemp(prefix="replay-"), "replay.db")
+    db_manager = DatabaseManager(db_path)
+    controller = SimulationController(root, simulation_tab, replay, db_manager, DashboardManager(dashboard_tab))
+    controller.simulation_id = db_manager.start_simulation()
+
+    profiler = cProfile.Profile() if profile else None
+    durations = []
+    last_frame = None
+    try:
+        while not replay.finished and (not max_frames or len(durations) < max_frames):
+            sample = replay.sample()
+            if speed > 0 and replay.frame is last_frame:
+                # Rien de nouveau à cette vitesse: laisser passer l'horloge du rejeu
+                time.sleep(0.001)
+                continue
+            last_frame = replay.frame
+
+            start = time.perf_counter()
+            if profiler is not None:
+                profiler.enable()
+            # Comme save_product_state pendant la simulation, puis le rafraîchissement
+            db_manager.save_products(sample["products"])
+            controller.update_dashboard(sample["products"], sample["machines"])
+            root.update()
+            if profiler is not None:
+                profiler.disable()
+            durations.append(time.perf_counter() - start)
+    finally:
+        replay.close()
+        root.destroy()
+
+    if profiler is not None:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+    return durations
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu d'un journal d'états et profilage du tableau de bord")
+    parser.add_argument("log", help="Journal enregistré (record_dir dans config.ini)")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Multiple de la vitesse d'enregistrement (0: tous les états)")
+    parser.add_argument("--frames", type=int, default=0, help="Nombre maximal de rafraîchissements")
+    parser.add_argument("--profile", action="store_true", help="Afficher le profil cProfile")
+    parser.add_argument("--show", action="store_true", help="Afficher la fenêtre pendant le rejeu")
+    args = parser.parse_args()
+
+    durations = replay_dashboard(args.log, args.speed, args.frames, args.profile, args.show)
+    if not durations:
+        print("Aucun état rejoué")
+        return
+
+    durations.sort()
+    total = sum(durations)
+    print(f"{len(durations)} rafraîchissements en {total:.2f} s: "
+          f"moyenne {total / len(durations) * 1000:.1f} ms, "
+          f"médiane {durations[len(durations) // 2] * 1000:.1f} ms, max {durations[-1] * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
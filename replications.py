@@ -0,0 +1,382 @@
+"""
+Réplications parallèles: un workspace NetLogo headless par processus, une graine par réplication
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+
+import numpy as np
+
+from utils import safe_float, safe_str, to_python_list
+from settings import get_replication_settings
+from stepping import build_repeat_command, get_go_command
+from netlogo_utils import safe_netlogo_command, safe_netlogo_reporter, get_telemetry
+from workspace_manager import get_workspace_manager
+from result_cache import open_result_cache
+from telemetry import telemetry_to_system_state
+
+# États des machines, un couple (nom, état) par machine
+MACHINE_STATES_REPORTER = "[(list Machine.Name Machine.State)] of machines"
+
+# Connecteur headless propre à chaque processus du pool (créé par _init_worker)
+_worker_connector = None
+
+def expand_product_mix(product_mix):
+    """
+    Développe un mix produit {type: quantité} en file de lancement
+
+    Args:
+        product_mix: Dictionnaire {type de produit: quantité}
+
+    Returns:
+        list: Types de produits dans l'ordre de lancement (ex: ["A", "A", "B"])
+    """
+    queue = []
+    for product_type, quantity in product_mix.items():
+        queue.extend([product_type] * int(quantity))
+    return queue
+
+def _read_machine_states(netlogo):
+    """Retourne {nom de machine: état} pour toutes les machines"""
+    rows = to_python_list(safe_netlogo_reporter(netlogo, MACHINE_STATES_REPORTER, []))
+    states = {}
+    for row in rows:
+        row = to_python_list(row)
+        if len(row) >= 2:
+            states[safe_str(row[0])] = safe_str(row[1])
+    return states
+
+def run_scenario(connector, product_mix, seed, launch_interval=100, max_ticks=5000,
+                 sample_ticks=5, run_mode="max_throughput"):
+    """
+    Exécute une réplication complète dans un workspace déjà chargé
+
+    Les produits étant retirés du modèle à la fin de leur gamme, une complétion est
+    détectée par la disparition de son identifiant (ProductIndex.removed). Le temps
+    de cycle et l'utilisation des machines sont donc précis à sample_ticks près.
+
+    Args:
+        connector: NetLogoConnector initialisé (modèle chargé)
+        product_mix: Dictionnaire {type de produit: quantité}
+        seed: Graine aléatoire NetLogo de la réplication
+        launch_interval: Valeur du timer de lancement après chaque produit lancé
+        max_ticks: Nombre maximal de ticks avant arrêt
+        sample_ticks: Nombre de ticks entre deux relevés
+        run_mode: "normal" ou "max_throughput" (sans le wait de go)
+
+    Returns:
+        dict: KPI de la réplication (voir DatabaseManager.save_replication_result)
+              et série temporelle des compteurs ("series")
+    """
+    netlogo = connector.netlogo
+    start = time.perf_counter()
+
+    # Réinitialisation (import-world de l'état post-setup en cache, sinon setup) avant
+    # la graine: import-world restaure aussi l'état du générateur aléatoire exporté
+    if not (get_workspace_manager().reset(netlogo, connector.model_path)
+            and safe_netlogo_command(netlogo, f"random-seed {int(seed)}")):
+        return {"status": "failed", "seed": int(seed)}
+
+    product_index = connector.product_index
+    product_index.reset()
+    product_index.refresh(netlogo)
+
+    queue = deque(expand_product_mix(product_mix))
+    go_command = get_go_command(run_mode)
+    sample_ticks = max(1, int(sample_ticks))
+
+    ticks = 0
+    launched = 0
+    pending_launch = None          # (type, temps simulé) du produit lancé, pas encore indexé
+    launches = {}                  # who -> (type, temps simulé de lancement)
+    cycle_times = defaultdict(list)
+    busy_ticks = defaultdict(int)
+    series = []                    # un échantillon (temps simulé + compteurs) par relevé
+    status = "max_ticks"
+
+    telemetry = get_telemetry(netlogo)
+    if telemetry is None:
+        return {"status": "failed", "seed": int(seed)}
+
+    while ticks < max_ticks:
+        launch_timer = telemetry.launch_timer
+        if queue and launch_timer == 0:
+            product_type = queue[0]
+            if safe_netlogo_command(netlogo, f'create.product "{product_type}"'):
+                queue.popleft()
+                launched += 1
+                pending_launch = (product_type, telemetry.simulated_time)
+                safe_netlogo_command(netlogo, f"set Time-for-Possible-launching {launch_interval}")
+                launch_timer = launch_interval
+
+        # Tous les produits lancés et sortis du système
+        if not queue and pending_launch is None and not launches and telemetry.products == 0:
+            status = "completed"
+            break
+
+        # Le bloc s'arrête au prochain lancement possible
+        chunk = sample_ticks
+        if queue and launch_timer > 0:
+            chunk = min(chunk, int(launch_timer))
+        chunk = max(1, min(chunk, max_ticks - ticks))
+
+        if not safe_netlogo_command(netlogo, build_repeat_command(chunk, go_command)):
+            status = "failed"
+            break
+        ticks += chunk
+
+        telemetry = get_telemetry(netlogo)
+        if telemetry is None:
+            status = "failed"
+            break
+
+        series.append(dict(telemetry_to_system_state(telemetry), simulated_time=telemetry.simulated_time))
+
+        product_index.refresh(netlogo)
+        for product_id in product_index.added:
+            if pending_launch is not None:
+                launches[product_id] = pending_launch
+                pending_launch = None
+        for product_id in product_index.removed:
+            if product_id in launches:
+                product_type, launch_time = launches.pop(product_id)
+                cycle_times[product_type].append(telemetry.simulated_time - launch_time)
+
+        for machine_name, state in _read_machine_states(netlogo).items():
+            if state == "Machine.Processing":
+                busy_ticks[machine_name] += chunk
+            else:
+                busy_ticks.setdefault(machine_name, 0)
+
+    return {
+        "status": status,
+        "seed": int(seed),
+        "products_launched": launched,
+        "products_completed": sum(len(values) for values in cycle_times.values()),
+        "simulated_time": telemetry.simulated_time if telemetry is not None else 0.0,
+        "ticks": ticks,
+        "elapsed": time.perf_counter() - start,
+        "cycle_times": {product_type: float(np.mean(values)) for product_type, values in cycle_times.items()},
+        "cycle_counts": {product_type: len(values) for product_type, values in cycle_times.items()},
+        "utilization": {name: (busy / ticks if ticks > 0 else 0.0) for name, busy in busy_ticks.items()},
+        "series": series,
+    }
+
+def _init_worker(model_path):
+    """Initialise le workspace NetLogo headless du processus (une JVM par processus)"""
+    global _worker_connector
+    from netlogo_connector import NetLogoConnector
+
+    _worker_connector = NetLogoConnector(gui=False)
+    if not _worker_connector.initialize(model_path):
+        _worker_connector = None
+
+def _run_replication_task(task):
+    """Exécute une réplication dans le workspace du processus courant"""
+    if _worker_connector is None:
+        return dict(task, status="failed")
+
+    result = run_scenario(
+        _worker_connector,
+        task["product_mix"],
+        task["seed"],
+        launch_interval=task["launch_interval"],
+        max_ticks=task["max_ticks"],
+        sample_ticks=task["sample_ticks"],
+        run_mode=task["run_mode"],
+    )
+    result.update({key: task[key] for key in ("run_id", "scenario", "product_mix", "launch_interval")})
+    return result
+
+def new_run_id(scenario, seed):
+    """Construit un identifiant unique de réplication"""
+    return f"{scenario}-{int(seed)}-{uuid.uuid4().hex[:8]}"
+
+def run_replications(scenario, product_mix, replications=None, base_seed=None, workers=None,
+                     launch_interval=None, db_manager=None, model_path="Alpha.nlogo", on_result=None):
+    """
+    Lance les réplications d'un scénario sur un pool de processus
+
+    Chaque processus démarre sa propre JVM avec un workspace headless. Les résultats
+    sont enregistrés par le processus parent, seul à écrire dans SQLite.
+
+    Args:
+        scenario: Nom du scénario (regroupe les réplications dans la base)
+        product_mix: Dictionnaire {type de produit: quantité}
+        replications: Nombre de réplications (config.ini si None)
+        base_seed: Graine de la première réplication (random_seed de config.ini si None)
+        workers: Nombre de processus (config.ini, puis nombre de cœurs si 0)
+        launch_interval: Intervalle entre lancements (config.ini si None)
+        db_manager: DatabaseManager où enregistrer les KPI (facultatif)
+        model_path: Chemin vers le modèle NetLogo
+        on_result: Fonction appelée avec chaque résultat dès sa réception (facultatif)
+
+    Returns:
+        list: Résultats des réplications, triés par graine
+    """
+    settings = get_replication_settings()
+    replications = settings["replications"] if replications is None else int(replications)
+    base_seed = settings["random_seed"] if base_seed is None else int(base_seed)
+    launch_interval = settings["launch_interval"] if launch_interval is None else launch_interval
+    workers = workers or settings["workers"] or os.cpu_count() or 1
+    workers = max(1, min(int(workers), replications))
+
+    tasks = []
+    for index in range(replications):
+        seed = base_seed + index
+        tasks.append({
+            "run_id": new_run_id(scenario, seed),
+            "scenario": scenario,
+            "product_mix": dict(product_mix),
+            "seed": seed,
+            "launch_interval": launch_interval,
+            "max_ticks": settings["max_ticks"],
+            "sample_ticks": settings["sample_ticks"],
+            "run_mode": settings["run_mode"],
+        })
+
+    return run_tasks(tasks, workers, db_manager, model_path, on_result, open_result_cache(model_path))
+
+def run_tasks(tasks, workers, db_manager=None, model_path="Alpha.nlogo", on_result=None, result_cache=None):
+    """
+    Répartit des réplications déjà décrites sur un pool de processus headless
+
+    Les réplications présentes dans le cache de résultats sont servies sans démarrer
+    de JVM; le pool n'est créé que s'il reste des réplications à calculer.
+
+    Args:
+        tasks: Liste de dicts (run_id, scenario, product_mix, seed, launch_interval,
+               max_ticks, sample_ticks, run_mode)
+        workers: Nombre de processus
+        db_manager: DatabaseManager où enregistrer les KPI (facultatif)
+        model_path: Chemin vers le modèle NetLogo
+        on_result: Fonction appelée avec chaque résultat dès sa réception (facultatif)
+        result_cache: ResultCache consulté avant calcul et alimenté ensuite (facultatif)
+
+    Returns:
+        list: Résultats, triés par graine
+    """
+    if not tasks:
+        return []
+
+    results = []
+
+    def handle_result(result, cached=False):
+        if db_manager is not None:
+            db_manager.save_replication_result(result)
+        if on_result is not None:
+            on_result(result)
+
+        origin = "cache" if cached else result["status"]
+        print(f"Réplication {result['run_id']} terminée ({origin}, "
+              f"{result.get('products_completed', 0)} produits)")
+        results.append(result)
+
+    pending_tasks = []
+    for task in tasks:
+        cached = result_cache.get(task) if result_cache is not None else None
+        if cached is None:
+            pending_tasks.append(task)
+            continue
+        # Le résultat en cache prend l'identité de la réplication demandée
+        cached.update({key: task[key] for key in ("run_id", "scenario", "product_mix", "launch_interval")})
+        handle_result(cached, cached=True)
+
+    if not pending_tasks:
+        return sorted(results, key=lambda result: result["seed"])
+
+    model_path = os.path.abspath(model_path)
+    # "spawn": la JVM de JPype ne supporte pas d'être héritée par fork
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=max(1, min(int(workers), len(pending_tasks))), mp_context=context,
+                             initializer=_init_worker, initargs=(model_path,)) as executor:
+        futures = {executor.submit(_run_replication_task, task): task for task in pending_tasks}
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Erreur dans la réplication {task['run_id']}: {e}")
+                result = dict(task, status="failed")
+
+            if result_cache is not None and result.get("status") == "completed":
+                result_cache.put(task, result)
+            handle_result(result)
+
+    return sorted(results, key=lambda result: result["seed"])
+
+def confidence_interval(values, confidence=0.95):
+    """
+    Calcule la moyenne et la demi-largeur de l'intervalle de confiance (loi de Student)
+
+    Args:
+        values: Valeurs observées (une par réplication)
+        confidence: Niveau de confiance
+
+    Returns:
+        tuple: (moyenne, demi-largeur) - demi-largeur nulle avec moins de 2 valeurs
+    """
+    values = np.asarray([safe_float(value) for value in values], dtype=np.float64)
+    if len(values) == 0:
+        return 0.0, 0.0
+
+    mean = float(values.mean())
+    if len(values) < 2:
+        return mean, 0.0
+
+    from scipy import stats
+    sem = values.std(ddof=1) / np.sqrt(len(values))
+    return mean, float(sem * stats.t.ppf((1 + confidence) / 2, len(values) - 1))
+
+def summarize_replications(results, confidence=0.95):
+    """
+    Agrège les KPI des réplications réussies avec leurs intervalles de confiance
+
+    Args:
+        results: Résultats renvoyés par run_replications
+        confidence: Niveau de confiance
+
+    Returns:
+        dict: {KPI: (moyenne, demi-largeur)}
+    """
+    results = [result for result in results if result.get("status") == "completed"]
+    summary = {
+        "products_completed": confidence_interval([r["products_completed"] for r in results], confidence),
+        "simulated_time": confidence_interval([r["simulated_time"] for r in results], confidence),
+    }
+
+    for key in ("cycle_times", "utilization"):
+        names = sorted({name for result in results for name in result.get(key, {})})
+        for name in names:
+            values = [result[key][name] for result in results if name in result.get(key, {})]
+            summary[f"{key}.{name}"] = confidence_interval(values, confidence)
+
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Réplications parallèles du modèle Alpha")
+    parser.add_argument("--scenario", default="default", help="Nom du scénario")
+    parser.add_argument("--mix", required=True,
+                        help='Mix produit au format JSON, ex: \'{"A": 5, "B": 3}\'')
+    parser.add_argument("--replications", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None, help="Graine de la première réplication")
+    args = parser.parse_args()
+
+    from db_manager import DatabaseManager
+    results = run_replications(
+        args.scenario, json.loads(args.mix), replications=args.replications,
+        base_seed=args.seed, workers=args.workers, db_manager=DatabaseManager()
+    )
+
+    for kpi, (mean, half_width) in summarize_replications(results).items():
+        print(f"{kpi}: {mean:.3f} ± {half_width:.3f}")
+
+if __name__ == "__main__":
+    main()
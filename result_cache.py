@@ -0,0 +1,175 @@
+"""
+Cache persistant des résultats de simulations déterministes (empreinte du modèle, graine,
+mix produits et paramètres de déroulement), consulté avant de démarrer une JVM
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+from utils import model_file_hash
+from settings import get_replication_settings, get_netlogo_settings
+
+# Paramètres d'une réplication qui déterminent son résultat (en plus du modèle)
+KEY_FIELDS = ("seed", "product_mix", "launch_interval", "max_ticks", "sample_ticks", "run_mode")
+
+class ResultCache:
+    """
+    Résultats (KPI et séries temporelles) stockés dans une base SQLite séparée de la
+    base de l'application, avec éviction des entrées les moins récemment lues au-delà
+    de max_bytes. Les entrées d'une autre version du modèle sont supprimées à l'ouverture.
+    """
+    def __init__(self, db_path, model_path="Alpha.nlogo", max_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            db_path: Chemin du fichier SQLite du cache
+            model_path: Chemin vers le fichier modèle (son empreinte fait partie de la clé)
+            max_bytes: Taille maximale des résultats stockés
+        """
+        self.db_path = os.path.abspath(db_path)
+        self.max_bytes = int(max_bytes)
+        self.model_hash = model_file_hash(model_path)
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._create_tables()
+        self.invalidate()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def _create_tables(self):
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    model_hash TEXT NOT NULL,
+                    parametres TEXT,
+                    resultat BLOB,
+                    taille INTEGER,
+                    date_creation REAL,
+                    dernier_acces REAL
+                )
+            ''')
+            conn.commit()
+
+    def make_key(self, task):
+        """
+        Construit la clé d'un run à partir de l'empreinte du modèle et de ses paramètres
+
+        Args:
+            task: Dictionnaire de paramètres (voir KEY_FIELDS)
+
+        Returns:
+            tuple: (clé, paramètres normalisés en JSON)
+        """
+        parameters = json.dumps({field: task.get(field) for field in KEY_FIELDS}, sort_keys=True)
+        digest = hashlib.sha256(f"{self.model_hash}:{parameters}".encode("utf-8")).hexdigest()
+        return digest, parameters
+
+    def get(self, task):
+        """
+        Retourne le résultat stocké pour ces paramètres
+
+        Args:
+            task: Dictionnaire de paramètres (voir KEY_FIELDS)
+
+        Returns:
+            dict: Résultat (KPI et séries) ou None si absent du cache
+        """
+        key, _ = self.make_key(task)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT resultat FROM result_cache WHERE cache_key = ? AND model_hash = ?",
+                (key, self.model_hash)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE result_cache SET dernier_acces = ? WHERE cache_key = ?", (time.time(), key))
+            conn.commit()
+
+        try:
+            return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+        except (zlib.error, ValueError) as e:
+            print(f"Entrée de cache illisible, ignorée: {e}")
+            return None
+
+    def put(self, task, result):
+        """
+        Stocke le résultat d'un run terminé puis applique la limite de taille
+
+        Args:
+            task: Dictionnaire de paramètres (voir KEY_FIELDS)
+            result: Résultat sérialisable en JSON (KPI et séries)
+        """
+        key, parameters = self.make_key(task)
+        payload = zlib.compress(json.dumps(result, default=float).encode("utf-8"))
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO result_cache
+                    (cache_key, model_hash, parametres, resultat, taille, date_creation, dernier_acces)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (key, self.model_hash, parameters, payload, len(payload), now, now))
+            conn.commit()
+
+        self.evict()
+
+    def evict(self):
+        """Supprime les entrées les moins récemment lues tant que la taille dépasse max_bytes"""
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(taille), 0) FROM result_cache").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            rows = conn.execute("SELECT cache_key, taille FROM result_cache ORDER BY dernier_acces").fetchall()
+            evicted = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                evicted.append((key,))
+                total -= size
+
+            conn.executemany("DELETE FROM result_cache WHERE cache_key = ?", evicted)
+            conn.commit()
+
+    def invalidate(self):
+        """Supprime les entrées calculées avec une autre version du modèle"""
+        with self._connect() as conn:
+            deleted = conn.execute("DELETE FROM result_cache WHERE model_hash != ?", (self.model_hash,)).rowcount
+            conn.commit()
+        if deleted:
+            print(f"Cache de résultats: {deleted} entrées obsolètes supprimées (modèle modifié)")
+
+    def clear(self):
+        """Vide le cache"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM result_cache")
+            conn.commit()
+
+def open_result_cache(model_path="Alpha.nlogo"):
+    """
+    Ouvre le cache de résultats configuré dans config.ini
+
+    Args:
+        model_path: Chemin vers le fichier modèle
+
+    Returns:
+        ResultCache ou None si le cache est désactivé ou inutilisable
+    """
+    settings = get_replication_settings()
+    # Les résultats de l'usine synthétique ne doivent pas remplacer ceux du modèle
+    if not settings["result_cache"] or get_netlogo_settings()["backend"] != "pynetlogo":
+        return None
+
+    try:
+        return ResultCache(
+            os.path.join(get_netlogo_settings()["cache_dir"], "results.db"),
+            model_path,
+            max_bytes=settings["result_cache_max_mb"] * 1024 * 1024
+        )
+    except (OSError, sqlite3.Error) as e:
+        print(f"Cache de résultats indisponible: {e}")
+        return None
@@ -0,0 +1,186 @@
+"""
+Lecture de la configuration de l'application (config.ini)
+"""
+import configparser
+import glob
+import os
+import platform
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.ini")
+
+# JDK embarqué utilisé historiquement sous Windows
+WINDOWS_JVM_PATH = r"jdk\openjdk-23.0.2_windows-x64_bin\jdk-23.0.2\bin\server\jvm.dll"
+
+def load_config(config_path=CONFIG_PATH):
+    """
+    Charge le fichier de configuration
+    
+    Args:
+        config_path: Chemin vers le fichier config.ini
+        
+    Returns:
+        configparser.ConfigParser: La configuration (vide si le fichier est absent)
+    """
+    config = configparser.ConfigParser()
+    try:
+        config.read(config_path, encoding="utf-8")
+    except (configparser.Error, OSError) as e:
+        print(f"Erreur lors de la lecture de la configuration {config_path}: {e}")
+    return config
+
+def detect_jvm_path():
+    """
+    Détecte le chemin de la bibliothèque JVM selon le système d'exploitation
+    
+    Returns:
+        str: Chemin vers jvm.dll / libjvm.so / libjvm.dylib, ou None pour laisser
+             pynetlogo utiliser la JVM par défaut
+    """
+    system = platform.system()
+    
+    if system == "Windows":
+        if os.path.exists(WINDOWS_JVM_PATH):
+            return WINDOWS_JVM_PATH
+        library_name = "jvm.dll"
+        relative_dirs = [os.path.join("bin", "server"), os.path.join("jre", "bin", "server")]
+    elif system == "Darwin":
+        library_name = "libjvm.dylib"
+        relative_dirs = [os.path.join("lib", "server"), os.path.join("jre", "lib", "server")]
+    else:
+        library_name = "libjvm.so"
+        relative_dirs = [os.path.join("lib", "server"), os.path.join("jre", "lib", "amd64", "server"),
+                         os.path.join("jre", "lib", "server")]
+    
+    # Priorité à JAVA_HOME
+    java_homes = []
+    if os.environ.get("JAVA_HOME"):
+        java_homes.append(os.environ["JAVA_HOME"])
+    
+    # Emplacements habituels des JDK sous Linux
+    if system == "Linux":
+        java_homes.extend(sorted(glob.glob("/usr/lib/jvm/*"), reverse=True))
+    
+    for java_home in java_homes:
+        for relative_dir in relative_dirs:
+            candidate = os.path.join(java_home, relative_dir, library_name)
+            if os.path.exists(candidate):
+                return candidate
+    
+    return None
+
+def get_cache_dir(config):
+    """
+    Retourne le répertoire des caches (relatif au répertoire de l'application)
+    
+    Args:
+        config: Configuration chargée par load_config
+        
+    Returns:
+        str: Chemin absolu du répertoire de cache
+    """
+    cache_dir = config.get("NetLogo", "cache_dir", fallback="").strip() or ".cache"
+    return os.path.join(os.path.dirname(CONFIG_PATH), cache_dir)
+
+def get_netlogo_settings(config_path=CONFIG_PATH):
+    """
+    Récupère les paramètres de lancement de NetLogo
+    
+    Args:
+        config_path: Chemin vers le fichier config.ini
+        
+    Returns:
+        dict: {"gui": bool, "jvm_path": str ou None, "netlogo_home": str ou None,
+               "world_cache": bool, "cache_dir": str, "backend": str, "fake_latency": float,
+               "call_stats": bool, "call_stats_interval": float}
+    """
+    config = load_config(config_path)
+    
+    mode = config.get("NetLogo", "mode", fallback="gui").strip().lower()
+    jvm_path = config.get("NetLogo", "jvm_path", fallback="").strip()
+    netlogo_home = config.get("NetLogo", "netlogo_home", fallback="").strip()
+    backend = config.get("NetLogo", "backend", fallback="pynetlogo").strip().lower() or "pynetlogo"
+    if backend not in ("pynetlogo", "fake"):
+        print(f"Backend NetLogo inconnu '{backend}', utilisation de pynetlogo")
+        backend = "pynetlogo"
+    
+    return {
+        "gui": mode != "headless",
+        "jvm_path": jvm_path or detect_jvm_path(),
+        "netlogo_home": netlogo_home or None,
+        "world_cache": config.getboolean("NetLogo", "world_cache", fallback=True),
+        "cache_dir": get_cache_dir(config),
+        "backend": backend,
+        "fake_latency": config.getfloat("NetLogo", "fake_latency", fallback=0.0),
+        "call_stats": config.getboolean("NetLogo", "call_stats", fallback=True),
+        "call_stats_interval": config.getfloat("NetLogo", "call_stats_interval", fallback=30),
+    }
+
+def get_simulation_settings(config_path=CONFIG_PATH):
+    """
+    Récupère les paramètres de déroulement de la simulation
+    
+    Args:
+        config_path: Chemin vers le fichier config.ini
+        
+    Returns:
+        dict: Paramètres de la section [Simulation]
+    """
+    config = load_config(config_path)
+    
+    stepping = config.get("Simulation", "stepping", fallback="single").strip().lower()
+    if stepping not in ("single", "turbo", "next_event"):
+        print(f"Mode d'avancement inconnu '{stepping}', utilisation de 'single'")
+        stepping = "single"
+    
+    run_mode = config.get("Simulation", "run_mode", fallback="normal").strip().lower()
+    if run_mode not in ("normal", "max_throughput"):
+        print(f"Mode d'exécution inconnu '{run_mode}', utilisation de 'normal'")
+        run_mode = "normal"
+    
+    collection = config.get("Simulation", "collection", fallback="tick").strip().lower()
+    if collection not in ("tick", "batch"):
+        print(f"Mode de collecte inconnu '{collection}', utilisation de 'tick'")
+        collection = "tick"
+    
+    return {
+        "speed": config.getfloat("Simulation", "speed", fallback=1.0),
+        "max_ticks": config.getint("Simulation", "max_ticks", fallback=1000),
+        "random_seed": config.getint("Simulation", "random_seed", fallback=42),
+        "stepping": stepping,
+        "run_mode": run_mode,
+        "sample_interval": config.getfloat("Simulation", "sample_interval", fallback=0.25),
+        "max_chunk_ticks": config.getint("Simulation", "max_chunk_ticks", fallback=500),
+        "collection": collection,
+        "launch_interval": config.getfloat("Simulation", "launch_interval", fallback=100),
+        "arrival_schedule": config.get("Simulation", "arrival_schedule", fallback="").strip(),
+        "checkpoint_interval": config.getfloat("Simulation", "checkpoint_interval", fallback=60),
+        "checkpoint_keep": config.getint("Simulation", "checkpoint_keep", fallback=3),
+        "record_dir": config.get("Simulation", "record_dir", fallback="").strip(),
+        "record_interval": config.getfloat("Simulation", "record_interval", fallback=2),
+    }
+
+def get_replication_settings(config_path=CONFIG_PATH):
+    """
+    Récupère les paramètres des réplications parallèles
+    
+    Args:
+        config_path: Chemin vers le fichier config.ini
+        
+    Returns:
+        dict: Paramètres de la section [Replications] complétés par [Simulation]
+    """
+    config = load_config(config_path)
+    simulation = get_simulation_settings(config_path)
+    
+    return {
+        "replications": config.getint("Replications", "replications", fallback=30),
+        "workers": config.getint("Replications", "workers", fallback=0),
+        "launch_interval": simulation["launch_interval"],
+        "sample_ticks": config.getint("Replications", "sample_ticks", fallback=5),
+        "max_ticks": config.getint("Replications", "max_ticks", fallback=5000),
+        "result_cache": config.getboolean("Replications", "result_cache", fallback=True),
+        "result_cache_max_mb": config.getfloat("Replications", "result_cache_max_mb", fallback=256),
+        "random_seed": simulation["random_seed"],
+        # Les réplications n'ont pas d'interface à cadencer: pas de "wait" par défaut
+        "run_mode": simulation["run_mode"] if simulation["run_mode"] != "normal" else "max_throughput",
+    }
@@ -0,0 +1,419 @@
+"""
+Journal binaire des états échantillonnés (machines, produits, télémétrie) et rejeu sans JVM
+
+Format: en-tête MAGIC puis une suite de blocs "longueur (uint32) + instant d'enregistrement
+(float64) + données". L'instant est lisible sans décoder l'état, ce qui permet au rejeu
+accéléré de sauter les états intermédiaires à moindre coût. Les données
+sont produites par un seul flux zlib vidé (Z_SYNC_FLUSH) à chaque état: les valeurs qui se
+répètent d'un état à l'autre (noms, gammes, opérations des machines) ne coûtent presque
+rien, et un journal interrompu reste lisible jusqu'au dernier état complet. Le premier
+bloc est l'en-tête JSON (noms des champs), chaque bloc suivant un état.
+"""
+import json
+import os
+import struct
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import Future
+from datetime import datetime
+
+import numpy as np
+
+from settings import CONFIG_PATH, get_simulation_settings
+from telemetry import TELEMETRY_FIELDS, TelemetryRecord, telemetry_to_system_state
+from netlogo_connector import decode_system_snapshot, machines_from_snapshot
+
+MAGIC = b"NLSNAP1\n"
+LOG_VERSION = 1
+# Préfixe de chaque bloc: longueur des données compressées, instant d'enregistrement
+_PREFIX = struct.Struct("<Id")
+
+# Champs enregistrés pour chaque produit (clés de netlogo_utils.get_products_state)
+PRODUCT_FIELDS = [
+    "who", "state", "type", "sequence.order", "operations", "next.operation", "workstation",
+    "next.status", "remaining.time", "start.time", "end.time", "last.node", "next.node",
+]
+
+# Un état du journal: instant d'enregistrement (secondes depuis le début), télémétrie,
+# valeur brute de system-snapshot et produits (dictionnaires de get_products_state)
+SnapshotFrame = namedtuple("SnapshotFrame", ["time", "telemetry", "snapshot", "products"])
+
+def _json_default(value):
+    # Tableaux NumPy renvoyés par la conversion des listes NetLogo
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    return str(value)
+
+class SnapshotRecorder:
+    """
+    Écrit les états renvoyés par netlogo_connector.read_sample dans un journal binaire.
+
+    record() n'est pas protégé contre les appels concurrents: il est appelé depuis le
+    thread de l'acteur NetLogo, comme la lecture des états.
+    """
+    def __init__(self, path, model_path=None, level=6):
+        """
+        Args:
+            path: Chemin du journal (créé ou remplacé)
+            model_path: Chemin du modèle enregistré (informatif)
+            level: Niveau de compression zlib
+        """
+        self.path = os.path.abspath(path)
+        self.frames = 0
+        self.started = time.perf_counter()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._compressor = zlib.compressobj(level)
+        self._file.write(MAGIC)
+        self._write_block({
+            "version": LOG_VERSION,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "model": os.path.basename(model_path) if model_path else None,
+            "telemetry_fields": list(TelemetryRecord._fields),
+            "product_fields": PRODUCT_FIELDS,
+        }, 0.0)
+
+    def _write_block(self, value, elapsed):
+        data = json.dumps(value, separators=(",", ":"), default=_json_default).encode("utf-8")
+        block = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        self._file.write(_PREFIX.pack(len(block), elapsed))
+        self._file.write(block)
+        self._file.flush()
+
+    def record(self, sample):
+        """
+        Ajoute un état au journal
+
+        Args:
+            sample: dict renvoyé par read_sample / NetLogoConnector.sample (None ignoré)
+
+        Returns:
+            bool: True si l'état a été écrit
+        """
+        if sample is None or self._file is None:
+            return False
+
+        try:
+            telemetry = sample.get("telemetry")
+            products = [[product.get(field) for field in PRODUCT_FIELDS] for product in sample["products"]]
+            self._write_block([
+                list(telemetry) if telemetry is not None else None,
+                sample["snapshot"],
+                products,
+            ], time.perf_counter() - self.started)
+            self.frames += 1
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Erreur lors de l'enregistrement de l'état dans {self.path}: {e}")
+            return False
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            print(f"Journal d'états fermé: {self.frames} états dans {self.path}")
+
+def open_snapshot_recorder(model_path=None):
+    """
+    Ouvre un journal dans record_dir (config.ini), nommé d'après la date
+
+    Returns:
+        SnapshotRecorder ou None si l'enregistrement est désactivé ou impossible
+    """
+    record_dir = get_simulation_settings()["record_dir"]
+    if not record_dir:
+        return None
+
+    path = os.path.join(os.path.dirname(CONFIG_PATH), record_dir,
+                        f"run-{datetime.now().strftime('%Y%m%d-%H%M%S')}.nlsnap")
+    try:
+        recorder = SnapshotRecorder(path, model_path)
+    except OSError as e:
+        print(f"Enregistrement des états impossible ({path}): {e}")
+        return None
+    print(f"Enregistrement des états dans {path}")
+    return recorder
+
+class SnapshotLogReader:
+    """Lecture séquentielle d'un journal: en-tête puis itération sur les SnapshotFrame"""
+    def __init__(self, path):
+        """
+        Args:
+            path: Chemin du journal
+
+        Raises:
+            ValueError: Si le fichier n'est pas un journal d'états
+        """
+        self.path = os.path.abspath(path)
+        self._file = open(self.path, "rb")
+        self._decompressor = zlib.decompressobj()
+
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError(f"{self.path} n'est pas un journal d'états")
+        block = self.read_block()
+        self.header = json.loads(block[1]) if block is not None else None
+        if self.header is None:
+            self._file.close()
+            raise ValueError(f"{self.path}: en-tête illisible")
+
+        self._telemetry_fields = self.header.get("telemetry_fields", [])
+        self._product_fields = self.header.get("product_fields", PRODUCT_FIELDS)
+
+    def read_block(self):
+        """
+        Lit et décompresse le bloc suivant, sans le décoder
+
+        Returns:
+            tuple: (instant d'enregistrement, données JSON), None à la fin du journal
+                   ou sur un bloc tronqué
+        """
+        if self._file is None:
+            return None
+        prefix = self._file.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            return None
+        length, elapsed = _PREFIX.unpack(prefix)
+        block = self._file.read(length)
+        if len(block) < length:
+            return None
+        try:
+            # Le flux zlib est continu: chaque bloc doit être décompressé, même sauté
+            return elapsed, self._decompressor.decompress(block)
+        except zlib.error:
+            return None
+
+    def _telemetry(self, values):
+        if values is None:
+            return None
+        # Champs ajoutés à la télémétrie depuis l'enregistrement: 0 par défaut
+        recorded = dict(zip(self._telemetry_fields, values))
+        return TelemetryRecord(*(convert(recorded.get(name, 0)) for name, _, convert in TELEMETRY_FIELDS))
+
+    def decode_frame(self, block):
+        """
+        Args:
+            block: Tuple renvoyé par read_block
+
+        Returns:
+            SnapshotFrame, ou None si les données sont illisibles
+        """
+        elapsed, data = block
+        try:
+            telemetry, snapshot, rows = json.loads(data)
+        except ValueError:
+            return None
+        products = [dict(zip(self._product_fields, row)) for row in rows]
+        return SnapshotFrame(elapsed, self._telemetry(telemetry), snapshot, products)
+
+    def next_frame(self):
+        """
+        Returns:
+            SnapshotFrame suivant, ou None à la fin du journal
+        """
+        block = self.read_block()
+        return self.decode_frame(block) if block is not None else None
+
+    def __iter__(self):
+        while True:
+            frame = self.next_frame()
+            if frame is None:
+                return
+            yield frame
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class ReplayConnector:
+    """
+    Rejoue un journal d'états avec l'interface de NetLogoConnector, sans JVM.
+
+    Avec speed > 0, l'état courant suit l'horloge: à speed = 100, une minute enregistrée
+    est rejouée en 0,6 seconde (les états intermédiaires sont sautés). Avec speed = 0,
+    chaque appel à sample() avance d'un état, pour profiler le tableau de bord sur tous
+    les états. Les commandes (go, create.product...) sont acceptées et ignorées.
+    """
+    def __init__(self, log_path, speed=1.0, loop=False):
+        """
+        Args:
+            log_path: Chemin du journal à rejouer
+            speed: Multiple de la vitesse d'enregistrement (0: un état par sample())
+            loop: Si True, reprend au début à la fin du journal
+        """
+        self.log_path = os.path.abspath(log_path)
+        self.speed = float(speed)
+        self.loop = loop
+        self.model_path = None
+        self.initialized = False
+        self.finished = False
+        self.frame = None
+        self.frames_played = 0
+        self._reader = None
+        self._pending = None
+        self._clock_start = None
+        self._decoded = None
+
+    def initialize(self, model_path=None):
+        """
+        Ouvre le journal et se place sur le premier état
+
+        Returns:
+            bool: True si le journal contient au moins un état
+        """
+        self.close()
+        try:
+            self._reader = SnapshotLogReader(self.log_path)
+        except (OSError, ValueError) as e:
+            print(f"Erreur lors de l'ouverture du journal {self.log_path}: {e}")
+            return False
+
+        self.model_path = self._reader.header.get("model")
+        self.frame = self._reader.next_frame()
+        self._pending = self._reader.read_block()
+        self._clock_start = time.perf_counter()
+        self._decoded = None
+        self.finished = False
+        self.frames_played = 1 if self.frame is not None else 0
+        self.initialized = self.frame is not None
+        if self.initialized:
+            print(f"Rejeu de {self.log_path} (x{self.speed:g})")
+        return self.initialized
+
+    def _restart(self):
+        self._reader.close()
+        self._reader = SnapshotLogReader(self.log_path)
+        self._pending = self._reader.read_block()
+        self._clock_start = time.perf_counter()
+
+    def _advance(self, target=None):
+        """Avance jusqu'au dernier état enregistré avant target (un seul état si None)"""
+        if self._pending is None:
+            if self.loop:
+                self._restart()
+            else:
+                self.finished = True
+            return
+
+        # Seul le dernier bloc atteint est décodé: les états sautés ne sont que décompressés
+        current = None
+        while self._pending is not None and (target is None or self._pending[0] <= target):
+            current = self._pending
+            self._pending = self._reader.read_block()
+            self.frames_played += 1
+            if target is None:
+                break
+
+        if current is not None:
+            self.frame = self._reader.decode_frame(current) or self.frame
+            self._decoded = None
+
+    def current_frame(self):
+        """
+        Retourne l'état à afficher maintenant (selon l'horloge, ou l'état suivant si speed = 0)
+
+        Returns:
+            SnapshotFrame ou None si le journal n'est pas ouvert
+        """
+        if not self.initialized:
+            return None
+        if self.speed > 0:
+            self._advance((time.perf_counter() - self._clock_start) * self.speed)
+        return self.frame
+
+    def sample(self):
+        """
+        Returns:
+            dict: {"telemetry", "snapshot", "products", "machines"} comme NetLogoConnector.sample
+        """
+        if not self.initialized:
+            return None
+        if self.speed > 0:
+            frame = self.current_frame()
+        else:
+            frame = self.frame
+            self._advance()
+        return {
+            "telemetry": frame.telemetry,
+            "snapshot": frame.snapshot,
+            "products": [dict(product) for product in frame.products],
+            "machines": machines_from_snapshot(self._snapshot(frame)),
+        }
+
+    def _snapshot(self, frame):
+        if self._decoded is None or self._decoded[0] is not frame:
+            self._decoded = (frame, decode_system_snapshot(frame.snapshot))
+        return self._decoded[1]
+
+    def get_products_data(self):
+        frame = self.current_frame()
+        return [dict(product) for product in frame.products] if frame is not None else []
+
+    def get_machines_data(self):
+        frame = self.current_frame()
+        return machines_from_snapshot(self._snapshot(frame)) if frame is not None else []
+
+    def get_snapshot(self):
+        frame = self.current_frame()
+        return self._snapshot(frame) if frame is not None else None
+
+    def get_telemetry(self):
+        frame = self.current_frame()
+        return frame.telemetry if frame is not None else None
+
+    def get_reporter_value(self, reporter, default=None):
+        """
+        Répond aux reporters de la télémétrie (ticks, simulated.time, count products...)
+        et à system-snapshot; default pour tout autre reporter
+        """
+        frame = self.current_frame()
+        if frame is None:
+            return default
+        if reporter == "system-snapshot":
+            return frame.snapshot
+        if frame.telemetry is not None:
+            for name, expression, _ in TELEMETRY_FIELDS:
+                if reporter.strip().lower() == expression.lower():
+                    return getattr(frame.telemetry, name)
+        return default
+
+    def submit(self, function, *args):
+        """Exécute function(*args) immédiatement (pas d'acteur à rejoindre pendant le rejeu)"""
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def execute_command(self, command):
+        return self.initialized
+
+    def step(self, ticks=1, run_mode="normal"):
+        return self.initialized and not self.finished
+
+    def step_chunk(self, sizer, limit=None, run_mode="normal"):
+        return 1 if self.step() else 0
+
+    def step_to_next_event(self, launch_pending=False, max_skip=500, run_mode="normal"):
+        return 1 if self.step() else None
+
+    def collect_series(self, sizer, limit=None, run_mode="normal"):
+        telemetry = self.get_telemetry()
+        if telemetry is None:
+            return 0, None
+        sample = telemetry_to_system_state(telemetry)
+        sample["simulated_time"] = telemetry.simulated_time
+        return 1, [sample]
+
+    def run_max_throughput(self, total_ticks, chunk_ticks=1000):
+        return None
+
+    def close(self, keep_warm=False):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        self.initialized = False
@@ -0,0 +1,258 @@
+"""
+Stratégies d'avancement de la simulation NetLogo (pas à pas ou par blocs de ticks)
+"""
+import math
+import time
+
+from utils import safe_float, safe_int, to_python_list
+
+# Corps de la procédure Go du modèle Alpha sans le "wait 1 / (speed * 100)":
+# mouvement des produits, complétion des machines et décompte du timer de lancement
+UNTHROTTLED_GO = (
+    "Moving.Product Product.Movement "
+    "if (Time-for-Possible-launching > 0) "
+    "[ set Time-for-Possible-launching precision (Time-for-Possible-launching - 1) 0 ]"
+)
+
+# Prochain événement en un seul appel: temps simulé, plus petite échéance machine,
+# timer de lancement et nombre de produits présents
+NEXT_EVENT_REPORTER = (
+    "(list simulated.time min [Next.Completion] of machines "
+    "Time-for-Possible-launching count products)"
+)
+
+# Next.Completion d'une machine inactive (10000000, ou 1000000000 juste après setup)
+IDLE_COMPLETION = 10000000
+
+# Avancement de simulated.time à chaque exécution de Go (Product.Movement)
+TICK_TIME = 0.2
+
+def ticks_to_next_event(simulated_time, next_completion, launch_timer, launch_pending, tick_time=TICK_TIME):
+    """
+    Calcule le nombre de ticks à exécuter pour atteindre le prochain événement
+    
+    Go vérifie les complétions machines avant d'avancer simulated.time: une machine dont
+    l'échéance est T termine pendant le tick où simulated.time atteint T, soit
+    ceil((T - temps) / tick_time) + 1 ticks. Le timer de lancement atteint 0 après
+    launch_timer ticks.
+    
+    Args:
+        simulated_time: Valeur actuelle de simulated.time
+        next_completion: Plus petite valeur de Next.Completion des machines
+        launch_timer: Valeur actuelle de Time-for-Possible-launching
+        launch_pending: True s'il reste des produits à lancer
+        tick_time: Avancement de simulated.time par tick
+        
+    Returns:
+        int: Nombre de ticks jusqu'au prochain événement, ou None si aucun n'est prévu
+    """
+    candidates = []
+    
+    if next_completion < IDLE_COMPLETION:
+        # Arrondi à 1e-6 près: simulated.time est arrondi à 0.1 par le modèle
+        steps = math.ceil(round((next_completion - simulated_time) / tick_time, 6))
+        candidates.append(max(steps, 0) + 1)
+    
+    if launch_pending and launch_timer > 0:
+        candidates.append(int(math.ceil(launch_timer)))
+    
+    return min(candidates) if candidates else None
+
+def run_to_next_event(netlogo_report, netlogo_command, launch_pending=False, max_skip=500, go_command="go"):
+    """
+    Avance la simulation jusqu'au prochain événement (fin d'opération ou lancement) en
+    une seule commande, sans échantillonner les ticks intermédiaires
+    
+    Args:
+        netlogo_report: Fonction (reporter) -> valeur exécutant un reporter NetLogo
+        netlogo_command: Fonction (commande) -> bool exécutant une commande NetLogo
+        launch_pending: True s'il reste des produits à lancer
+        max_skip: Nombre maximal de ticks sautés en une fois (les arrivées des produits
+                  sur les convoyeurs ne sont pas prévisibles)
+        go_command: Procédure NetLogo exécutée à chaque tick
+        
+    Returns:
+        int: Nombre de ticks exécutés (0 si un lancement est attendu ou s'il n'y a rien
+             à simuler), None en cas d'erreur NetLogo
+    """
+    values = to_python_list(netlogo_report(NEXT_EVENT_REPORTER))
+    if len(values) != 4:
+        return None
+    
+    simulated_time, next_completion, launch_timer = (safe_float(value) for value in values[:3])
+    products = safe_int(values[3])
+    
+    if launch_pending and launch_timer <= 0:
+        # Un lancement est attendu maintenant: rendre la main à l'appelant
+        return 0
+    
+    ticks = ticks_to_next_event(simulated_time, next_completion, launch_timer, launch_pending)
+    if ticks is None:
+        if products == 0:
+            # Ni produit ni lancement prévu: rien à simuler
+            return 0
+        ticks = max_skip
+    
+    ticks = max(1, min(int(ticks), int(max_skip)))
+    if not netlogo_command(build_repeat_command(ticks, go_command)):
+        return None
+    return ticks
+
+def get_go_command(run_mode="normal"):
+    """
+    Retourne la commande exécutée à chaque tick selon le mode d'exécution
+    
+    Args:
+        run_mode: "normal" (procédure go du modèle, cadencée par le slider speed)
+                  ou "max_throughput" (sans attente artificielle)
+                  
+    Returns:
+        str: La commande NetLogo d'un tick
+    """
+    if run_mode == "max_throughput":
+        return UNTHROTTLED_GO
+    return "go"
+
+def build_repeat_command(ticks, go_command="go"):
+    """
+    Construit la commande NetLogo qui exécute plusieurs ticks en un seul appel
+    
+    Args:
+        ticks: Nombre de ticks à exécuter
+        go_command: Procédure NetLogo exécutée à chaque tick
+        
+    Returns:
+        str: La commande NetLogo (ex: "repeat 50 [ go ]")
+    """
+    ticks = max(1, int(ticks))
+    if ticks == 1:
+        return go_command
+    return f"repeat {ticks} [ {go_command} ]"
+
+class ChunkSizer:
+    """
+    Adapte le nombre de ticks exécutés par commande ("turbo") pour que chaque
+    bloc dure environ l'intervalle d'échantillonnage visé.
+    """
+    def __init__(self, target_interval=0.25, initial_chunk=10, min_chunk=1, max_chunk=500):
+        """
+        Args:
+            target_interval: Durée visée (secondes) entre deux échantillons
+            initial_chunk: Taille du premier bloc
+            min_chunk: Taille minimale d'un bloc
+            max_chunk: Taille maximale d'un bloc
+        """
+        self.target_interval = max(0.001, float(target_interval))
+        self.min_chunk = max(1, int(min_chunk))
+        self.max_chunk = max(self.min_chunk, int(max_chunk))
+        self.chunk = min(max(int(initial_chunk), self.min_chunk), self.max_chunk)
+        self.seconds_per_tick = None
+        self.last_ticks_per_second = 0.0
+    
+    def next_chunk(self, limit=None):
+        """
+        Retourne la taille du prochain bloc
+        
+        Args:
+            limit: Nombre maximal de ticks autorisés (ex: ticks restants avant
+                   le prochain lancement de produit ou avant la fin)
+        """
+        chunk = self.chunk
+        if limit is not None:
+            chunk = min(chunk, int(limit))
+        return max(1, chunk)
+    
+    def record(self, ticks, elapsed):
+        """
+        Met à jour l'estimation du coût d'un tick après l'exécution d'un bloc
+        
+        Args:
+            ticks: Nombre de ticks exécutés
+            elapsed: Durée mesurée (secondes)
+        """
+        if ticks <= 0 or elapsed <= 0:
+            return
+        
+        measured = elapsed / ticks
+        if self.seconds_per_tick is None:
+            self.seconds_per_tick = measured
+        else:
+            # Moyenne glissante pour lisser les variations de charge
+            self.seconds_per_tick = 0.7 * self.seconds_per_tick + 0.3 * measured
+        self.last_ticks_per_second = ticks / elapsed
+        
+        wanted = int(self.target_interval / self.seconds_per_tick)
+        # Croissance limitée à un facteur 2 par bloc pour rester réactif
+        wanted = min(wanted, self.chunk * 2)
+        self.chunk = min(max(wanted, self.min_chunk), self.max_chunk)
+
+def run_chunk(netlogo_command, sizer, limit=None, go_command="go"):
+    """
+    Exécute un bloc de ticks et met à jour le dimensionnement des blocs
+    
+    Args:
+        netlogo_command: Fonction (commande) -> bool exécutant une commande NetLogo
+        sizer: Instance de ChunkSizer
+        limit: Nombre maximal de ticks pour ce bloc
+        go_command: Procédure NetLogo exécutée à chaque tick
+        
+    Returns:
+        int: Nombre de ticks exécutés (0 si la commande a échoué)
+    """
+    ticks = sizer.next_chunk(limit)
+    start = time.perf_counter()
+    if not netlogo_command(build_repeat_command(ticks, go_command)):
+        return 0
+    sizer.record(ticks, time.perf_counter() - start)
+    return ticks
+
+def run_series_chunk(netlogo_repeat_report, sizer, limit=None, go_command="go"):
+    """
+    Exécute un bloc de ticks en collectant les séries de KPI côté JVM (repeat_report)
+    
+    Args:
+        netlogo_repeat_report: Fonction (ticks, go_command) -> résultats ou None
+        sizer: Instance de ChunkSizer
+        limit: Nombre maximal de ticks pour ce bloc
+        go_command: Procédure NetLogo exécutée à chaque tick
+        
+    Returns:
+        tuple: (ticks exécutés, résultats de repeat_report) - (0, None) en cas d'échec
+    """
+    ticks = sizer.next_chunk(limit)
+    start = time.perf_counter()
+    results = netlogo_repeat_report(ticks, go_command)
+    if results is None:
+        return 0, None
+    sizer.record(ticks, time.perf_counter() - start)
+    return ticks, results
+
+def run_max_throughput(netlogo_command, total_ticks, chunk_ticks=1000):
+    """
+    Exécute des ticks sans l'attente de la procédure Go et mesure le débit obtenu
+    
+    Args:
+        netlogo_command: Fonction (commande) -> bool exécutant une commande NetLogo
+        total_ticks: Nombre total de ticks à exécuter
+        chunk_ticks: Nombre de ticks par commande NetLogo
+        
+    Returns:
+        dict: {"ticks": ticks exécutés, "elapsed": durée en secondes,
+               "ticks_per_second": débit obtenu}
+    """
+    done = 0
+    chunk_ticks = max(1, int(chunk_ticks))
+    start = time.perf_counter()
+    
+    while done < total_ticks:
+        ticks = min(chunk_ticks, total_ticks - done)
+        if not netlogo_command(build_repeat_command(ticks, UNTHROTTLED_GO)):
+            print(f"Arrêt du mode débit maximal après {done} ticks (erreur NetLogo)")
+            break
+        done += ticks
+    
+    elapsed = time.perf_counter() - start
+    ticks_per_second = done / elapsed if elapsed > 0 else 0.0
+    print(f"Débit maximal: {done} ticks en {elapsed:.2f} s ({ticks_per_second:.1f} ticks/s)")
+    
+    return {"ticks": done, "elapsed": elapsed, "ticks_per_second": ticks_per_second}
@@ -0,0 +1,171 @@
+"""
+Balayage de paramètres: mix produits x intervalles de lancement, répartis sur le pool de réplications
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+
+from settings import get_replication_settings
+from replications import run_tasks
+from result_cache import open_result_cache
+
+def product_mix_grid(quantities_by_type):
+    """
+    Construit toutes les combinaisons de quantités par type de produit
+
+    Args:
+        quantities_by_type: Dictionnaire {type de produit: liste de quantités}
+                            (ex: {"A": [0, 5], "B": [2, 4]})
+
+    Returns:
+        list: Mix produits {type: quantité}, sans les mix vides
+    """
+    product_types = sorted(quantities_by_type)
+    mixes = []
+    for quantities in itertools.product(*(quantities_by_type[t] for t in product_types)):
+        mix = {product_type: int(quantity) for product_type, quantity in zip(product_types, quantities) if int(quantity) > 0}
+        if mix:
+            mixes.append(mix)
+    return mixes
+
+def point_key(product_mix, launch_interval):
+    """
+    Clé stable d'un point du balayage (indépendante de l'ordre des types du mix)
+
+    Args:
+        product_mix: Dictionnaire {type de produit: quantité}
+        launch_interval: Intervalle entre lancements
+
+    Returns:
+        str: Empreinte courte du point
+    """
+    payload = json.dumps({"mix": product_mix, "interval": float(launch_interval)}, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+def build_sweep_points(product_mixes, launch_intervals):
+    """
+    Construit les points du balayage (produit cartésien mix x intervalles)
+
+    Args:
+        product_mixes: Liste de mix produits {type: quantité}
+        launch_intervals: Liste d'intervalles de lancement
+
+    Returns:
+        list: Dicts (point_key, product_mix, launch_interval), sans doublons
+    """
+    points = {}
+    for product_mix, launch_interval in itertools.product(product_mixes, launch_intervals):
+        product_mix = {product_type: int(quantity) for product_type, quantity in product_mix.items()}
+        key = point_key(product_mix, launch_interval)
+        points[key] = {"point_key": key, "product_mix": product_mix, "launch_interval": float(launch_interval)}
+    return list(points.values())
+
+def run_sweep(sweep, product_mixes, launch_intervals, db_manager, replications=None, base_seed=None,
+              workers=None, model_path="Alpha.nlogo"):
+    """
+    Exécute un balayage, en reprenant là où un balayage interrompu s'est arrêté
+
+    Les réplications ont un run_id déterministe (balayage, point, graine): à la reprise,
+    les points terminés et les réplications déjà enregistrées ne sont pas relancés.
+
+    Args:
+        sweep: Nom du balayage
+        product_mixes: Liste de mix produits {type: quantité}
+        launch_intervals: Liste d'intervalles de lancement
+        db_manager: DatabaseManager où enregistrer réplications et agrégats
+        replications: Nombre de réplications par point (config.ini si None)
+        base_seed: Graine de la première réplication de chaque point (config.ini si None)
+        workers: Nombre de processus (config.ini, puis nombre de cœurs si 0)
+        model_path: Chemin vers le modèle NetLogo
+
+    Returns:
+        DataFrame: Points du balayage et leurs agrégats
+    """
+    settings = get_replication_settings()
+    replications = settings["replications"] if replications is None else int(replications)
+    base_seed = settings["random_seed"] if base_seed is None else int(base_seed)
+    workers = workers or settings["workers"] or os.cpu_count() or 1
+
+    points = build_sweep_points(product_mixes, launch_intervals)
+    db_manager.register_sweep_points(sweep, points, replications)
+    done_points = db_manager.get_done_sweep_points(sweep)
+
+    run_ids_by_point = {}
+    tasks = []
+    for point in points:
+        if point["point_key"] in done_points:
+            continue
+
+        point_tasks = []
+        for index in range(replications):
+            seed = base_seed + index
+            point_tasks.append({
+                "run_id": f"{sweep}-{point['point_key']}-{seed}",
+                "scenario": f"{sweep}/{point['point_key']}",
+                "product_mix": point["product_mix"],
+                "seed": seed,
+                "launch_interval": point["launch_interval"],
+                "max_ticks": settings["max_ticks"],
+                "sample_ticks": settings["sample_ticks"],
+                "run_mode": settings["run_mode"],
+            })
+        run_ids_by_point[point["point_key"]] = {task["run_id"] for task in point_tasks}
+
+        completed = db_manager.get_completed_run_ids(task["run_id"] for task in point_tasks)
+        tasks.extend(task for task in point_tasks if task["run_id"] not in completed)
+
+    print(f"Balayage '{sweep}': {len(points)} points, {len(done_points)} déjà terminés, "
+          f"{len(tasks)} réplications à exécuter")
+
+    remaining = {key: set(run_ids) for key, run_ids in run_ids_by_point.items()}
+    failed_points = set()
+
+    def finish_point(key):
+        aggregates = db_manager.get_replication_aggregates(run_ids_by_point[key])
+        db_manager.save_sweep_point_result(sweep, key, aggregates)
+        print(f"Point {key} terminé: {aggregates['products_completed']:.1f} produits, "
+              f"débit {aggregates['throughput']:.4f}")
+
+    def on_result(result):
+        key = result["scenario"].split("/", 1)[1]
+        remaining[key].discard(result["run_id"])
+        if result.get("status") != "completed":
+            # Le point reste "pending" et sera complété à la prochaine reprise
+            failed_points.add(key)
+        elif not remaining[key] and key not in failed_points:
+            finish_point(key)
+
+    # Points dont toutes les réplications étaient déjà enregistrées avant l'interruption
+    pending_run_ids = {task["run_id"] for task in tasks}
+    for key in run_ids_by_point:
+        remaining[key] &= pending_run_ids
+        if not remaining[key]:
+            finish_point(key)
+
+    run_tasks(tasks, workers, db_manager, model_path, on_result, open_result_cache(model_path))
+
+    return db_manager.get_sweep_results(sweep)
+
+def main():
+    parser = argparse.ArgumentParser(description="Balayage mix produits x intervalles de lancement")
+    parser.add_argument("--name", required=True, help="Nom du balayage (reprise si déjà existant)")
+    mixes = parser.add_mutually_exclusive_group(required=True)
+    mixes.add_argument("--mixes", help='Liste JSON de mix, ex: \'[{"A": 5}, {"A": 3, "B": 2}]\'')
+    mixes.add_argument("--grid", help='Quantités par type en JSON, ex: \'{"A": [0, 5], "B": [2, 4]}\'')
+    parser.add_argument("--intervals", default="100", help="Intervalles de lancement, ex: 50,100,150")
+    parser.add_argument("--replications", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    product_mixes = json.loads(args.mixes) if args.mixes else product_mix_grid(json.loads(args.grid))
+    launch_intervals = [float(value) for value in args.intervals.split(",") if value.strip()]
+
+    from db_manager import DatabaseManager
+    results = run_sweep(args.name, product_mixes, launch_intervals, DatabaseManager(),
+                        replications=args.replications, workers=args.workers)
+    print(results.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
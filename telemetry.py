@@ -0,0 +1,100 @@
+"""
+Télémétrie par tick: tous les scalaires suivis à chaque pas regroupés dans un seul reporter NetLogo
+"""
+from collections import namedtuple
+from utils import safe_float, safe_int, to_python_list
+
+# (nom du champ, expression NetLogo, conversion) - l'ordre définit la disposition de l'enregistrement
+TELEMETRY_FIELDS = [
+    ("ticks", "ticks", safe_float),
+    ("simulated_time", "simulated.time", safe_float),
+    ("launch_timer", "Time-for-Possible-launching", safe_float),
+    ("products", "count products", safe_int),
+    ("waiting_products", 'count products with [product.state = "Waiting"]', safe_int),
+    ("in_progress_products", 'count products with [product.state = "Processing.Product"]', safe_int),
+    ("completed_products", 'count products with [product.state = "Completed"]', safe_int),
+    ("idle_machines", 'count machines with [machine.state = "Idle"]', safe_int),
+    ("processing_machines", 'count machines with [machine.state = "Machine.Processing"]', safe_int),
+    ("down_machines", 'count machines with [machine.state = "Down"]', safe_int),
+]
+
+TelemetryRecord = namedtuple("TelemetryRecord", [name for name, _, _ in TELEMETRY_FIELDS])
+
+# Champs repris dans la table snapshot (voir DatabaseManager.save_snapshot)
+SYSTEM_STATE_FIELDS = [
+    "waiting_products",
+    "in_progress_products",
+    "completed_products",
+    "idle_machines",
+    "processing_machines",
+    "down_machines",
+]
+
+def build_telemetry_reporter():
+    """
+    Construit le reporter qui renvoie tous les scalaires de télémétrie en une liste
+    
+    Returns:
+        str: Reporter de la forme "(list ticks simulated.time ...)"
+    """
+    expressions = " ".join(f"({expression})" for _, expression, _ in TELEMETRY_FIELDS)
+    return f"(list {expressions})"
+
+TELEMETRY_REPORTER = build_telemetry_reporter()
+
+def decode_telemetry(raw_values):
+    """
+    Décode le résultat du reporter de télémétrie
+    
+    Args:
+        raw_values: Liste renvoyée par NetLogo pour TELEMETRY_REPORTER
+        
+    Returns:
+        TelemetryRecord ou None si le nombre de valeurs ne correspond pas
+    """
+    values = to_python_list(raw_values)
+    if len(values) != len(TELEMETRY_FIELDS):
+        return None
+    
+    return TelemetryRecord(*(convert(value) for (_, _, convert), value in zip(TELEMETRY_FIELDS, values)))
+
+def telemetry_to_system_state(record):
+    """
+    Convertit un enregistrement de télémétrie au format attendu par save_snapshot
+    
+    Args:
+        record: TelemetryRecord
+        
+    Returns:
+        dict: État du système (produits et machines par état)
+    """
+    return {field: getattr(record, field) for field in SYSTEM_STATE_FIELDS}
+
+# Séries collectées par repeat_report: temps simulé puis compteurs de la table snapshot.
+# Le modèle Alpha n'appelle jamais "tick", l'horodatage des échantillons est donc simulated.time.
+SERIES_FIELDS = [("simulated_time", "simulated.time", safe_float)] + [
+    field for field in TELEMETRY_FIELDS if field[0] in SYSTEM_STATE_FIELDS
+]
+
+SERIES_REPORTERS = [expression for _, expression, _ in SERIES_FIELDS]
+
+def decode_series(results):
+    """
+    Décode le résultat de repeat_report(SERIES_REPORTERS, ...) en échantillons
+    
+    Args:
+        results: DataFrame (une colonne par reporter) ou dict {reporter: valeurs}
+                 renvoyé par pynetlogo
+        
+    Returns:
+        list: Un dict par tick échantillonné (simulated_time et champs de SYSTEM_STATE_FIELDS)
+    """
+    columns = {}
+    for name, expression, convert in SERIES_FIELDS:
+        values = results[expression]
+        if hasattr(values, "tolist"):
+            values = values.tolist()
+        columns[name] = [convert(value) for value in to_python_list(values)]
+    
+    length = min(len(values) for values in columns.values())
+    return [{name: values[index] for name, values in columns.items()} for index in range(length)]
@@ -1,12 +1,19 @@
 """
 Utilitaires pour la gestion des données et conversions de types
 """
+import hashlib
+import os
 import numpy as np
 
+# Empreintes déjà calculées: (chemin absolu, date de modification, taille) -> sha256
+_file_hash_cache = {}
+
 def safe_int(value, default=0):
     """Convertit une valeur en entier de manière sécurisée"""
     if value is None:
         return default
+    if type(value) is int:
+        return value
     try:
         if isinstance(value, str):
             # Si c'est un nombre décimal comme '1.5', convertir d'abord en float
@@ -21,9 +28,9 @@ def safe_float(value, default=0.0):
     """Convertit une valeur en float de manière sécurisée"""
     if value is None:
         return default
+    if type(value) is float:
+        return value
     try:
-        if isinstance(value, str):
-            return float(value)
         return float(value)
     except (ValueError, TypeError):
         return default
@@ -32,6 +39,8 @@ def safe_str(value, default=""):
     """Convertit une valeur en chaîne de caractères de manière sécurisée"""
     if value is None:
         return default
+    if type(value) is str:
+        return value
     try:
         return str(value)
     except Exception:
@@ -291,41 +300,138 @@ def execute_safe_netlogo_reporter(netlogo, reporter_template, params=None, defau
         print(f"Erreur dans l'exécution du reporter NetLogo: {e}")
         return default
 
-def convert_java_to_python(value):
+# Table de conversion: type de la valeur -> fonction de conversion, résolue une seule fois par type
+_type_converters = {}
+# Types dont les valeurs sont des nombres (scalaires Python, NumPy ou Java)
+_numeric_types = {}
+
+_JAVA_FLOAT_TYPES = ("java.lang.Double", "java.lang.Float")
+_JAVA_INT_TYPES = ("java.lang.Integer", "java.lang.Long", "java.lang.Short", "java.lang.Byte")
+_JAVA_LIST_TYPES = ("java.util.ArrayList", "java.util.List", "org.nlogo.core.LogoList", "scala.collection")
+
+def _identity(value, numeric_arrays=True):
+    return value
+
+def _to_bool(value, numeric_arrays=True):
+    return bool(value)
+
+def _to_int(value, numeric_arrays=True):
+    return int(value)
+
+def _to_float(value, numeric_arrays=True):
+    return float(value)
+
+def _to_str(value, numeric_arrays=True):
+    return str(value)
+
+def _convert_array(value, numeric_arrays=True):
+    if numeric_arrays and value.dtype.kind in "biuf":
+        return value
+    return value.tolist()
+
+def _convert_sequence(value, numeric_arrays=True):
+    items = value if isinstance(value, list) else list(value)
+    if not items:
+        return items
+
+    # Liste de nombres (d'après le premier élément): NumPy détermine le type du tableau
+    # en une passe, sans travail Python par élément; un tableau non numérique (chaînes,
+    # objets Java mélangés...) est écarté au profit de la conversion élément par élément
+    if numeric_arrays and _numeric_kind(type(items[0])):
+        try:
+            array = np.array(items)
+        except (ValueError, TypeError, OverflowError):
+            array = None
+        if array is not None and array.ndim == 1 and array.dtype.kind in "iuf":
+            return array
+
+    return [convert_java_to_python(item, numeric_arrays) for item in items]
+
+def _convert_java_array(value, numeric_arrays=True):
+    # Tableau Java de types primitifs (double[], int[]...): copie en bloc par JPype
+    try:
+        array = np.asarray(value)
+    except (ValueError, TypeError):
+        return _convert_sequence(value, numeric_arrays)
+    if array.dtype.kind == "O":
+        # Tableau d'objets Java: chaque élément doit être converti
+        return _convert_sequence(value, numeric_arrays)
+    return _convert_array(array, numeric_arrays)
+
+def _numeric_kind(value_type):
+    """Retourne "int", "float" ou None pour un type de valeur (résolu une seule fois)"""
+    if value_type not in _type_converters:
+        _resolve_converter(value_type)
+    return _numeric_types.get(value_type)
+
+def _resolve_converter(value_type):
     """
-    Convertit explicitement les types Java en types Python natifs.
+    Détermine la conversion à appliquer aux valeurs d'un type et la met en cache
     
     Args:
-        value: La valeur Java/Python à convertir
+        value_type: Type Python (ou classe Java exposée par JPype)
         
     Returns:
-        La valeur convertie en type Python natif
+        Fonction de conversion (valeur, numeric_arrays) -> valeur Python
     """
-    # Pour les chaînes Java, convertir en chaîne Python
-    if str(type(value)).find('java.lang.String') != -1:
-        return str(value)
-    
-    # Pour les nombres Java, convertir en nombre Python
-    if str(type(value)).find('java.lang.Double') != -1 or str(type(value)).find('java.lang.Float') != -1:
-        return float(value)
-    
-    if str(type(value)).find('java.lang.Integer') != -1 or str(type(value)).find('java.lang.Long') != -1:
-        return int(value)
-    
-    # Pour les booléens Java, convertir en booléen Python
-    if str(type(value)).find('java.lang.Boolean') != -1:
-        return bool(value)
+    converter = _identity
+    numeric = None
+    type_name = str(value_type)
+
+    if "java.lang.Boolean" in type_name or "JBoolean" in type_name or issubclass(value_type, (bool, np.bool_)):
+        converter = _to_bool
+    elif issubclass(value_type, (int, np.integer)):
+        converter, numeric = _to_int, "int"
+    elif issubclass(value_type, (float, np.floating)):
+        converter, numeric = _to_float, "float"
+    elif issubclass(value_type, str):
+        converter = _to_str
+    elif issubclass(value_type, np.ndarray):
+        converter = _convert_array
+    elif issubclass(value_type, (list, tuple)):
+        converter = _convert_sequence
+    elif "java.lang.String" in type_name:
+        converter = _to_str
+    elif any(name in type_name for name in _JAVA_FLOAT_TYPES):
+        converter, numeric = _to_float, "float"
+    elif any(name in type_name for name in _JAVA_INT_TYPES):
+        converter, numeric = _to_int, "int"
+    elif "[]" in type_name:
+        # Tableaux Java (JPype les nomme "<java class 'double[]'>")
+        converter = _convert_java_array
+    elif any(name in type_name for name in _JAVA_LIST_TYPES):
+        converter = _convert_sequence
+
+    _type_converters[value_type] = converter
+    if numeric:
+        _numeric_types[value_type] = numeric
+    return converter
+
+def convert_java_to_python(value, numeric_arrays=True):
+    """
+    Convertit explicitement les types Java en types Python natifs.
     
-    # Pour les listes Java, convertir en liste Python
-    if str(type(value)).find('java.util.ArrayList') != -1 or str(type(value)).find('java.util.List') != -1:
-        return [convert_java_to_python(item) for item in value]
+    La conversion est choisie d'après le type de la valeur, via une table résolue
+    une seule fois par type. Les listes de nombres et les tableaux Java de types
+    primitifs sont convertis en bloc en tableau NumPy.
     
-    # Pour les tableaux Java, convertir en liste Python
-    if str(type(value)).startswith('['):  # Les tableaux Java ont un type qui commence par '['
-        return [convert_java_to_python(item) for item in value]
+    pynetlogo convertit déjà les résultats de report(): les utilitaires de lecture
+    n'appellent pas cette fonction, réservée aux valeurs Java brutes (bench_conversion).
     
-    # Pour les autres types, renvoyer la valeur telle quelle
-    return value
+    Args:
+        value: La valeur Java/Python à convertir
+        numeric_arrays: Si False, les listes de nombres restent des listes Python
+        
+    Returns:
+        La valeur convertie en type Python natif (ou ndarray pour une liste de nombres)
+    """
+    if value is None:
+        return None
+
+    converter = _type_converters.get(type(value))
+    if converter is None:
+        converter = _resolve_converter(type(value))
+    return converter(value, numeric_arrays)
 
 def normalize_tuple_length(data_tuple, expected_length, default_values=None):
     """
@@ -358,3 +464,42 @@ def normalize_tuple_length(data_tuple, expected_length, default_values=None):
         result = result[:expected_length]
     
     return tuple(result)
+
+def model_file_hash(path):
+    """
+    Calcule l'empreinte SHA-256 d'un fichier modèle
+    
+    L'empreinte n'est recalculée que si la date de modification ou la taille du
+    fichier change, ce qui permet de l'utiliser comme clé de cache à chaque exécution.
+    
+    Args:
+        path: Chemin vers le fichier (ex: Alpha.nlogo)
+        
+    Returns:
+        str: Empreinte hexadécimale du contenu
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    
+    if key not in _file_hash_cache:
+        digest = hashlib.sha256()
+        with open(path, "rb") as model_file:
+            for block in iter(lambda: model_file.read(1 << 16), b""):
+                digest.update(block)
+        _file_hash_cache[key] = digest.hexdigest()
+    
+    return _file_hash_cache[key]
+
+def netlogo_string(value):
+    """
+    Formate une chaîne Python en littéral NetLogo (ex: chemin pour export-world)
+    
+    Args:
+        value: Chaîne à formater
+        
+    Returns:
+        str: Littéral entre guillemets, barres obliques normalisées
+    """
+    value = str(value).replace("\\", "/").replace('"', '\\"')
+    return f'"{value}"'
@@ -0,0 +1,183 @@
+"""
+Gestion des workspaces NetLogo "chauds": la JVM et le modèle compilé restent chargés
+entre deux simulations, la réinitialisation passe uniquement par setup
+"""
+import os
+
+from netlogo_utils import safe_netlogo_command, wait_until_ready
+from settings import get_netlogo_settings
+from world_cache import WorldCache
+from netlogo_actor import get_actor
+from circuit_breaker import get_jvm_breaker
+from model_introspection import load_model_layout, forget_workspace
+
+class WorkspaceManager:
+    """
+    Conserve un NetLogoLink par mode d'affichage (GUI ou headless) et le modèle chargé.
+    Les workspaces renvoyés sont des proxys de l'acteur NetLogo (voir netlogo_actor):
+    ils peuvent être utilisés depuis n'importe quel thread.
+
+    La JVM ne pouvant être démarrée qu'une fois par processus, tuer et recréer le
+    workspace à chaque initialisation coûte plusieurs secondes pour rien: seul un
+    changement de modèle (chemin ou date de modification) impose un load_model.
+    """
+    def __init__(self, world_cache=None):
+        """
+        Args:
+            world_cache: WorldCache utilisé pour restaurer le monde après setup (facultatif)
+        """
+        # (gui, nom) -> {"link": NetLogoLinkProxy, "model_path": str, "model_mtime": float}
+        self._workspaces = {}
+        self.world_cache = world_cache
+
+    def _model_signature(self, model_path):
+        """Retourne (chemin absolu, date de modification) du modèle"""
+        model_path = os.path.abspath(model_path)
+        return model_path, os.path.getmtime(model_path)
+
+    def _is_alive(self, link):
+        """
+        Vérifie que le workspace répond encore
+
+        Appel direct, hors safe_netlogo_reporter: pendant une reconnexion (circuit
+        half_open), sonder le link mort ne doit pas rouvrir le disjoncteur
+        """
+        try:
+            return bool(link.report("true"))
+        except Exception:
+            return False
+
+    def acquire(self, model_path="Alpha.nlogo", gui=True, jvm_path=None, reset=True, name=None):
+        """
+        Retourne un workspace prêt, en réutilisant la JVM et le modèle déjà chargés
+
+        Args:
+            model_path: Chemin vers le modèle NetLogo
+            gui: Mode d'affichage du workspace
+            jvm_path: Chemin vers la JVM (utilisé seulement à la création)
+            reset: Si True, exécute setup et attend que le modèle soit prêt
+            name: Nom du workspace, pour faire tourner plusieurs simulations headless
+                  indépendantes dans la même JVM (None: workspace partagé du mode)
+
+        Returns:
+            netlogo_actor.NetLogoLinkProxy: Le workspace, ou None en cas d'échec
+        """
+        breaker = get_jvm_breaker()
+        if breaker.is_open:
+            # JVM perdue: la recréation du workspace compte comme tentative de reconnexion
+            acquired = {}
+            def connect():
+                acquired["link"] = self._acquire(model_path, gui, jvm_path, reset, name)
+                return acquired["link"] is not None
+            breaker.attempt(connect)
+            return acquired.get("link")
+
+        return self._acquire(model_path, gui, jvm_path, reset, name)
+
+    def _acquire(self, model_path, gui, jvm_path, reset, name):
+        # Import local: netlogo_connector importe ce module
+        from netlogo_connector import create_netlogo_link
+
+        model_path, model_mtime = self._model_signature(model_path)
+        key = (gui, name)
+        workspace = self._workspaces.get(key)
+
+        if workspace is not None and not self._is_alive(workspace["link"]):
+            print("Workspace NetLogo inactif, recréation")
+            self.discard(gui, name)
+            workspace = None
+
+        try:
+            if workspace is None:
+                # Tous les accès à la JVM passent par l'acteur propriétaire du link
+                link = get_actor(create_netlogo_link(gui=gui, jvm_path=jvm_path)).proxy
+                workspace = {"link": link, "model_path": None, "model_mtime": None}
+                self._workspaces[key] = workspace
+                print("NetLogo initialisé avec succès")
+
+            if workspace["model_path"] != model_path or workspace["model_mtime"] != model_mtime:
+                print(f"Chargement du modèle depuis: {model_path}")
+                workspace["link"].load_model(model_path)
+                workspace["model_path"] = model_path
+                workspace["model_mtime"] = model_mtime
+                print("Modèle chargé avec succès")
+            else:
+                print("Réutilisation du workspace NetLogo déjà chargé")
+        except Exception as e:
+            print(f"Erreur lors de la préparation du workspace NetLogo: {str(e)}")
+            self.discard(gui, name)
+            return None
+
+        if reset and not self.reset(workspace["link"], model_path):
+            return None
+
+        return workspace["link"]
+
+    def reset(self, link, model_path=None, timeout=5.0):
+        """
+        Réinitialise le modèle sans recharger le fichier: import-world de l'état
+        post-setup en cache si disponible, sinon setup puis export pour les suivantes
+
+        Args:
+            link: NetLogoLink à réinitialiser
+            model_path: Chemin du modèle chargé (retrouvé depuis le workspace si None)
+            timeout: Durée maximale d'attente du modèle (secondes)
+
+        Returns:
+            bool: True si le modèle est prêt
+        """
+        if model_path is None:
+            model_path = next((workspace["model_path"] for workspace in self._workspaces.values()
+                               if workspace["link"] is link), None)
+
+        if self.world_cache is not None and model_path is not None:
+            if self.world_cache.restore(link, model_path) and wait_until_ready(link, timeout):
+                self._load_layout(link, model_path)
+                return True
+
+        if not safe_netlogo_command(link, "setup"):
+            return False
+        if not wait_until_ready(link, timeout):
+            print("Le modèle n'est pas prêt après setup")
+            return False
+
+        if self.world_cache is not None and model_path is not None:
+            self.world_cache.store(link, model_path)
+        self._load_layout(link, model_path)
+        return True
+
+    def _load_layout(self, link, model_path):
+        """Introspection des machines du modèle (une fois par version du fichier)"""
+        if model_path is not None:
+            load_model_layout(link, model_path)
+
+    def discard(self, gui, name=None):
+        """Ferme et oublie un workspace (mode d'affichage et nom)"""
+        workspace = self._workspaces.pop((gui, name), None)
+        if workspace is not None:
+            forget_workspace(workspace["link"])
+            try:
+                workspace["link"].kill_workspace()
+            except Exception:
+                pass
+
+    def shutdown(self):
+        """Ferme tous les workspaces (à la fermeture de l'application)"""
+        for gui, name in list(self._workspaces):
+            self.discard(gui, name)
+        print("Workspaces NetLogo fermés")
+
+# Gestionnaire partagé par le processus (une JVM par processus)
+_workspace_manager = None
+
+def get_workspace_manager():
+    """Retourne le gestionnaire de workspaces du processus courant"""
+    global _workspace_manager
+    if _workspace_manager is None:
+        settings = get_netlogo_settings()
+        world_cache = None
+        # Le backend fake n'écrit pas le format CSV de NetLogo: pas de cache de monde
+        if settings["world_cache"] and settings["backend"] == "pynetlogo":
+            world_cache = WorldCache(os.path.join(settings["cache_dir"], "worlds"))
+        _workspace_manager = WorkspaceManager(world_cache)
+    return _workspace_manager
@@ -0,0 +1,105 @@
+"""
+Cache de l'état du monde après setup: la disposition (nœuds, convoyeurs, capteurs, machines,
+flèches) est exportée une fois par version du modèle puis restaurée par import-world
+"""
+import glob
+import os
+import tempfile
+
+from utils import model_file_hash, netlogo_string
+from netlogo_utils import safe_netlogo_command
+
+class WorldCache:
+    """
+    Exports "export-world" indexés par l'empreinte SHA-256 du fichier modèle.
+
+    Un changement du fichier .nlogo change l'empreinte: l'ancien export n'est plus
+    jamais lu et il est supprimé au prochain enregistrement.
+    """
+    def __init__(self, cache_dir):
+        """
+        Args:
+            cache_dir: Répertoire où stocker les exports
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+
+    def path_for(self, model_path):
+        """
+        Retourne le chemin de l'export correspondant à la version actuelle du modèle
+
+        Args:
+            model_path: Chemin vers le fichier modèle
+
+        Returns:
+            str: Chemin du fichier CSV (ex: .cache/worlds/Alpha-<empreinte>.csv)
+        """
+        stem = os.path.splitext(os.path.basename(model_path))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{model_file_hash(model_path)[:16]}.csv")
+
+    def restore(self, netlogo, model_path):
+        """
+        Restaure le monde post-setup depuis le cache
+
+        Args:
+            netlogo: L'instance NetLogoLink (modèle déjà chargé)
+            model_path: Chemin vers le fichier modèle
+
+        Returns:
+            bool: True si le monde a été importé, False si absent du cache ou en erreur
+        """
+        world_path = self.path_for(model_path)
+        if not os.path.exists(world_path):
+            return False
+
+        if not safe_netlogo_command(netlogo, f"import-world {netlogo_string(world_path)}"):
+            # Export illisible (interrompu, version de NetLogo différente...): on l'écarte
+            self._remove(world_path)
+            return False
+        return True
+
+    def store(self, netlogo, model_path):
+        """
+        Exporte le monde courant (juste après setup) et supprime les exports obsolètes
+
+        Args:
+            netlogo: L'instance NetLogoLink
+            model_path: Chemin vers le fichier modèle
+
+        Returns:
+            bool: True si l'export a réussi
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        world_path = self.path_for(model_path)
+        # Fichier temporaire unique: les workers d'un pool, ou plusieurs workspaces nommés
+        # du même processus, peuvent exporter le même modèle en même temps
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=os.path.basename(world_path) + ".",
+                                         suffix=".tmp")
+        os.close(fd)
+
+        if not safe_netlogo_command(netlogo, f"export-world {netlogo_string(temp_path)}"):
+            self._remove(temp_path)
+            return False
+
+        # Remplacement atomique: un export interrompu n'est jamais lu
+        os.replace(temp_path, world_path)
+        self.invalidate(model_path, keep=world_path)
+        return True
+
+    def invalidate(self, model_path, keep=None):
+        """
+        Supprime les exports du modèle, sauf éventuellement celui de la version courante
+
+        Args:
+            model_path: Chemin vers le fichier modèle
+            keep: Chemin d'un export à conserver
+        """
+        stem = os.path.splitext(os.path.basename(model_path))[0]
+        for world_path in glob.glob(os.path.join(self.cache_dir, f"{stem}-*.csv")):
+            if keep is None or os.path.abspath(world_path) != os.path.abspath(keep):
+                self._remove(world_path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass